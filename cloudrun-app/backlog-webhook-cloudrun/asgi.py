@@ -0,0 +1,423 @@
+import asyncio
+import functools
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+import main
+from dedup import RedisDedupStore
+from metrics import StageTimer
+from payload_parser import PayloadTooLarge, is_json_mimetype
+from rate_limit import RedisRateLimiter
+from tenants import LOAD_REQUIRED
+
+# Serve with: gunicorn -k uvicorn.workers.UvicornWorker asgi:app  (or: uvicorn asgi:app)
+# Routes and responses mirror main:app; all request logic is shared through main.process_webhook.
+
+# With flow control set to "block", publisher.publish() can block the calling thread
+_FLOW_CONTROL_BLOCKS = os.environ.get("PUBSUB_FLOW_LIMIT_BEHAVIOR", "ignore").lower() == "block"
+_TENANT_PREFIX = "/webhook/backlog/"
+
+def use_asgi_concurrency_limit() -> None:
+    """Replace main's default concurrency limiter with one sized for the event loop.
+
+    The default maximum leaves gunicorn gthread workers a thread for health
+    checks. Here a request waiting on Pub/Sub holds no thread, so the limiter
+    uses ASGI_CONCURRENCY_LIMIT_MAX instead. A limiter installed in place of
+    the default, e.g. by a test, is kept.
+    """
+    limiter = main.concurrency_limiter
+    if limiter is not None and limiter.max_limit == main.CONCURRENCY_LIMIT_MAX:
+        main.concurrency_limiter = main.create_concurrency_limiter(main.ASGI_CONCURRENCY_LIMIT_MAX)
+
+use_asgi_concurrency_limit()
+
+async def get_webhook_tokens() -> tuple:
+    """Return the accepted webhook tokens without blocking the event loop.
+
+    Cached tokens are returned directly. Only a cache miss, which happens once
+    per TTL, runs the Secret Manager call in a worker thread.
+
+    Returns:
+        tuple: The valid webhook tokens
+    """
+    if os.environ.get("BACKLOG_WEBHOOK_SECRET_TOKEN"):
+        return main.get_webhook_tokens()
+    tokens = main.webhook_token_cache.peek()
+    if tokens is None:
+        tokens = await asyncio.to_thread(main.webhook_token_cache.load)
+    return tokens
+
+async def get_request_tokens(tenant_key) -> tuple:
+    """Async counterpart of main.get_request_tokens; only loads run in a worker thread.
+
+    Returns:
+        tuple: (tenant, tokens)
+    """
+    if tenant_key is None:
+        return None, await get_webhook_tokens()
+    tenant = main.tenant_registry.resolve(tenant_key, block=False)
+    if tenant is LOAD_REQUIRED:
+        tenant = await asyncio.to_thread(main.tenant_registry.resolve, tenant_key)
+    if tenant is None:
+        main.request_log.warning("Unknown tenant: %s", tenant_key)
+        return None, ()
+    return tenant, tenant.tokens
+
+def publish_may_block() -> bool:
+    """Whether main.submit_message can block the calling thread.
+
+    Flow control set to "block" can hold publish(), and with a claim check an
+    oversized comment is uploaded to the blob store before publishing. Only
+    then is submitting moved off the event loop.
+    """
+    return _FLOW_CONTROL_BLOCKS or main.claim_check is not None
+
+def processing_may_block() -> bool:
+    """Whether main.process_webhook and main.process_batch can block the calling thread.
+
+    They run inline on the event loop unless a step waits on the network or
+    disk: a Redis dedup claim or rate check, an outbox append, or a coalescer
+    flush whose submit may block.
+    """
+    if isinstance(main.dedup_store, RedisDedupStore) or main.PUBLISH_MODE == "outbox":
+        return True
+    if main.event_rate_limiter is not None and any(
+            isinstance(limiter, RedisRateLimiter) for limiter in main.event_rate_limiter.limiters.values()):
+        return True
+    return main.comment_coalescer is not None and publish_may_block()
+
+def responding_may_block() -> bool:
+    """Whether building the response after publishing can block the calling thread.
+
+    Finishing the dedup entry is a Redis call with the redis store, and with
+    OUTBOX_FALLBACK a failed job is appended to the outbox.
+    """
+    return isinstance(main.dedup_store, RedisDedupStore) or main.OUTBOX_FALLBACK
+
+async def run_may_block(may_block: bool, func, *args):
+    """Call func in a worker thread if it may block, otherwise directly on the event loop."""
+    if may_block:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+async def publish_job(job) -> list:
+    """Publish every routed message of a job and await them without holding a thread.
+
+    Args:
+        job: The main.PublishJob to publish
+
+    Returns:
+        list: The message IDs, in the order of ``job.messages``
+    """
+    try:
+        futures = []
+        may_block = publish_may_block()
+        for routed in job.messages:
+            if may_block:
+                future = await asyncio.to_thread(main.submit_message, routed.message, routed.topic,
+                                                 routed.attributes)
+            else:
+                future = main.submit_message(routed.message, routed.topic, routed.attributes)
+            futures.append(asyncio.wrap_future(future))
+        message_ids = await asyncio.wait_for(asyncio.gather(*futures), main.PUBLISH_TIMEOUT)
+    except Exception as e:
+        main.publish_log.error("Failed to publish message to Pub/Sub: %s", e)
+        raise
+    for routed, message_id in zip(job.messages, message_ids):
+        main.publish_log.info("Published %s message to %s: %s", routed.rule, routed.topic, message_id)
+    return list(message_ids)
+
+async def handle_backlog_webhook(scope, receive, tenant_key=None) -> tuple:
+    """Async counterpart of main.handle_backlog_webhook.
+
+    Returns:
+        tuple: (body, status) pair
+    """
+    try:
+        timer = StageTimer(main.stage_histogram)
+        try:
+            tenant, secret_tokens = await get_request_tokens(tenant_key)
+        except Exception as e:
+            main.request_log.error("Failed to retrieve webhook secret: %s", e)
+            return {"error": "Internal Server Error"}, 500
+        timer.mark("secret")
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        headers = dict(scope.get("headers", []))
+        is_json = is_json_mimetype(request_mimetype(headers))
+
+        body, too_large = b"", None
+        if is_json:
+            try:
+                content_length = headers.get(b"content-length")
+                body = await read_body(receive, main.MAX_BODY_BYTES,
+                                       int(content_length) if content_length else None)
+            except PayloadTooLarge as e:
+                too_large = e
+
+        def get_body():
+            if too_large:
+                raise too_large
+            return body
+
+        response, job = await run_may_block(
+            processing_may_block(),
+            main.process_webhook,
+            secret_tokens,
+            query.get("token", [""])[0],
+            is_json,
+            get_body,
+            tenant
+        )
+        if response:
+            return response
+
+        timer.skip()
+        try:
+            message_ids = await publish_job(job)
+        except Exception as e:
+            return await run_may_block(responding_may_block(), main.publish_failed_response, job, e)
+        timer.mark("publish")
+
+        return await run_may_block(responding_may_block(), main.published_response, job, message_ids)
+
+    except Exception as e:
+        main.request_log.exception("Unexpected error in webhook handler: %s", e)
+        return {"error": "Internal Server Error"}, 500
+
+async def wait_for_jobs(submitted: list) -> list:
+    """Async counterpart of main.wait_for_jobs; every job waits at most PUBLISH_TIMEOUT.
+
+    Returns:
+        list: Per job, the list of message IDs or the exception it failed with
+    """
+    async def wait(futures):
+        if isinstance(futures, Exception):
+            return futures
+        try:
+            gathered = asyncio.gather(*[asyncio.wrap_future(future) for future in futures])
+            return list(await asyncio.wait_for(gathered, main.PUBLISH_TIMEOUT))
+        except Exception as e:
+            return e
+    return list(await asyncio.gather(*[wait(futures) for futures in submitted]))
+
+async def handle_backlog_webhook_batch(scope, receive, tenant_key=None) -> tuple:
+    """Async counterpart of main.handle_backlog_webhook_batch.
+
+    Returns:
+        tuple: (body, status) pair
+    """
+    try:
+        timer = StageTimer(main.stage_histogram)
+        try:
+            tenant, secret_tokens = await get_request_tokens(tenant_key)
+        except Exception as e:
+            main.request_log.error("Failed to retrieve webhook secret: %s", e)
+            return {"error": "Internal Server Error"}, 500
+        timer.mark("secret")
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        headers = dict(scope.get("headers", []))
+        body, too_large = b"", None
+        try:
+            content_length = headers.get(b"content-length")
+            body = await read_body(receive, main.BATCH_MAX_BODY_BYTES,
+                                   int(content_length) if content_length else None)
+        except PayloadTooLarge as e:
+            too_large = e
+
+        def get_body():
+            if too_large:
+                raise too_large
+            return body
+
+        response, batch = await run_may_block(
+            processing_may_block(),
+            main.process_batch,
+            secret_tokens,
+            query.get("token", [""])[0],
+            request_mimetype(headers),
+            get_body,
+            tenant
+        )
+        if response:
+            return response
+
+        timer.skip()
+        jobs = [job for _, job in batch.pending]
+        submitted = await run_may_block(publish_may_block(), main.submit_jobs, jobs)
+        outcomes = await wait_for_jobs(submitted)
+        timer.mark("publish")
+        return await run_may_block(responding_may_block(), main.batch_response, batch, outcomes)
+
+    except Exception as e:
+        main.request_log.exception("Unexpected error in batch handler: %s", e)
+        return {"error": "Internal Server Error"}, 500
+
+def tenant_route(path: str):
+    """Match /webhook/backlog/<tenant> and /webhook/backlog/<tenant>/batch.
+
+    Returns:
+        Optional[tuple]: (tenant_key, is_batch), or None if the path is not a tenant route
+    """
+    if not path.startswith(_TENANT_PREFIX):
+        return None
+    parts = path[len(_TENANT_PREFIX):].split("/")
+    if len(parts) == 1 and parts[0]:
+        return parts[0], False
+    if len(parts) == 2 and parts[0] and parts[1] == "batch":
+        return parts[0], True
+    return None
+
+def trace_request(scope, name: str):
+    """Async counterpart of main.trace_request."""
+    headers = dict(scope.get("headers", []))
+    traceparent = headers.get(b"traceparent")
+    cloud_trace_context = headers.get(b"x-cloud-trace-context")
+    return main.tracer.request(name, traceparent.decode("latin-1") if traceparent else None,
+                               cloud_trace_context.decode("latin-1") if cloud_trace_context else None)
+
+def request_mimetype(headers: dict) -> str:
+    """Return the lower-case content type without parameters, like Flask's request.mimetype."""
+    return headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip().lower()
+
+async def read_body(receive, max_bytes: int, content_length=None) -> bytes:
+    """Read the request body from the ASGI receive channel, failing fast above max_bytes.
+
+    Raises:
+        PayloadTooLarge: If the declared or actual body size exceeds the limit
+    """
+    if content_length is not None and content_length > max_bytes:
+        raise PayloadTooLarge(f"Content-Length {content_length} exceeds {max_bytes} bytes")
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > max_bytes:
+            raise PayloadTooLarge(f"Body exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+async def run_limited(handler, scope, receive) -> tuple:
+    """Async counterpart of main.run_limited.
+
+    Returns:
+        tuple: (body, status, headers); headers are only set when the client is told to retry later
+    """
+    if main.shutdown_coordinator.draining:
+        return main.draining_response()
+    limiter = main.concurrency_limiter
+    if limiter is None:
+        body, status = await handler(scope, receive)
+        return body, status, main.retry_headers(body)
+    permit = limiter.acquire()
+    if permit is None:
+        return main.shed_response()
+    success = False
+    try:
+        body, status = await handler(scope, receive)
+        success = status < 500
+        return body, status, main.retry_headers(body)
+    finally:
+        limiter.release(permit, success)
+
+async def send_response(send, body, status: int, content_type: bytes = b"application/json",
+                        headers: dict = None) -> None:
+    """Send a complete response; dict bodies are encoded as JSON like Flask's jsonify."""
+    if isinstance(body, (dict, list)):
+        data = (json.dumps(body) + "\n").encode("utf-8")
+    else:
+        data = body.encode("utf-8")
+    response_headers = [(b"content-type", content_type), (b"content-length", str(len(data)).encode())]
+    for name, value in (headers or {}).items():
+        response_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": response_headers
+    })
+    await send({"type": "http.response.body", "body": data})
+
+async def lifespan(receive, send) -> None:
+    """Warm up on startup and drain the publisher on shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if main.WARMUP_ON_START:
+                main.start_warmup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # The server has stopped accepting connections and finished the requests in flight
+            await asyncio.to_thread(main.shutdown)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send) -> None:
+    """ASGI application exposing the same routes as main:app."""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    path = scope["path"]
+    method = scope["method"]
+    if path == "/":
+        if method not in ("GET", "HEAD"):
+            await send_response(send, "Method Not Allowed", 405, b"text/plain; charset=utf-8")
+            return
+        main.probe_log.debug("Health check endpoint accessed successfully")
+        await send_response(send, "OK", 200, b"text/html; charset=utf-8")
+    elif path == "/ready":
+        if method not in ("GET", "HEAD"):
+            await send_response(send, "Method Not Allowed", 405, b"text/plain; charset=utf-8")
+            return
+        status = main.readiness_status()
+        main.probe_log.debug("Readiness check: %s", status["state"])
+        await send_response(send, status, 200 if status["ready"] else 503)
+    elif path == "/webhook/backlog/fm":
+        if method != "POST":
+            await send_response(send, "Method Not Allowed", 405, b"text/plain; charset=utf-8")
+            return
+        with trace_request(scope, "POST /webhook/backlog/fm"):
+            started = time.perf_counter()
+            body, status, headers = await run_limited(handle_backlog_webhook, scope, receive)
+            main.record_request(body, status, time.perf_counter() - started)
+        await send_response(send, body, status, headers=headers)
+    elif path == "/webhook/backlog/fm/batch":
+        if method != "POST":
+            await send_response(send, "Method Not Allowed", 405, b"text/plain; charset=utf-8")
+            return
+        with trace_request(scope, "POST /webhook/backlog/fm/batch"):
+            started = time.perf_counter()
+            body, status, headers = await run_limited(handle_backlog_webhook_batch, scope, receive)
+            main.record_request(body, status, time.perf_counter() - started)
+        await send_response(send, body, status, headers=headers)
+    elif path == "/metrics":
+        if method not in ("GET", "HEAD"):
+            await send_response(send, "Method Not Allowed", 405, b"text/plain; charset=utf-8")
+            return
+        if not main.METRICS_ENABLED:
+            await send_response(send, "Not Found", 404, b"text/plain; charset=utf-8")
+            return
+        await send_response(send, main.metrics_registry.render(), 200, main.METRICS_CONTENT_TYPE.encode())
+    elif main.tenant_registry is not None and tenant_route(path) is not None:
+        if method != "POST":
+            await send_response(send, "Method Not Allowed", 405, b"text/plain; charset=utf-8")
+            return
+        tenant_key, batch = tenant_route(path)
+        handler = handle_backlog_webhook_batch if batch else handle_backlog_webhook
+        with trace_request(scope, "POST /webhook/backlog/<tenant>/batch" if batch else "POST /webhook/backlog/<tenant>"):
+            started = time.perf_counter()
+            body, status, headers = await run_limited(functools.partial(handler, tenant_key=tenant_key),
+                                                      scope, receive)
+            main.record_request(body, status, time.perf_counter() - started)
+        await send_response(send, body, status, headers=headers)
+    else:
+        await send_response(send, "Not Found", 404, b"text/plain; charset=utf-8")
@@ -0,0 +1,134 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+
+class AsyncPublishQueue:
+    """Bounded in-process queue that publishes payloads off the request thread.
+
+    Request handlers call ``submit`` and return immediately. A single worker
+    thread hands each payload to the publish function, which must return a
+    future, and completion callbacks record the outcome. A payload counts as
+    unfinished from ``submit`` until its callbacks have run (``task_done``),
+    so there is no moment at which a dequeued payload is counted nowhere.
+    Counters and the queue are updated and read under one lock, so a
+    snapshot always satisfies accepted == published + failed + queued + in-flight.
+    """
+
+    def __init__(self, publish: Callable[[dict], Future], maxsize: int = 1000,
+                 on_success: Optional[Callable[[dict, str], None]] = None,
+                 on_failure: Optional[Callable[[dict, BaseException], None]] = None,
+                 name: str = "async-publish"):
+        """Create a publish queue.
+
+        Args:
+            publish: Callable that starts publishing a payload and returns its future
+            maxsize: Maximum number of payloads waiting to be handed to the publisher
+            on_success: Optional callback invoked with the payload and message ID
+            on_failure: Optional callback invoked with the payload and exception
+            name: Name of the worker thread
+        """
+        self._publish = publish
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._on_success = on_success
+        self._on_failure = on_failure
+        self._name = name
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._accepted = 0
+        self._rejected = 0
+        self._published = 0
+        self._failed = 0
+
+    def submit(self, payload: dict,
+               on_complete: Optional[Callable[[Optional[str], Optional[BaseException]], None]] = None) -> bool:
+        """Queue a payload for publishing without waiting for Pub/Sub.
+
+        Args:
+            payload: The message payload to publish
+            on_complete: Optional callback for this payload only, invoked with
+                (message_id, None) on success or (None, error) on failure
+
+        Returns:
+            bool: True if the payload was queued, False if the queue is full
+        """
+        self._ensure_worker()
+        with self._lock:
+            try:
+                self._queue.put_nowait((payload, on_complete))
+            except queue.Full:
+                self._rejected += 1
+                return False
+            self._accepted += 1
+        return True
+
+    def stats(self) -> dict:
+        """Return queue counters for monitoring.
+
+        Returns:
+            dict: Accepted, rejected, published, failed, queued and in-flight counts
+        """
+        with self._lock:
+            # put() and task_done() only happen under self._lock; get() leaves unfinished_tasks unchanged
+            with self._queue.mutex:
+                queued = len(self._queue.queue)
+                unfinished = self._queue.unfinished_tasks
+            return {
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "published": self._published,
+                "failed": self._failed,
+                "queued": queued,
+                "in_flight": unfinished - queued,
+            }
+
+    def _ensure_worker(self) -> None:
+        # Started lazily so the thread lives in the gunicorn worker, not the preloading master
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            payload, on_complete = self._queue.get()
+            try:
+                future = self._publish(payload)
+            except Exception as e:
+                self._record_failure(payload, on_complete, e)
+                continue
+            future.add_done_callback(lambda f, p=payload, c=on_complete: self._on_done(p, c, f))
+
+    def _on_done(self, payload: dict, on_complete, future: Future) -> None:
+        try:
+            message_id = future.result()
+        except Exception as e:
+            self._record_failure(payload, on_complete, e)
+            return
+        self._invoke(self._on_success, payload, message_id)
+        self._invoke(on_complete, message_id, None)
+        with self._lock:
+            self._published += 1
+            self._queue.task_done()
+
+    def _record_failure(self, payload: dict, on_complete, error: BaseException) -> None:
+        logging.error(f"Async publish failed: {error}")
+        self._invoke(self._on_failure, payload, error)
+        self._invoke(on_complete, None, error)
+        with self._lock:
+            self._failed += 1
+            self._queue.task_done()
+
+    @staticmethod
+    def _invoke(callback, *args) -> None:
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Async publish callback failed: {e}")
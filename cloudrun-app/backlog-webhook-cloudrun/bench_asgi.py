@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Side-by-side throughput comparison of the Flask (main:app) and ASGI (asgi:app) paths
+Both apps run in-process against a fake publisher with injected Pub/Sub latency:
+Flask is driven by a fixed pool of threads like gunicorn gthread, ASGI by
+concurrent tasks on one event loop like a uvicorn worker
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import os
+import threading
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "bench-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+import main
+import asgi
+from bench_common import load_sample_payload, summarize_latencies
+from fake_pubsub import FakePublisherClient
+from publisher_config import load_publisher_settings
+
+WEBHOOK_PATH = "/webhook/backlog/fm"
+
+def bench_flask(body: bytes, requests: int, threads: int) -> tuple:
+    """Drive main:app with a fixed number of request threads"""
+    latencies = []
+    lock = threading.Lock()
+    remaining = [requests]
+    url = f"{WEBHOOK_PATH}?token={os.environ['BACKLOG_WEBHOOK_SECRET_TOKEN']}"
+
+    def worker():
+        client = main.app.test_client()
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            response = client.post(url, data=body, content_type="application/json")
+            elapsed = time.perf_counter() - start
+            if response.status_code < 300:
+                with lock:
+                    latencies.append(elapsed)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, time.perf_counter() - started
+
+async def bench_asgi(body: bytes, requests: int, concurrency: int) -> tuple:
+    """Drive asgi:app with a number of concurrent in-flight requests"""
+    latencies = []
+    remaining = [requests]
+    query = f"token={os.environ['BACKLOG_WEBHOOK_SECRET_TOKEN']}".encode()
+
+    async def one_request():
+        scope = {
+            "type": "http", "method": "POST", "path": WEBHOOK_PATH, "query_string": query,
+            "headers": [(b"content-type", b"application/json")]
+        }
+        status = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        start = time.perf_counter()
+        await asgi.app(scope, receive, send)
+        if status and status[0] < 300:
+            latencies.append(time.perf_counter() - start)
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            await one_request()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+def main_bench():
+    """Run both paths and print a comparison table"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8, help="Flask request threads (gunicorn --threads)")
+    parser.add_argument("--concurrency", type=int, default=200, help="in-flight ASGI requests")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated publish RPC latency")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    body = json.dumps(load_sample_payload()).encode("utf-8")
+    print(f"requests={args.requests} rpc_latency={args.latency_ms}ms")
+    print(f"{'path':<28} {'webhooks/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'ok':>6}")
+
+    runs = [
+        (f"flask (threads={args.threads})", lambda: bench_flask(body, args.requests, args.threads)),
+        (f"asgi (concurrency={args.concurrency})",
+         lambda: asyncio.run(bench_asgi(body, args.requests, args.concurrency)))
+    ]
+    for name, run in runs:
+        batch_settings, publisher_options = load_publisher_settings()
+        main.publisher = FakePublisherClient(batch_settings, publisher_options,
+                                             latency=args.latency_ms / 1000.0)
+        latencies, elapsed = run()
+        main.publisher.stop()
+        summary = summarize_latencies(latencies, elapsed)
+        print(f"{name:<28} {summary['per_second']:>11.1f} {summary['p50_ms']:>8.2f} "
+              f"{summary['p99_ms']:>8.2f} {summary['requests']:>6}")
+
+if __name__ == "__main__":
+    main_bench()
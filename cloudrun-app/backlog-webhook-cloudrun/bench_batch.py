@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the batch endpoint
+Replays the same comment events one request at a time and as one batch
+(JSON array and NDJSON) through the in-process Flask app, publishing to the
+local fake publisher with injected latency
+"""
+
+import argparse
+import json
+import logging
+import sys
+import os
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "bench-token")
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from bench_common import build_payload
+from fake_pubsub import FakePublisherClient
+
+def main():
+    """Compare replaying events one by one with a single batch request"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected Pub/Sub latency")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    import main
+
+    events = [build_payload(3, seq=seq) for seq in range(args.events)]
+    client = main.app.test_client()
+    token = os.environ["BACKLOG_WEBHOOK_SECRET_TOKEN"]
+
+    def one_by_one():
+        for event in events:
+            client.post(f"/webhook/backlog/fm?token={token}", json=event)
+
+    def json_array():
+        client.post(f"/webhook/backlog/fm/batch?token={token}", data=json.dumps(events),
+                    content_type="application/json")
+
+    def ndjson():
+        client.post(f"/webhook/backlog/fm/batch?token={token}", data="\n".join(map(json.dumps, events)),
+                    content_type="application/x-ndjson")
+
+    print(f"{'request':<12} {'seconds':>8} {'events/s':>9} {'RPCs':>5}")
+    for name, run in (("one by one", one_by_one), ("JSON array", json_array), ("NDJSON", ndjson)):
+        main.publisher = FakePublisherClient(latency=args.latency_ms / 1000.0)
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<12} {elapsed:>8.2f} {args.events / elapsed:>9.0f} {main.publisher.rpc_count:>5}")
+        main.publisher.stop()
+
+if __name__ == "__main__":
+    main()
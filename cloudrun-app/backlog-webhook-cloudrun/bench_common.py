@@ -0,0 +1,61 @@
+"""
+Shared helpers for the local benchmark scripts
+"""
+
+import json
+import os
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample.json")
+
+def load_sample_payload() -> dict:
+    """Load the sample Backlog webhook payload"""
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize_latencies(latencies: list, elapsed: float) -> dict:
+    """Summarize request latencies (seconds) into throughput and percentiles in milliseconds"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "per_second": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": (ordered[-1] * 1000) if ordered else 0.0,
+    }
+
+def build_payload(event_type: int = 3, size_bytes: int = 0, seq: int = 0) -> dict:
+    """Build a synthetic Backlog payload from sample.json, padded to roughly size_bytes
+
+    The issue description, attachments and notifications are inflated the way
+    large real issues are; comment events keep their comment, other event types
+    drop it. seq makes the payload and comment IDs unique.
+    """
+    payload = load_sample_payload()
+    payload["type"] = event_type
+    payload["id"] += seq
+    content = payload["content"]
+    if event_type in (3, 4):
+        content["comment"]["id"] += seq
+    else:
+        content.pop("comment", None)
+
+    user = payload["createdUser"]
+    base = len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    if size_bytes > base:
+        # About a third each for description text, attachments and notifications
+        share = (size_bytes - base) // 3
+        content["description"] = "課題の詳細説明です。" * (share // 30 + 1)
+        attachment = {"id": 1, "name": "screenshot.png", "size": 123456,
+                      "createdUser": user, "created": "2024-01-01T00:00:00Z"}
+        content["attachments"] = [dict(attachment, id=i) for i in range(share // 340 + 1)]
+        notification = {"id": 1, "alreadyRead": False, "reason": 2, "user": user, "resourceAlreadyRead": False}
+        payload["notifications"] = [dict(notification, id=i) for i in range(share // 320 + 1)]
+    return payload
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Size and CPU report for published message encodings
+Encodes a corpus of comment messages, as extract_comment_data produces them,
+with every available encoding/compression combination and reports the bytes
+sent to Pub/Sub and the encode/decode cost per message
+"""
+
+import argparse
+import json
+import logging
+import sys
+import os
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import build_payload
+from message_codec import MessageCodec, decode_message, ENCODINGS, COMPRESSIONS
+
+# Comment bodies repeated to build short, typical and long comments
+COMMENT_TEXT = "お疲れ様です。こちらの課題について確認しました。修正方針は問題ないと思います。"
+
+def build_corpus(count: int) -> list:
+    """Build comment messages with comment bodies from one line to a few kilobytes"""
+    import main
+    corpus = []
+    for seq in range(count):
+        payload = build_payload(3, seq=seq)
+        payload["content"]["comment"]["content"] = COMMENT_TEXT * (1 + (seq * 7) % 60)
+        corpus.append(main.extract_comment_data(payload))
+    return corpus
+
+def measure(codec: MessageCodec, corpus: list, rounds: int) -> dict:
+    """Return total bytes and mean encode/decode microseconds per message"""
+    encoded = [codec.encode(message) for message in corpus]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in corpus:
+            codec.encode(message)
+    encode_us = (time.perf_counter() - started) / (rounds * len(corpus)) * 1e6
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for data, attributes in encoded:
+            decode_message(data, attributes)
+    decode_us = (time.perf_counter() - started) / (rounds * len(corpus)) * 1e6
+
+    return {"bytes": sum(len(data) for data, _ in encoded), "encode_us": encode_us, "decode_us": decode_us}
+
+def main():
+    """Report every available codec against the pre-codec json.dumps baseline"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200, help="comment messages in the corpus")
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the corpus per measurement")
+    parser.add_argument("--compression-min-bytes", type=int, default=1024)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DEDUP_ENABLED", "false")
+    logging.disable(logging.CRITICAL)
+    corpus = build_corpus(args.messages)
+
+    baseline = sum(len(json.dumps(message).encode("utf-8")) for message in corpus)
+    print(f"corpus: {len(corpus)} messages, {baseline / len(corpus):.0f} bytes/message with json.dumps")
+    print(f"{'encoding':<9} {'compression':<12} {'bytes/msg':>10} {'vs json.dumps':>14} {'encode us':>10} {'decode us':>10}")
+    for encoding in ENCODINGS:
+        for compression in COMPRESSIONS:
+            try:
+                codec = MessageCodec(encoding, compression, args.compression_min_bytes)
+            except ValueError as e:
+                print(f"{encoding:<9} {compression:<12} skipped: {e}")
+                continue
+            result = measure(codec, corpus, args.rounds)
+            print(f"{encoding:<9} {compression:<12} {result['bytes'] / len(corpus):>10.0f} "
+                  f"{result['bytes'] / baseline:>13.0%} {result['encode_us']:>10.1f} {result['decode_us']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the webhook service
+Sends a reproducible mix of comment and non-comment payloads of different
+sizes to the Flask app in-process and to gunicorn started like the Dockerfile,
+both publishing to the in-memory fake publisher (PUBLISHER_BACKEND=fake) with
+injected latency. Reports throughput, p50/p95/p99 and peak RSS per target and
+payload kind, and saves the results as JSON for comparison between commits.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import build_payload, summarize_latencies
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+TOKEN = "bench-token"
+WEBHOOK_PATH = f"/webhook/backlog/fm?token={TOKEN}"
+
+# Payload kinds: (event type, approximate size in bytes; 0 keeps sample.json as is)
+KINDS = {
+    "comment": (3, 0),
+    "issue": (1, 0),
+    "large-comment": (3, 200_000),
+    "large-issue": (1, 500_000),
+}
+DEFAULT_MIX = "comment=0.6,issue=0.3,large-comment=0.05,large-issue=0.05"
+
+def parse_mix(text: str) -> dict:
+    """Parse 'kind=weight,...' into a dict of weights"""
+    mix = {}
+    for part in text.split(","):
+        kind, weight = part.split("=")
+        if kind not in KINDS:
+            raise SystemExit(f"unknown payload kind {kind!r}; choose from {', '.join(KINDS)}")
+        mix[kind] = float(weight)
+    return mix
+
+def build_requests(count: int, mix: dict, seed: int) -> list:
+    """Build the (kind, body) request list; the same seed always yields the same list"""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    templates = {kind: build_payload(*KINDS[kind]) for kind in mix}
+    requests = []
+    for seq, kind in enumerate(kinds):
+        # Unique IDs so duplicate-delivery detection does not short-circuit the run
+        payload = dict(templates[kind], id=templates[kind]["id"] + seq)
+        if "comment" in payload["content"]:
+            comment = dict(payload["content"]["comment"], id=payload["content"]["comment"]["id"] + seq)
+            payload["content"] = dict(payload["content"], comment=comment)
+        requests.append((kind, json.dumps(payload, ensure_ascii=False).encode("utf-8")))
+    return requests
+
+def rss_bytes(pids: list) -> int:
+    """Sum the resident set size of the given processes from /proc"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+def process_tree(pid: int) -> list:
+    """Return pid and its direct children (the gunicorn master and its workers)"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [pid] + [int(child) for child in f.read().split()]
+    except OSError:
+        return [pid]
+
+class RssSampler:
+    """Samples the RSS of a process tree in the background and keeps the peak"""
+
+    def __init__(self, pids_func, interval: float = 0.05):
+        self._pids_func = pids_func
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes(self._pids_func()))
+            self._stop.wait(self._interval)
+
+def drive(requests: list, concurrency: int, send) -> tuple:
+    """Send every request from concurrency threads; return (records, elapsed)
+
+    send(body, state) performs one request and returns the status code; state is a
+    per-thread dict for keeping a client or connection between requests.
+    """
+    records = []
+    lock = threading.Lock()
+    position = [0]
+
+    def worker():
+        state = {}
+        while True:
+            with lock:
+                if position[0] == len(requests):
+                    return
+                kind, body = requests[position[0]]
+                position[0] += 1
+            start = time.perf_counter()
+            try:
+                status = send(body, state)
+            except Exception:
+                status = 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                records.append((kind, status, elapsed))
+
+    workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return records, time.perf_counter() - started
+
+def summarize(records: list, elapsed: float, rss_peak: int) -> dict:
+    """Summarize the records overall and per payload kind"""
+    statuses = {}
+    by_kind = {}
+    for kind, status, latency in records:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        by_kind.setdefault(kind, []).append(latency)
+    return {
+        "overall": summarize_latencies([latency for _, _, latency in records], elapsed),
+        "by_kind": {kind: summarize_latencies(latencies, elapsed) for kind, latencies in sorted(by_kind.items())},
+        "status_counts": statuses,
+        "rss_peak_mb": rss_peak / (1024 * 1024),
+    }
+
+def run_flask(requests: list, concurrency: int) -> dict:
+    """Drive main:app in-process through Flask's test client"""
+    import main
+    main.get_publisher()
+
+    def send(body, state):
+        client = state.get("client") or state.setdefault("client", main.app.test_client())
+        return client.post(WEBHOOK_PATH, data=body, content_type="application/json").status_code
+
+    with RssSampler(lambda: [os.getpid()]) as sampler:
+        records, elapsed = drive(requests, concurrency, send)
+    main.publisher.stop()
+    return summarize(records, elapsed, sampler.peak)
+
+def free_port() -> int:
+    """Pick an unused local port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def run_gunicorn(requests: list, concurrency: int, threads: int, env: dict) -> dict:
+    """Start gunicorn like the Dockerfile does and drive it over HTTP keep-alive connections"""
+    port = free_port()
+    command = [
+        sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", "1",
+        "--threads", str(threads), "--timeout", "0", "--preload", "--log-level", "warning", "main:app"
+    ]
+    process = subprocess.Popen(command, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 30
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                    break
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError("gunicorn did not answer within 30s")
+                time.sleep(0.05)
+
+        def send(body, state):
+            connection = state.get("connection")
+            if connection is None:
+                connection = state["connection"] = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            try:
+                connection.request("POST", WEBHOOK_PATH, body=body, headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                state.pop("connection")
+                raise
+
+        with RssSampler(lambda: process_tree(process.pid)) as sampler:
+            records, elapsed = drive(requests, concurrency, send)
+        return summarize(records, elapsed, sampler.peak)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def git_commit() -> str:
+    """Return the current commit hash, or 'unknown' outside a git checkout"""
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or "unknown"
+
+def print_results(results: dict, baseline: dict = None) -> None:
+    """Print one line per target and payload kind, with deltas against a baseline run"""
+    print(f"{'target':<10} {'kind':<14} {'req':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>7}")
+    for target, result in results.items():
+        rows = [("all", result["overall"])] + list(result["by_kind"].items())
+        for kind, summary in rows:
+            rss = f"{result['rss_peak_mb']:>7.1f}" if kind == "all" else " " * 7
+            line = (f"{target:<10} {kind:<14} {summary['requests']:>6} {summary['per_second']:>9.1f} "
+                    f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f} {rss}")
+            base = (baseline or {}).get(target)
+            if base:
+                base_summary = base["overall"] if kind == "all" else base["by_kind"].get(kind)
+                if base_summary and base_summary["per_second"] and base_summary["p99_ms"]:
+                    line += (f"  ({summary['per_second'] / base_summary['per_second'] - 1:+.0%} req/s, "
+                             f"{summary['p99_ms'] / base_summary['p99_ms'] - 1:+.0%} p99)")
+            print(line)
+        print(f"{'':<10} statuses: {result['status_counts']}")
+
+def main():
+    """Run the load test against the selected targets and save the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default="flask,gunicorn", help="flask and/or gunicorn")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn --threads (the Dockerfile uses 8)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected publish RPC latency")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"payload kinds and weights ({', '.join(KINDS)})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results file (default: bench_results/load-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    # The in-process target reads the same variables the gunicorn process gets
+    env = dict(os.environ, BACKLOG_WEBHOOK_SECRET_TOKEN=TOKEN, PUBLISHER_BACKEND="fake",
+               FAKE_PUBLISH_LATENCY_MS=str(args.latency_ms), WARMUP_ON_START="true")
+    os.environ.update(env)
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    requests = build_requests(args.requests, parse_mix(args.mix), args.seed)
+    commit = git_commit()
+    print(f"commit={commit} requests={len(requests)} concurrency={args.concurrency} "
+          f"latency={args.latency_ms}ms mix={args.mix}")
+
+    results = {}
+    for target in args.targets.split(","):
+        if target == "flask":
+            results[target] = run_flask(requests, args.concurrency)
+        elif target == "gunicorn":
+            results[target] = run_gunicorn(requests, args.concurrency, args.threads, env)
+        else:
+            raise SystemExit(f"unknown target {target!r}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(
+        APP_DIR, "bench_results", f"load-{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "config": vars(args),
+            "results": results,
+        }, f, indent=2)
+    print(f"results saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Overhead benchmark for the in-process metrics
+Measures the instrumentation a webhook request performs (stage marks, outcome
+counter, latency histogram) on its own, and the in-process handler for an
+ignored event with METRICS_ENABLED on and off
+"""
+
+import argparse
+import json
+import logging
+import sys
+import os
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "bench-token")
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from bench_common import build_payload
+from metrics import StageTimer
+
+# Stages a published sync request records
+STAGES = ("secret", "token", "read_body", "prescan", "parse", "route", "dedup", "publish")
+
+def per_call_us(func, min_seconds: float) -> float:
+    """Return the mean microseconds per call, repeating until min_seconds has passed"""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for _ in range(200):
+            func()
+        calls += 200
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+def main():
+    """Report instrumentation cost per request"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="time spent per measurement")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    import main
+
+    body = {"success": True, "message_id": "1"}
+
+    def instrumented_request():
+        timer = StageTimer(main.STAGE_SECONDS)
+        for stage in STAGES:
+            timer.mark(stage)
+        main.record_request(body, 200, 0.001)
+
+    def bare_request():
+        timer = StageTimer(None)
+        for stage in STAGES:
+            timer.mark(stage)
+
+    instrumented = per_call_us(instrumented_request, args.min_seconds)
+    bare = per_call_us(bare_request, args.min_seconds)
+    print(f"instrumentation per request ({len(STAGES)} stages + outcome): {instrumented - bare:.2f} us")
+
+    raw = json.dumps(build_payload(1)).encode()
+    client = main.app.test_client()
+
+    def handler():
+        client.post("/webhook/backlog/fm?token=bench-token", data=raw, content_type="application/json")
+
+    results = {}
+    for enabled in (True, False, True, False):
+        main.METRICS_ENABLED = enabled
+        main.stage_histogram = main.STAGE_SECONDS if enabled else None
+        results.setdefault(enabled, []).append(per_call_us(handler, args.min_seconds))
+    on, off = min(results[True]), min(results[False])
+    print(f"Flask handler, ignored event: {on:.1f} us with metrics, {off:.1f} us without ({on - off:+.1f} us)")
+
+if __name__ == "__main__":
+    main()
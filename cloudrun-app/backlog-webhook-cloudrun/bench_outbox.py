@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the durable outbox
+Measures append latency from request threads while the drainer publishes to
+the local fake publisher, for each SQLite synchronous mode
+"""
+
+import argparse
+import logging
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import build_payload, summarize_latencies
+from fake_pubsub import FakePublisherClient
+from outbox import SQLiteOutbox
+
+def run(synchronous: str, messages: int, threads: int, latency: float) -> tuple:
+    """Append messages from several threads; return (append summary, seconds until drained)"""
+    publisher = FakePublisherClient(latency=latency)
+    payloads = [build_payload(3, seq=seq) for seq in range(messages)]
+    latencies = []
+    lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = SQLiteOutbox(os.path.join(tmp, "outbox.db"),
+                              publish=lambda record: publisher.publish(record.topic, b"x"),
+                              synchronous=synchronous)
+
+        def worker(offset: int):
+            local = []
+            for payload in payloads[offset::threads]:
+                started = time.perf_counter()
+                outbox.append([("comment", "bench", payload, None)])
+                local.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(local)
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        while outbox.stats()["depth"]:
+            time.sleep(0.005)
+        drained_after = time.perf_counter() - started
+        outbox.close()
+    publisher.stop()
+    return summarize_latencies(latencies, elapsed), drained_after
+
+def main():
+    """Compare append latency across synchronous modes"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8, help="appending request threads")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected Pub/Sub latency")
+    parser.add_argument("--modes", default="NORMAL,FULL", help="SQLite synchronous modes")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'mode':<8} {'appends/s':>10} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8} {'max us':>8} {'drained s':>10}")
+    for mode in args.modes.split(","):
+        summary, drained = run(mode, args.messages, args.threads, args.latency_ms / 1000.0)
+        print(f"{mode:<8} {summary['per_second']:>10.0f} {summary['p50_ms'] * 1000:>8.0f} "
+              f"{summary['p95_ms'] * 1000:>8.0f} {summary['p99_ms'] * 1000:>8.0f} "
+              f"{summary['max_ms'] * 1000:>8.0f} {drained:>10.2f}")
+
+if __name__ == "__main__":
+    main()
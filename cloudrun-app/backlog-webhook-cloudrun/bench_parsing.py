@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for webhook payload parsing
+Compares full json/orjson parsing with the raw-body pre-scan used to reject
+non-comment events, on synthetic payloads built from sample.json
+"""
+
+import argparse
+import json
+import sys
+import os
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import build_payload
+from payload_parser import get_decoder, may_match_event_types, orjson
+
+COMMENT_EVENT_TYPES = (3, 4)
+
+def time_per_call(func, raw: bytes, min_seconds: float) -> float:
+    """Return the mean microseconds per call, repeating until min_seconds has passed"""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for _ in range(10):
+            func(raw)
+        calls += 10
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+def main():
+    """Run every strategy over every payload size"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="payload sizes in bytes")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="time spent per measurement")
+    args = parser.parse_args()
+
+    json_loads = get_decoder("json")
+    strategies = [("json.loads", json_loads)]
+    if orjson is not None:
+        strategies.append(("orjson.loads", get_decoder("orjson")))
+    else:
+        print("orjson not installed; skipping orjson strategies")
+    strategies.append(("pre-scan", lambda raw: may_match_event_types(raw, COMMENT_EVENT_TYPES)))
+
+    header = f"{'event':<12} {'bytes':>9} " + " ".join(f"{name + ' us':>16}" for name, _ in strategies)
+    print(header)
+    for size in (int(s) for s in args.sizes.split(",")):
+        for label, event_type in (("issue(1)", 1), ("comment(3)", 3)):
+            raw = json.dumps(build_payload(event_type, size), ensure_ascii=False).encode("utf-8")
+            results = [time_per_call(func, raw, args.min_seconds) for _, func in strategies]
+            print(f"{label:<12} {len(raw):>9} " + " ".join(f"{r:>16.1f}" for r in results))
+
+if __name__ == "__main__":
+    main()
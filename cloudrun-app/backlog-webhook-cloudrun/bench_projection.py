@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for compiled projections
+Compares the hand-written comment extractor that main.py used before
+projections with the extractor compiled from DEFAULT_COMMENT_PROJECTION, and
+a smaller per-consumer projection, by time per call and encoded message size
+"""
+
+import argparse
+import json
+import logging
+import sys
+import os
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "bench-token")
+
+from bench_common import build_payload
+from projection import compile_projection
+
+# A consumer that only needs the comment text and the issue state
+SLIM_PROJECTION = {
+    "commentId": "content.comment.id",
+    "text": {"$path": "content.comment.content", "$default": ""},
+    "issue": {
+        "$root": [{"path": "content", "require": ["id", "summary"]}, "content.issue"],
+        "$optional": True,
+        "id": "id",
+        "summary": "summary",
+        "status": "status.name",
+        "assignee": "assignee.name"
+    },
+    "projectKey": "project.projectKey",
+    "user": {"id": "createdUser.id", "name": "createdUser.name"}
+}
+
+def legacy_extract_comment_data(payload: dict) -> dict:
+    """The hand-written extractor main.py used before projections, without its log line"""
+    content = payload.get("content", {})
+    comment = content.get("comment", {})
+    project = payload.get("project", {})
+    created_user = payload.get("createdUser", {})
+    issue = content if content.get("id") and content.get("summary") else content.get("issue", {})
+    return {
+        "content": {
+            "comment": {
+                "id": comment.get("id"),
+                "content": comment.get("content", ""),
+                "created": comment.get("created"),
+                "updated": comment.get("updated"),
+                "createdUser": created_user
+            },
+            "issue": {
+                "id": issue.get("id"),
+                "issueKey": issue.get("issueKey"),
+                "summary": issue.get("summary")
+            } if issue else None
+        },
+        "project": {
+            "id": project.get("id"),
+            "projectKey": project.get("projectKey"),
+            "name": project.get("name")
+        },
+        "createdUser": created_user,
+        "type": payload.get("type"),
+        "created": payload.get("created")
+    }
+
+def time_per_call(func, payload: dict, min_seconds: float, rounds: int = 5) -> float:
+    """Return the best mean microseconds per call over several rounds of min_seconds / rounds"""
+    best = float("inf")
+    for _ in range(rounds):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            for _ in range(100):
+                func(payload)
+            calls += 100
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds / rounds:
+                break
+        best = min(best, elapsed / calls * 1e6)
+    return best
+
+def main():
+    """Report time per call and message size of each extractor"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="time spent per measurement")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    import main
+
+    payload = build_payload(3)
+    extractors = [
+        ("hand-written", legacy_extract_comment_data),
+        ("compiled default", compile_projection(main.DEFAULT_COMMENT_PROJECTION, "comment")),
+        ("compiled slim", compile_projection(SLIM_PROJECTION, "slim")),
+    ]
+
+    print(f"{'extractor':<18} {'us/call':>8} {'message bytes':>14}")
+    for name, extract in extractors:
+        size = len(json.dumps(extract(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        print(f"{name:<18} {time_per_call(extract, payload, args.min_seconds):>8.2f} {size:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Pub/Sub batching and flow control settings
+Publishes sample comments through a local fake publisher built from each
+settings profile and reports webhooks per second and latency percentiles
+"""
+
+import argparse
+import json
+import sys
+import os
+import threading
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import load_sample_payload, summarize_latencies
+from fake_pubsub import FakePublisherClient
+from publisher_config import load_publisher_settings
+
+# Each profile is the set of environment variables main.py would see
+PROFILES = {
+    "default": {},
+    "unbatched": {"PUBSUB_BATCH_MAX_MESSAGES": "1"},
+    "batch-100-5ms": {"PUBSUB_BATCH_MAX_MESSAGES": "100", "PUBSUB_BATCH_MAX_LATENCY": "0.005"},
+    "batch-500-50ms": {"PUBSUB_BATCH_MAX_MESSAGES": "500", "PUBSUB_BATCH_MAX_LATENCY": "0.05"},
+    "flow-block-50": {"PUBSUB_FLOW_MAX_MESSAGES": "50", "PUBSUB_FLOW_LIMIT_BEHAVIOR": "block"},
+    "flow-error-50": {"PUBSUB_FLOW_MAX_MESSAGES": "50", "PUBSUB_FLOW_LIMIT_BEHAVIOR": "error"},
+}
+
+def run_sync(publisher, payload: dict, requests: int, threads: int) -> tuple:
+    """Emulate gunicorn threads that each wait on future.result() like publish_message()"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                data = json.dumps(payload).encode("utf-8")
+                publisher.publish("projects/bench/topics/bench", data).result()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, errors[0], time.perf_counter() - started
+
+def run_async(publisher, payload: dict, requests: int) -> tuple:
+    """Emulate PUBLISH_MODE=async where the handler never waits on the future"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    done = threading.Semaphore(0)
+
+    def on_done(future, start):
+        if future.exception() is None:
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        done.release()
+
+    started = time.perf_counter()
+    submitted = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            future = publisher.publish("projects/bench/topics/bench", json.dumps(payload).encode("utf-8"))
+        except Exception:
+            errors += 1
+            continue
+        future.add_done_callback(lambda f, s=start: on_done(f, s))
+        submitted += 1
+    for _ in range(submitted):
+        done.acquire()
+    return latencies, errors + (submitted - len(latencies)), time.perf_counter() - started
+
+def main():
+    """Run every profile and print a comparison table"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="webhooks per profile")
+    parser.add_argument("--threads", type=int, default=8, help="request threads in sync mode")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated publish RPC latency")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="comma-separated profile names")
+    args = parser.parse_args()
+
+    payload = load_sample_payload()
+    print(f"mode={args.mode} requests={args.requests} threads={args.threads} rpc_latency={args.latency_ms}ms")
+    print(f"{'profile':<16} {'webhooks/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'RPCs':>6} {'errors':>7}")
+
+    for name in args.profiles.split(","):
+        batch_settings, publisher_options = load_publisher_settings(PROFILES[name])
+        publisher = FakePublisherClient(batch_settings, publisher_options, latency=args.latency_ms / 1000.0)
+        if args.mode == "sync":
+            latencies, errors, elapsed = run_sync(publisher, payload, args.requests, args.threads)
+        else:
+            latencies, errors, elapsed = run_async(publisher, payload, args.requests)
+        publisher.stop()
+
+        summary = summarize_latencies(latencies, elapsed)
+        print(f"{name:<16} {summary['per_second']:>11.1f} {summary['p50_ms']:>8.2f} "
+              f"{summary['p99_ms']:>8.2f} {publisher.rpc_count:>6} {errors:>7}")
+
+if __name__ == "__main__":
+    main()
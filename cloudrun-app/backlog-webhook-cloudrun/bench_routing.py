@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the event routing table
+Measures EventRouter.route for an event no rule matches and for a comment
+event as the number of configured rules grows
+"""
+
+import argparse
+import logging
+import sys
+import os
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import build_payload
+from event_router import EventRouter
+
+def build_rules(count: int) -> list:
+    """The default comment rule plus count-1 rules on other event types and projects"""
+    rules = [{"name": "comment", "types": [3, 4], "where": {"content.comment": {"present": True}},
+              "extractor": "passthrough"}]
+    for i in range(1, count):
+        rules.append({"name": f"rule-{i}", "types": [100 + i % 50], "projects": [f"P{i}"],
+                      "where": {"content.status.id": {"in": [1, 2]}}, "topic": f"topic-{i}"})
+    return rules
+
+def time_per_call(func, payload: dict, min_seconds: float) -> float:
+    """Return the mean microseconds per call, repeating until min_seconds has passed"""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        for _ in range(100):
+            func(payload)
+        calls += 100
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+def main():
+    """Report route() cost per rule count"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", default="1,10,100,1000", help="rule counts to measure")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="time spent per measurement")
+    args = parser.parse_args()
+
+    # route() logs every match; keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+    unmatched = build_payload(1)
+    comment = build_payload(3)
+
+    print(f"{'rules':>6} {'unmatched us':>13} {'comment us':>11}")
+    for count in (int(c) for c in args.rules.split(",")):
+        router = EventRouter(build_rules(count), default_topic="bench")
+        print(f"{count:>6} {time_per_call(router.route, unmatched, args.min_seconds):>13.2f} "
+              f"{time_per_call(router.route, comment, args.min_seconds):>11.2f}")
+
+if __name__ == "__main__":
+    main()
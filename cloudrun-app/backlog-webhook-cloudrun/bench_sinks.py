@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the message sinks
+Publishes the sample comment through each sink from several threads, waiting
+for every message like publish_message() does, and reports the per-message
+latency from publish() until the future resolves. The HTTP sinks push to a
+local keep-alive server; "pubsub (fake)" is the fake publisher with the given
+RPC latency, standing in for the Pub/Sub hop the direct push skips. The local
+server shares the benchmark process, so HTTP latencies with many threads are
+pessimistic.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import load_sample_payload, summarize_latencies
+from fake_pubsub import FakePublisherClient
+from sinks import FileSink, HttpPushSink, MemorySink
+
+TOPIC = "projects/bench/topics/backlog-webhook-processor"
+
+def start_server(latency: float) -> ThreadingHTTPServer:
+    """Start a local push endpoint answering 204 after ``latency`` seconds"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            if latency:
+                time.sleep(latency)
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run(sink, data: bytes, messages: int, threads: int) -> dict:
+    """Publish ``messages`` from ``threads`` threads, each waiting for its future"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [messages]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                sink.publish(TOPIC, data, encoding="json").result()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    summary = summarize_latencies(latencies, time.perf_counter() - started)
+    summary["errors"] = errors[0]
+    return summary
+
+def main():
+    """Compare publish latency across sinks"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent publishers, like gunicorn --threads")
+    parser.add_argument("--pubsub-latency-ms", type=float, default=20.0, help="RPC latency of the fake publisher")
+    parser.add_argument("--http-latency-ms", type=float, default=0.0, help="processing time of the push endpoint")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    data = json.dumps(load_sample_payload(), ensure_ascii=False).encode("utf-8")
+    server = start_server(args.http_latency_ms / 1000.0)
+    url = f"http://127.0.0.1:{server.server_port}/push"
+
+    def http_without_keepalive():
+        sink = HttpPushSink(url, pool_size=args.threads)
+        sink._session.headers["Connection"] = "close"
+        return sink
+
+    with tempfile.TemporaryDirectory() as root:
+        sinks = [
+            ("memory", MemorySink),
+            ("file", lambda: FileSink(os.path.join(root, "messages.ndjson"))),
+            ("http keep-alive", lambda: HttpPushSink(url, pool_size=args.threads)),
+            ("http new conn", http_without_keepalive),
+            ("pubsub (fake)", lambda: FakePublisherClient(latency=args.pubsub_latency_ms / 1000.0)),
+        ]
+        print(f"{'sink':<16} {'msgs/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}")
+        for name, factory in sinks:
+            sink = factory()
+            summary = run(sink, data, args.messages, args.threads)
+            sink.stop()
+            print(f"{name:<16} {summary['per_second']:>9.0f} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+                  f"{summary['p99_ms']:>8.2f} {summary['max_ms']:>8.2f} {summary['errors']:>6}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
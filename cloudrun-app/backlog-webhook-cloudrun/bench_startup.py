@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the webhook service
+Measures the import cost of main.py with -X importtime, the time from
+launching gunicorn (same flags as the Dockerfile) to the first 200 on /
+(liveness), and the time until /ready reports the warm-up as completed, using
+the in-memory fake publisher so no GCP credentials are needed.
+Exits with status 1 when a configured budget is exceeded.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure_imports(top: int) -> tuple:
+    """Return (cumulative ms for importing main, slowest top-level imports)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR, capture_output=True, text=True, env=dict(os.environ, WARMUP_ON_START="false")
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+
+    main_us = 0
+    entries = []
+    block = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Children are printed before their parent; indentation gives the nesting depth
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                main_us = int(cumulative)
+                entries = [entry for entry_depth, entry in block if entry_depth == 1]
+            block = []
+        else:
+            block.append((depth, (int(cumulative), name.strip())))
+    entries.sort(reverse=True)
+    return main_us / 1000.0, [(us / 1000.0, name) for us, name in entries[:top]]
+
+def free_port() -> int:
+    """Pick an unused local port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_first_200(timeout: float, path: str = "/") -> float:
+    """Start gunicorn like the Dockerfile does and return ms until path answers 200"""
+    port = free_port()
+    command = [
+        sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", "1",
+        "--threads", "8", "--timeout", "0", "--preload", "--log-level", "warning", "main:app"
+    ]
+    started = time.perf_counter()
+    env = dict(os.environ, PUBLISHER_BACKEND="fake")
+    env.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "bench-token")
+    process = subprocess.Popen(command, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000.0
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"no 200 from {path} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def main():
+    """Run the cold-start measurements and enforce the budgets"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="gunicorn launches; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--import-budget-ms", type=float,
+                        default=float(os.environ.get("IMPORT_BUDGET_MS", "400")))
+    parser.add_argument("--cold-start-budget-ms", type=float,
+                        default=float(os.environ.get("COLD_START_BUDGET_MS", "1500")))
+    parser.add_argument("--ready-budget-ms", type=float,
+                        default=float(os.environ.get("READY_BUDGET_MS", "3000")))
+    args = parser.parse_args()
+
+    import_ms, slowest = measure_imports(args.top)
+    print(f"import main: {import_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for ms, name in slowest:
+        print(f"  {ms:>8.1f} ms  {name}")
+
+    samples = [measure_first_200(timeout=30) for _ in range(args.runs)]
+    first_200_ms = sorted(samples)[len(samples) // 2]
+    print(f"time to first 200 on /: {first_200_ms:.1f} ms median of {args.runs} "
+          f"(budget {args.cold_start_budget_ms:.0f} ms, samples {', '.join(f'{s:.0f}' for s in samples)})")
+
+    samples = [measure_first_200(timeout=30, path="/ready") for _ in range(args.runs)]
+    ready_ms = sorted(samples)[len(samples) // 2]
+    print(f"time to ready (200 on /ready): {ready_ms:.1f} ms median of {args.runs} "
+          f"(budget {args.ready_budget_ms:.0f} ms, samples {', '.join(f'{s:.0f}' for s in samples)})")
+
+    over_budget = []
+    if import_ms > args.import_budget_ms:
+        over_budget.append("import")
+    if first_200_ms > args.cold_start_budget_ms:
+        over_budget.append("time to first 200")
+    if ready_ms > args.ready_budget_ms:
+        over_budget.append("time to ready")
+    if over_budget:
+        print(f"❌ Cold-start budget exceeded: {', '.join(over_budget)}")
+        return False
+    print("✅ Cold-start within budget")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
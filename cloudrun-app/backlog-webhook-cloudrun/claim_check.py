@@ -0,0 +1,230 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+# Pub/Sub attribute set on messages whose comment body was moved to the blob store
+CLAIM_CHECK_ATTRIBUTE = "claim_check"
+
+# Every offloaded body is stored as UTF-8 text
+CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+class LocalBlobStore:
+    """Blob store on the local filesystem, for tests and local development."""
+
+    def __init__(self, root: str):
+        """Create the store.
+
+        Args:
+            root: Directory the blobs are written to; created if missing
+        """
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def put(self, name: str, data: bytes) -> str:
+        """Write a blob and return its URI.
+
+        The file is written under a temporary name and renamed, so readers never
+        see a partial blob.
+        """
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return f"file://{path}"
+
+    def get(self, uri: str) -> bytes:
+        """Read a blob written by ``put``."""
+        if not uri.startswith("file://"):
+            raise ValueError(f"Not a local blob URI: {uri}")
+        with open(uri[len("file://"):], "rb") as f:
+            return f.read()
+
+
+class GCSBlobStore:
+    """Blob store in a Cloud Storage bucket.
+
+    The storage client is created on first use, so importing the library and
+    opening connections happens in the gunicorn worker rather than at import.
+    """
+
+    def __init__(self, bucket: str, client=None):
+        """Create the store.
+
+        Args:
+            bucket: Bucket name
+            client: ``google.cloud.storage.Client``; created on first use if omitted
+        """
+        self.bucket_name = bucket
+        self._client = client
+        self._bucket = None
+        self._lock = threading.Lock()
+
+    def _get_bucket(self):
+        if self._bucket is None:
+            with self._lock:
+                if self._bucket is None:
+                    if self._client is None:
+                        try:
+                            from google.cloud import storage
+                        except ImportError:
+                            raise ImportError("CLAIM_CHECK_BACKEND=gcs requires the 'google-cloud-storage' package")
+                        self._client = storage.Client()
+                    self._bucket = self._client.bucket(self.bucket_name)
+        return self._bucket
+
+    def put(self, name: str, data: bytes) -> str:
+        """Upload a blob and return its ``gs://`` URI.
+
+        The upload only creates the object. Blobs are named by their content, so
+        an existing object already holds the same data, and the service account
+        needs no permission to overwrite.
+        """
+        from google.api_core.exceptions import PreconditionFailed
+        try:
+            self._get_bucket().blob(name).upload_from_string(data, content_type=CONTENT_TYPE, if_generation_match=0)
+        except PreconditionFailed:
+            pass
+        return f"gs://{self.bucket_name}/{name}"
+
+    def get(self, uri: str) -> bytes:
+        """Download a blob written by ``put``."""
+        prefix = f"gs://{self.bucket_name}/"
+        if not uri.startswith(prefix):
+            raise ValueError(f"Not a blob URI of bucket {self.bucket_name}: {uri}")
+        return self._get_bucket().blob(uri[len(prefix):]).download_as_bytes()
+
+
+class ClaimCheck:
+    """Moves oversized comment bodies out of published messages.
+
+    A message whose ``content.comment.content`` exceeds ``threshold_bytes`` in
+    UTF-8 is published with the body set to null and a ``contentRef`` object
+    next to it holding the blob URI, the SHA-256 of the body and its size.
+    Blobs are named by that hash, so publishing the same body again (retries,
+    outbox redelivery, edits that restore a text) reuses the same blob. Smaller comments and messages without a comment body are
+    returned unchanged.
+    """
+
+    def __init__(self, store, threshold_bytes: int, prefix: str = "comments/"):
+        """Create the claim check.
+
+        Args:
+            store: Blob store with ``put(name, data) -> uri``
+            threshold_bytes: Largest comment body, in UTF-8 bytes, that stays inline
+            prefix: Prefix of the blob names
+        """
+        self.store = store
+        self.threshold_bytes = threshold_bytes
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._inline = 0
+        self._offloaded = 0
+        self._offloaded_bytes = 0
+        self._errors = 0
+
+    def apply(self, message: dict) -> dict:
+        """Return the message to publish, with the comment body offloaded if it is too large.
+
+        The given message is never modified; an offloaded message is a copy
+        sharing everything but the objects on the path to the comment.
+
+        Raises:
+            Exception: If the blob store write fails
+        """
+        content = message.get("content")
+        comment = content.get("comment") if isinstance(content, dict) else None
+        text = comment.get("content") if isinstance(comment, dict) else None
+        if not isinstance(text, str):
+            return message
+        # A character takes at most 4 bytes, so short bodies need no encoding to decide
+        if len(text) * 4 <= self.threshold_bytes:
+            self._count("_inline")
+            return message
+        data = text.encode("utf-8")
+        if len(data) <= self.threshold_bytes:
+            self._count("_inline")
+            return message
+
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            uri = self.store.put(f"{self.prefix}{digest}", data)
+        except Exception as e:
+            self._count("_errors")
+            logging.error(f"Failed to store comment body of {len(data)} bytes: {e}")
+            raise
+        with self._lock:
+            self._offloaded += 1
+            self._offloaded_bytes += len(data)
+        logging.info(f"Comment body of {len(data)} bytes stored at {uri}: comment_id={comment.get('id')}")
+        return {**message, "content": {**content, "comment": {
+            **comment,
+            "content": None,
+            "contentRef": {"uri": uri, "sha256": digest, "bytes": len(data), "contentType": CONTENT_TYPE}
+        }}}
+
+    def stats(self) -> dict:
+        """Return claim check counters for monitoring."""
+        with self._lock:
+            checked = self._inline + self._offloaded
+            return {"threshold_bytes": self.threshold_bytes, "inline": self._inline,
+                    "offloaded": self._offloaded, "offloaded_bytes": self._offloaded_bytes,
+                    "errors": self._errors, "hit_rate": self._offloaded / checked if checked else 0.0}
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def resolve_comment_content(message: dict, store) -> Optional[str]:
+    """Return the comment body of a consumed message, fetching it from the store if it was offloaded.
+
+    Args:
+        message: The decoded message
+        store: Blob store with ``get(uri) -> bytes``
+
+    Returns:
+        Optional[str]: The comment body, or None if the message has none
+
+    Raises:
+        ValueError: If the fetched blob does not match the hash in the reference
+    """
+    comment = (message.get("content") or {}).get("comment") or {}
+    ref = comment.get("contentRef")
+    if ref is None:
+        return comment.get("content")
+    data = store.get(ref["uri"])
+    if hashlib.sha256(data).hexdigest() != ref["sha256"]:
+        raise ValueError(f"Comment body at {ref['uri']} does not match its sha256")
+    return data.decode("utf-8")
+
+
+def create_blob_store(backend: str, bucket: Optional[str] = None, path: Optional[str] = None):
+    """Create the blob store selected by configuration.
+
+    Args:
+        backend: "gcs" or "local"
+        bucket: Bucket name for the gcs backend
+        path: Directory for the local backend
+
+    Raises:
+        ValueError: If the backend is unknown or its location is not set
+    """
+    if backend == "gcs":
+        if not bucket:
+            raise ValueError("CLAIM_CHECK_BUCKET must be set when CLAIM_CHECK_BACKEND=gcs")
+        return GCSBlobStore(bucket)
+    if backend == "local":
+        if not path:
+            raise ValueError("CLAIM_CHECK_PATH must be set when CLAIM_CHECK_BACKEND=local")
+        return LocalBlobStore(path)
+    raise ValueError(f"Unknown CLAIM_CHECK_BACKEND: {backend}")
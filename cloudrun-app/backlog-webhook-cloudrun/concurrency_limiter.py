@@ -0,0 +1,118 @@
+import logging
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on the number of webhook requests handled at the same time.
+
+    Each completed request that finished within ``latency_target`` and did not
+    fail raises the limit by about one per ``limit`` completions (additive
+    increase), but only while the limit is actually being used. A slow or failed
+    request multiplies the limit by ``backoff`` (multiplicative decrease); only
+    requests that started after the previous decrease can trigger another one,
+    so a burst of slow completions shrinks the limit once rather than collapsing it.
+
+    Requests over the limit are rejected at once instead of waiting for a
+    thread, which keeps threads free for health checks while Pub/Sub is slow.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial_limit: Optional[int] = None,
+                 latency_target: float = 1.0, backoff: float = 0.7, smoothing: float = 0.2,
+                 clock: Callable[[], float] = time.monotonic):
+        """Create a limiter.
+
+        Args:
+            max_limit: Upper bound of the limit; keep it below the worker's thread count
+            min_limit: Lower bound of the limit
+            initial_limit: Starting limit, defaults to max_limit
+            latency_target: Request latency in seconds above which the limit is reduced
+            backoff: Factor applied to the limit on a slow or failed request
+            smoothing: Weight of the newest sample in the latency moving average
+            clock: Monotonic clock, replaceable in tests
+
+        Raises:
+            ValueError: If the bounds or factors are inconsistent
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Concurrency limits must satisfy 1 <= min ({min_limit}) <= max ({max_limit})")
+        if not 0 < backoff < 1:
+            raise ValueError(f"Concurrency limit backoff must be between 0 and 1, got {backoff}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._limit = float(initial_limit if initial_limit is not None else max_limit)
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._latency = 0.0
+        self._accepted = 0
+        self._rejected = 0
+        self._decreases = 0
+
+    def acquire(self) -> Optional[float]:
+        """Admit a request if the limit allows it.
+
+        Returns:
+            Optional[float]: A permit to pass to ``release``, or None if the request must be shed
+        """
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                self._rejected += 1
+                return None
+            self._in_flight += 1
+            self._accepted += 1
+        return self._clock()
+
+    def release(self, permit: float, success: bool = True) -> None:
+        """Finish an admitted request and adapt the limit to its outcome.
+
+        Args:
+            permit: The value returned by ``acquire``
+            success: False if the request failed in a way that suggests overload
+        """
+        now = self._clock()
+        latency = now - permit
+        decreased = None
+        with self._lock:
+            in_flight = self._in_flight
+            self._in_flight -= 1
+            self._latency += self.smoothing * (latency - self._latency)
+            if not success or latency > self.latency_target:
+                if permit >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = now
+                    self._decreases += 1
+                    decreased = self._limit
+            elif in_flight * 2 >= self._limit:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+        if decreased is not None:
+            logging.warning("Concurrency limit lowered to %d (latency %.3fs, success=%s)",
+                            int(decreased), latency, success)
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait, based on the recent request latency."""
+        return max(1, math.ceil(self._latency))
+
+    def stats(self) -> dict:
+        """Return the limiter state for monitoring.
+
+        Returns:
+            dict: Current limit, in-flight, accepted, rejected and decrease counts,
+            and the smoothed latency in seconds
+        """
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "decreases": self._decreases,
+                "latency_seconds": self._latency,
+            }
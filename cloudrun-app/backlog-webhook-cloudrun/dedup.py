@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Stored while the first delivery is still being published
+PENDING = ""
+
+
+def make_dedup_key(payload: dict) -> str:
+    """Build the duplicate-delivery key for a comment webhook.
+
+    Retries of the same delivery share the payload ``id``; the comment ID and
+    its ``updated`` timestamp tell distinct edits of one comment apart.
+
+    Args:
+        payload: The webhook payload
+
+    Returns:
+        str: The dedup key
+    """
+    # Backlog sends "content" or "comment" as null for some event types
+    comment = (payload.get("content") or {}).get("comment") or {}
+    return f"{payload.get('id')}:{comment.get('id')}:{comment.get('updated') or ''}"
+
+
+class MemoryDedupStore:
+    """Bounded LRU cache with TTL recording which deliveries were published.
+
+    Entries hold the Pub/Sub message ID of the first delivery, or ``PENDING``
+    while it is still in flight.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        """Create an in-memory store.
+
+        Args:
+            max_entries: Maximum number of keys kept; the least recently used are evicted
+            ttl: Seconds a key is remembered
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def claim(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Atomically claim a key for publishing.
+
+        Args:
+            key: The dedup key
+
+        Returns:
+            Tuple[bool, Optional[str]]: (True, None) if the caller should publish, or
+            (False, message_id) for a duplicate, where message_id is ``PENDING``
+            while the first delivery is in flight
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return False, entry[0]
+            self._misses += 1
+            self._entries[key] = (PENDING, now + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return True, None
+
+    def complete(self, key: str, message_id: str) -> None:
+        """Record the message ID of a published delivery."""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (message_id, time.monotonic() + self._ttl)
+
+    def release(self, key: str) -> None:
+        """Forget a claimed key after a failed publish so a retry can go through."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        """Return store counters for monitoring."""
+        with self._lock:
+            return {"backend": "memory", "hits": self._hits, "misses": self._misses,
+                    "evictions": self._evictions, "entries": len(self._entries)}
+
+
+class RedisDedupStore:
+    """Dedup store shared across Cloud Run instances through Redis.
+
+    Works with any client offering ``set(key, value, nx=, ex=)``, ``get`` and
+    ``delete``, such as ``redis.Redis`` or the local ``fake_redis`` stand-in.
+    Redis errors fail open: the delivery is treated as new and published.
+    """
+
+    def __init__(self, client, ttl: float = 600.0, prefix: str = "backlog-webhook:dedup:"):
+        """Create a Redis-backed store.
+
+        Args:
+            client: Redis client
+            ttl: Seconds a key is remembered
+            prefix: Prefix added to every key
+        """
+        self._client = client
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    def claim(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Atomically claim a key for publishing. See ``MemoryDedupStore.claim``."""
+        redis_key = self._prefix + key
+        try:
+            if self._client.set(redis_key, PENDING, nx=True, ex=self._ttl):
+                self._count("_misses")
+                return True, None
+            existing = self._client.get(redis_key)
+        except Exception as e:
+            self._count("_errors")
+            logging.warning(f"Dedup store unavailable, publishing without dedup: {e}")
+            return True, None
+        if existing is None:
+            # Expired between SET NX and GET; treat as a new delivery
+            self._count("_misses")
+            return True, None
+        self._count("_hits")
+        return False, existing.decode("utf-8") if isinstance(existing, bytes) else existing
+
+    def complete(self, key: str, message_id: str) -> None:
+        """Record the message ID of a published delivery."""
+        try:
+            self._client.set(self._prefix + key, message_id, ex=self._ttl)
+        except Exception as e:
+            self._count("_errors")
+            logging.warning(f"Failed to record published delivery in dedup store: {e}")
+
+    def release(self, key: str) -> None:
+        """Forget a claimed key after a failed publish so a retry can go through."""
+        try:
+            self._client.delete(self._prefix + key)
+        except Exception as e:
+            self._count("_errors")
+            logging.warning(f"Failed to release dedup key: {e}")
+
+    def stats(self) -> dict:
+        """Return store counters for monitoring."""
+        with self._lock:
+            return {"backend": "redis", "hits": self._hits, "misses": self._misses, "errors": self._errors}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+def create_dedup_store(backend: str, max_entries: int, ttl: float, redis_url: Optional[str] = None):
+    """Create the dedup store selected by configuration.
+
+    Args:
+        backend: "memory" or "redis"
+        max_entries: Size bound for the memory backend
+        ttl: Seconds a delivery is remembered
+        redis_url: Connection URL for the redis backend
+
+    Returns:
+        MemoryDedupStore or RedisDedupStore
+
+    Raises:
+        ValueError: If the backend is unknown or redis is selected without a URL
+        ImportError: If the redis backend is selected but the redis package is missing
+    """
+    if backend == "memory":
+        return MemoryDedupStore(max_entries=max_entries, ttl=ttl)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL must be set when DEDUP_BACKEND=redis")
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("DEDUP_BACKEND=redis requires the 'redis' package")
+        return RedisDedupStore(redis.Redis.from_url(redis_url, socket_timeout=0.2), ttl=ttl)
+    raise ValueError(f"Unknown DEDUP_BACKEND: {backend}")
@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from log_config import REQUEST_LOGGER
+
+# Sentinel for a missing field in predicates
+_MISSING = object()
+
+# Routing decisions are request logs, sampled with LOG_SAMPLE_RATES like the rest of the request path
+_log = logging.getLogger(REQUEST_LOGGER)
+
+
+class RoutedMessage(NamedTuple):
+    """A message produced by one routing rule for one event."""
+    rule: str
+    topic: str
+    message: dict
+    # Extra Pub/Sub attributes, e.g. the event time and trace context
+    attributes: Optional[dict] = None
+
+
+def passthrough(payload: dict) -> dict:
+    """Extractor that publishes the webhook payload unchanged."""
+    return payload
+
+
+# Extractors available to every router; callers add their own (e.g. "comment")
+BUILTIN_EXTRACTORS = {"passthrough": passthrough}
+
+
+def load_route_rules(environ=None) -> Optional[list]:
+    """Load routing rules from EVENT_ROUTES_FILE or EVENT_ROUTES.
+
+    Both hold a JSON list of rules; the file takes precedence.
+
+    Args:
+        environ: Mapping to read variables from (defaults to os.environ)
+
+    Returns:
+        Optional[list]: The rule definitions, or None if none are configured
+
+    Raises:
+        ValueError: If the configuration is not a JSON list
+    """
+    if environ is None:
+        environ = os.environ
+    path = environ.get("EVENT_ROUTES_FILE")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        source = path
+    elif environ.get("EVENT_ROUTES"):
+        rules = json.loads(environ["EVENT_ROUTES"])
+        source = "EVENT_ROUTES"
+    else:
+        return None
+    if not isinstance(rules, list):
+        raise ValueError(f"{source} must contain a JSON list of routing rules")
+    return rules
+
+
+def _field_getter(path: str) -> Callable[[dict], object]:
+    keys = path.split(".")
+
+    def get(payload: dict):
+        value = payload
+        for key in keys:
+            if not isinstance(value, dict):
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+    return get
+
+
+def _compile_predicate(rule_name: str, path: str, condition) -> Callable[[dict], bool]:
+    get = _field_getter(path)
+    if not isinstance(condition, dict):
+        return lambda payload: get(payload) == condition
+    if len(condition) != 1:
+        raise ValueError(f"Route {rule_name}: condition on {path} must have exactly one operator")
+    operator, operand = next(iter(condition.items()))
+    if operator == "eq":
+        return lambda payload: get(payload) == operand
+    if operator == "in":
+        values = list(operand)
+        return lambda payload: get(payload) in values
+    if operator == "present":
+        # Present means set to a non-empty value, the same test is_comment_event applies to the comment
+        wanted = bool(operand)
+        return lambda payload: (get(payload) not in (_MISSING, None, "", {}, [])) == wanted
+    raise ValueError(f"Route {rule_name}: unknown operator {operator!r} on {path}")
+
+
+class _CompiledRule(NamedTuple):
+    name: str
+    topic: str
+    projects: Optional[frozenset]
+    predicates: tuple
+    extractor: Callable[[dict], dict]
+
+    def matches(self, payload: dict) -> bool:
+        if self.projects is not None and (payload.get("project") or {}).get("projectKey") not in self.projects:
+            return False
+        return all(predicate(payload) for predicate in self.predicates)
+
+
+class EventRouter:
+    """Routes webhook events to topics according to declarative rules.
+
+    Each rule may restrict the event ``types``, the ``projects`` (by
+    ``project.projectKey``) and further ``where`` field predicates, and names the
+    ``topic`` and ``extractor`` used for matching events. An event is published
+    once for every matching rule, in rule order.
+
+    Rules are compiled once into a dict keyed by event type, so an event whose
+    type no rule mentions costs a single dict lookup however many rules exist.
+    """
+
+    def __init__(self, rules: Iterable[dict], default_topic: str,
+                 extractors: Optional[Dict[str, Callable[[dict], dict]]] = None):
+        """Compile routing rules.
+
+        Args:
+            rules: Rule definitions, e.g. ``{"name": "comments", "types": [3, 4],
+                "projects": ["NEKO"], "where": {"content.comment": {"present": true}},
+                "topic": "backlog-webhook-processor", "extractor": "comment"}``
+            default_topic: Topic for rules that do not name one
+            extractors: Extractor functions by name, in addition to the built-in ones
+
+        Raises:
+            ValueError: If a rule is malformed or names an unknown extractor
+        """
+        available = dict(BUILTIN_EXTRACTORS, **(extractors or {}))
+        by_type: Dict[int, List[_CompiledRule]] = {}
+        any_type: List[tuple] = []
+        self.rules = []
+
+        for position, rule in enumerate(rules):
+            name = rule.get("name") or f"rule-{position}"
+            unknown = set(rule) - {"name", "types", "projects", "where", "topic", "extractor"}
+            if unknown:
+                raise ValueError(f"Route {name}: unknown keys {sorted(unknown)}")
+            extractor_name = rule.get("extractor", "passthrough")
+            if extractor_name not in available:
+                raise ValueError(f"Route {name}: unknown extractor {extractor_name!r}")
+            projects = rule.get("projects")
+            compiled = _CompiledRule(
+                name=name,
+                topic=rule.get("topic") or default_topic,
+                projects=frozenset(projects) if projects is not None else None,
+                predicates=tuple(_compile_predicate(name, path, condition)
+                                 for path, condition in (rule.get("where") or {}).items()),
+                extractor=available[extractor_name]
+            )
+            self.rules.append(compiled)
+            types = rule.get("types")
+            if types is None:
+                any_type.append((position, compiled))
+            else:
+                for event_type in types:
+                    by_type.setdefault(int(event_type), []).append((position, compiled))
+
+        # Merge rules without a type restriction into every type's list, keeping rule order
+        self._any_type = tuple(compiled for _, compiled in any_type)
+        self._by_type = {
+            event_type: tuple(compiled for _, compiled in sorted(entries + any_type, key=lambda e: e[0]))
+            for event_type, entries in by_type.items()
+        }
+
+    @property
+    def accepted_types(self) -> Optional[frozenset]:
+        """Event types some rule can match, or None if a rule accepts any type."""
+        if self._any_type:
+            return None
+        return frozenset(self._by_type)
+
+    def route(self, payload: dict) -> List[RoutedMessage]:
+        """Return the messages to publish for an event.
+
+        Args:
+            payload: The webhook payload
+
+        Returns:
+            List[RoutedMessage]: One entry per matching rule; empty if the event is ignored
+
+        Raises:
+            Exception: If an extractor fails
+        """
+        event_type = payload.get("type")
+        if isinstance(event_type, int):
+            candidates = self._by_type.get(event_type, self._any_type)
+        else:
+            candidates = self._any_type
+        routed = []
+        for rule in candidates:
+            if rule.matches(payload):
+                routed.append(RoutedMessage(rule.name, rule.topic, rule.extractor(payload)))
+        if routed and _log.isEnabledFor(logging.INFO):
+            _log.info("Event type=%s routed to %s", payload.get("type"),
+                      ", ".join(f"{r.rule}->{r.topic}" for r in routed))
+        return routed
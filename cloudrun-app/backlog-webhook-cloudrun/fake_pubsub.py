@@ -0,0 +1,160 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher.exceptions import FlowControlLimitError
+
+
+class _Batch:
+    def __init__(self):
+        self.messages = []
+        self.size = 0
+
+
+class FakePublisherClient:
+    """In-memory stand-in for ``pubsub_v1.PublisherClient``.
+
+    Mimics the parts of the real client that matter for throughput: messages
+    are grouped into batches according to ``BatchSettings``, each batch costs
+    one simulated RPC of ``latency`` seconds, and ``PublishFlowControl`` limits
+    are enforced with the same ignore/block/error behaviours.
+    """
+
+    def __init__(self, batch_settings: Optional[types.BatchSettings] = None,
+                 publisher_options: Optional[types.PublisherOptions] = None,
+                 latency: float = 0.0, record: bool = False, max_rpc_concurrency: int = 64):
+        """Create a fake publisher.
+
+        Args:
+            batch_settings: Batching thresholds, defaults to the library defaults
+            publisher_options: Publisher options carrying the flow control settings
+            latency: Simulated duration of one publish RPC in seconds
+            record: Keep every published message in ``messages`` for inspection
+            max_rpc_concurrency: Number of simulated RPCs that can run at the same time
+        """
+        self.batch_settings = batch_settings or types.BatchSettings()
+        self.publisher_options = publisher_options or types.PublisherOptions()
+        self.latency = latency
+        self.record = record
+        self.messages = []
+        self.rpc_count = 0
+        self.published_count = 0
+
+        self._flow = self.publisher_options.flow_control
+        self._cond = threading.Condition()
+        self._batches = {}
+        self._outstanding_messages = 0
+        self._outstanding_bytes = 0
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=max_rpc_concurrency,
+                                            thread_name_prefix="fake-pubsub")
+        self._stopped = False
+
+    @staticmethod
+    def topic_path(project: str, topic: str) -> str:
+        """Return the fully qualified topic path like the real client."""
+        return f"projects/{project}/topics/{topic}"
+
+    def get_topic(self, request: dict, timeout: Optional[float] = None, **kwargs) -> dict:
+        """Answer a topic lookup after one simulated RPC, like the warm-up call of the real client."""
+        time.sleep(self.latency)
+        return {"name": request["topic"]}
+
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs) -> Future:
+        """Queue a message into the current batch for ``topic``.
+
+        Returns:
+            Future: Resolves to the message ID once the simulated RPC completes
+
+        Raises:
+            FlowControlLimitError: If flow control is set to error and the limit is exceeded
+            RuntimeError: If the client has been stopped
+            ValueError: If an ordering key is given but message ordering is not enabled
+        """
+        if ordering_key and not self.publisher_options.enable_message_ordering:
+            raise ValueError("Cannot publish a message with an ordering key when message ordering is not enabled.")
+        future = Future()
+        size = len(data)
+        to_flush = None
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Cannot publish on a stopped publisher.")
+            self._acquire_flow(size)
+
+            batch = self._batches.get(topic)
+            if batch is None:
+                batch = self._batches[topic] = _Batch()
+                timer = threading.Timer(self.batch_settings.max_latency, self._flush_on_timer, (topic, batch))
+                timer.daemon = True
+                timer.start()
+            batch.messages.append((data, ordering_key, attrs, future))
+            batch.size += size
+
+            if (len(batch.messages) >= self.batch_settings.max_messages
+                    or batch.size >= self.batch_settings.max_bytes):
+                to_flush = self._batches.pop(topic)
+
+        if to_flush is not None:
+            self._executor.submit(self._send, topic, to_flush)
+        return future
+
+    def resume_publish(self, topic: str, ordering_key: str) -> None:
+        """Accept the resume call made after a failed ordered publish; the fake never pauses keys."""
+
+    def stop(self) -> None:
+        """Flush every pending batch and wait for the simulated RPCs to finish."""
+        with self._cond:
+            self._stopped = True
+            pending = list(self._batches.items())
+            self._batches.clear()
+        for topic, batch in pending:
+            self._executor.submit(self._send, topic, batch)
+        self._executor.shutdown(wait=True)
+
+    def _acquire_flow(self, size: int) -> None:
+        behavior = self._flow.limit_exceeded_behavior
+        if behavior == types.LimitExceededBehavior.IGNORE:
+            self._outstanding_messages += 1
+            self._outstanding_bytes += size
+            return
+
+        def exceeded():
+            return (self._outstanding_messages + 1 > self._flow.message_limit
+                    or self._outstanding_bytes + size > self._flow.byte_limit)
+
+        if exceeded():
+            if behavior == types.LimitExceededBehavior.ERROR or self._outstanding_messages == 0:
+                raise FlowControlLimitError("Flow control limits would be exceeded.")
+            while exceeded():
+                self._cond.wait()
+        self._outstanding_messages += 1
+        self._outstanding_bytes += size
+
+    def _flush_on_timer(self, topic: str, batch: _Batch) -> None:
+        with self._cond:
+            if self._batches.get(topic) is not batch:
+                return
+            del self._batches[topic]
+        self._send(topic, batch)
+
+    def _send(self, topic: str, batch: _Batch) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._cond:
+            self.rpc_count += 1
+            self.published_count += len(batch.messages)
+            self._outstanding_messages -= len(batch.messages)
+            self._outstanding_bytes -= batch.size
+            results = []
+            for data, ordering_key, attrs, future in batch.messages:
+                message_id = str(next(self._ids))
+                if self.record:
+                    self.messages.append({"topic": topic, "data": data, "ordering_key": ordering_key,
+                                          "attributes": attrs, "message_id": message_id})
+                results.append((future, message_id))
+            self._cond.notify_all()
+        for future, message_id in results:
+            future.set_result(message_id)
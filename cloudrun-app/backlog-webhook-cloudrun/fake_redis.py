@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class FakeRedis:
+    """Thread-safe in-memory stand-in for the subset of ``redis.Redis`` used here.
+
+    Values are stored as bytes and keys expire like in Redis. Several
+    ``FakeRedis`` users sharing one instance behave like several Cloud Run
+    instances sharing one Redis server.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            expires_at = time.monotonic() + ex if ex else None
+            self._data[key] = (self._encode(value), expires_at)
+            return True
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            value = self._live(key)
+            expires_at = self._data[key][1] if value is not None else None
+            count = (int(value) if value is not None else 0) + amount
+            self._data[key] = (self._encode(count), expires_at)
+            return count
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if self._live(key) is None:
+                return False
+            self._data[key] = (self._data[key][0], time.monotonic() + seconds)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode("utf-8")
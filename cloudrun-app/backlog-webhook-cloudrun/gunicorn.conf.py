@@ -0,0 +1,30 @@
+# Gunicorn loads ./gunicorn.conf.py automatically; command-line flags in the Dockerfile still apply.
+import math
+import os
+import signal
+
+# Time the master gives workers after SIGTERM before killing them: the drain deadline
+# (main.SHUTDOWN_DEADLINE) plus a second to stop the publisher and write the last logs
+graceful_timeout = math.ceil(float(os.environ.get("SHUTDOWN_DEADLINE_SECONDS", "8"))) + 1
+
+def post_worker_init(worker):
+    """Warm up GCP clients in the background once the worker is serving, and hook SIGTERM."""
+    import main
+    if main.WARMUP_ON_START:
+        main.start_warmup()
+
+    # Reject new webhooks as soon as SIGTERM arrives; gunicorn then finishes the
+    # requests in flight before worker_exit drains the publisher
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def handle_sigterm(sig, frame):
+        main.begin_shutdown()
+        handle_exit(sig, frame)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+def worker_exit(server, worker):
+    """Flush buffered messages before the worker process exits."""
+    import main
+    from log_config import shutdown_logging
+    main.shutdown()
+    shutdown_logging()
@@ -0,0 +1,231 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+# Message classes: the request path logs through these loggers so each class
+# can be sampled on its own; everything else keeps using the root logger
+REQUEST_LOGGER = "webhook.request"
+PUBLISH_LOGGER = "webhook.publish"
+PROBE_LOGGER = "webhook.probe"
+MESSAGE_CLASSES = {"request": REQUEST_LOGGER, "publish": PUBLISH_LOGGER, "probe": PROBE_LOGGER}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FORMATS = ("text", "json")
+
+# Argument types that cannot change between the logging call and formatting on the listener thread
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None), bytes)
+
+
+def parse_sample_rates(text: str) -> Dict[str, float]:
+    """Parse LOG_SAMPLE_RATES, e.g. ``"request=0.1,publish=0.01"``.
+
+    Keys are message classes (``request`` / ``publish`` / ``probe``) or logger names.
+
+    Args:
+        text: Comma-separated ``class=rate`` pairs, rates between 0 and 1
+
+    Returns:
+        dict: Logger name -> fraction of records below WARNING to keep
+
+    Raises:
+        ValueError: If a pair or rate is malformed
+    """
+    rates = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid log sample rate {part!r}, expected class=rate")
+        rate = float(value)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Log sample rate for {name} must be between 0 and 1, got {rate}")
+        rates[MESSAGE_CLASSES.get(name.strip(), name.strip())] = rate
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON with the fields Cloud Logging reads from stdout."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        entry = {
+            "severity": record.levelname,
+            "message": message,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "logger": record.name,
+            "logging.googleapis.com/sourceLocation": {
+                "file": record.pathname, "line": record.lineno, "function": record.funcName
+            },
+        }
+        # Structured fields passed as logger.info(..., extra={"json_fields": {...}})
+        fields = getattr(record, "json_fields", None)
+        if fields:
+            entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of the records below WARNING for each configured logger.
+
+    Warnings and errors always pass, so sampling never hides failures.
+    """
+
+    def __init__(self, rates: Dict[str, float], random_func: Callable[[], float] = random.random):
+        super().__init__()
+        self.rates = dict(rates)
+        self._random = random_func
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        if rate is None or self._random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller and leaves formatting to the listener.
+
+    Records are dropped (and counted) when the queue is full. Messages whose
+    arguments are all immutable are formatted on the listener thread; others
+    are formatted here so later changes to the arguments cannot leak into the log.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE_ARGS) for a in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # Tracebacks reference frames that keep changing; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Pipeline:
+    """The handler installed on the root logger, plus the listener thread in queue mode."""
+
+    def __init__(self, handler: logging.Handler, sampler: Optional[SamplingFilter],
+                 target: Optional[logging.Handler] = None, queue_size: int = 0):
+        self.handler = handler
+        self.sampler = sampler
+        self.target = target
+        self.queue_size = queue_size
+        self.listener = None
+
+    def start(self) -> None:
+        if self.target is not None:
+            self.listener = logging.handlers.QueueListener(self.handler.queue, self.target,
+                                                           respect_handler_level=True)
+            self.listener.start()
+
+    def restart_after_fork(self) -> None:
+        # The listener thread does not survive fork (gunicorn --preload), and the
+        # inherited queue may be locked by it: give the child its own of both
+        if self.target is not None:
+            self.handler.queue = queue.Queue(self.queue_size)
+            self.start()
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def stats(self) -> dict:
+        return {
+            "dropped": getattr(self.handler, "dropped", 0),
+            "sampled_out": self.sampler.sampled_out if self.sampler else 0,
+            "queued": self.handler.queue.qsize() if self.target is not None else 0,
+        }
+
+
+_pipeline: Optional[_Pipeline] = None
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text", use_queue: bool = False,
+                      queue_size: int = 10000, sample_rates: Optional[Dict[str, float]] = None,
+                      stream=None) -> None:
+    """Replace the root logger's handlers.
+
+    Args:
+        level: Root log level name (LOG_LEVEL)
+        fmt: ``text`` for the human-readable format or ``json`` for Cloud Logging JSON lines
+        use_queue: Hand records to a QueueListener thread instead of writing on the calling thread
+        queue_size: Records buffered in queue mode before new ones are dropped
+        sample_rates: Logger name -> fraction of records below WARNING to keep
+        stream: Output stream, defaults to stderr
+
+    Raises:
+        ValueError: If the level or format is unknown
+    """
+    global _pipeline
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format {fmt!r}, choose from {', '.join(LOG_FORMATS)}")
+
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    sampler = SamplingFilter(sample_rates) if sample_rates else None
+
+    if use_queue:
+        handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+        pipeline = _Pipeline(handler, sampler, target=output, queue_size=queue_size)
+    else:
+        handler = output
+        pipeline = _Pipeline(handler, sampler)
+    if sampler is not None:
+        # Sample before enqueueing so dropped records cost no queue or listener time
+        handler.addFilter(sampler)
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    shutdown_logging()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(handler)
+    _pipeline = pipeline
+    pipeline.start()
+
+
+def shutdown_logging() -> None:
+    """Stop the listener thread after writing out the records still queued."""
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+def logging_stats() -> dict:
+    """Return the dropped / sampled-out / queued record counts of the current configuration."""
+    return _pipeline.stats() if _pipeline is not None else {}
+
+
+def _after_fork_in_child() -> None:
+    if _pipeline is not None:
+        _pipeline.restart_after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(shutdown_logging)
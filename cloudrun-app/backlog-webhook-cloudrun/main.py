@@ -1,39 +1,396 @@
 import os
 import hmac
-import json
+import math
 from flask import Flask, request, jsonify
 import logging
-from google.cloud import pubsub_v1
-from google.cloud import secretmanager
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from secret_cache import SecretCache
+from async_publisher import AsyncPublishQueue
+from dedup import create_dedup_store, make_dedup_key, PENDING
+from message_codec import MessageCodec
+from claim_check import CLAIM_CHECK_ATTRIBUTE, ClaimCheck, create_blob_store
+from event_router import EventRouter, RoutedMessage, load_route_rules
+from projection import compile_projection, compile_projections, load_projections
+from outbox import OutboxFull
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+from ordering import Coalescer, message_ordering_key
+from tenants import Tenant, TenantRegistry, tenant_config_source
+from rate_limit import create_event_rate_limiter
+from warmup import Warmup
+from shutdown import ShutdownCoordinator
+from sinks import SINK_BACKENDS, Sink, create_sink
+from metrics import LAG_BUCKETS, Registry, StageTimer, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import (EVENT_CREATED_ATTRIBUTE, PUBLISHED_AT_ATTRIBUTE, TRACEPARENT_ATTRIBUTE, Tracer,
+                     create_exporter, current_trace, format_timestamp, parse_timestamp)
+from log_config import (PROBE_LOGGER, PUBLISH_LOGGER, REQUEST_LOGGER, configure_logging, logging_stats,
+                        parse_sample_rates)
+from payload_parser import (PayloadTooLarge, get_decoder, read_limited, may_match_event_types,
+                            prescan_event_type, looks_like_json_object, is_json_mimetype, split_ndjson)
 
 app = Flask(__name__)
 
-# Enhanced logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging configuration. LOG_LEVEL is set by Terraform; LOG_FORMAT=json writes JSON lines
+# Cloud Logging parses, LOG_ASYNC=true formats and writes them on a background thread
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+LOG_ASYNC = os.environ.get("LOG_ASYNC", "false").lower() == "true"
+# Records buffered for the background thread before new ones are dropped
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+# Fraction of INFO records kept per message class, e.g. "request=0.1,publish=0.1"
+LOG_SAMPLE_RATES = parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", ""))
+configure_logging(LOG_LEVEL, LOG_FORMAT, use_queue=LOG_ASYNC, queue_size=LOG_QUEUE_SIZE,
+                  sample_rates=LOG_SAMPLE_RATES)
+request_log = logging.getLogger(REQUEST_LOGGER)
+publish_log = logging.getLogger(PUBLISH_LOGGER)
+probe_log = logging.getLogger(PROBE_LOGGER)
 
 # Application startup logging
 logging.info("Flask application starting...")
-logging.info(f"PORT environment variable: {os.environ.get('PORT', 'Not set')}")
+logging.info("PORT environment variable: %s", os.environ.get('PORT', 'Not set'))
 
 # Configuration
 PROJECT_ID = os.environ.get("PROJECT_ID")
 PUBSUB_TOPIC = os.environ.get("PUBSUB_TOPIC", "backlog-webhook-processor")
+WEBHOOK_SECRET_NAME = "backlog-webhook-secret-token"
+# Comma-separated Secret Manager versions accepted at the same time, e.g. "latest,3" during a rotation
+WEBHOOK_SECRET_VERSIONS = [v.strip() for v in os.environ.get("BACKLOG_WEBHOOK_SECRET_VERSIONS", "latest").split(",") if v.strip()]
+SECRET_CACHE_TTL = float(os.environ.get("SECRET_CACHE_TTL_SECONDS", "300"))
+SECRET_CACHE_REFRESH_AHEAD = float(os.environ.get("SECRET_CACHE_REFRESH_AHEAD_SECONDS", "60"))
+SECRET_CACHE_STALE_TTL = float(os.environ.get("SECRET_CACHE_STALE_TTL_SECONDS", "3600"))
+# "sync" waits for Pub/Sub before answering, "async" queues the message and answers 202 at once,
+# "outbox" spools it to a local SQLite file that a background thread drains (see outbox.py)
+PUBLISH_MODE = os.environ.get("PUBLISH_MODE", "sync").lower()
+ASYNC_PUBLISH_QUEUE_SIZE = int(os.environ.get("ASYNC_PUBLISH_QUEUE_SIZE", "1000"))
+# Seconds a sync publish may take before it counts as failed; 0 waits indefinitely
+PUBLISH_TIMEOUT = float(os.environ.get("PUBLISH_TIMEOUT_SECONDS", "0")) or None
+# In sync mode, spool to the outbox and answer 202 instead of 500 when publishing fails
+OUTBOX_FALLBACK = os.environ.get("OUTBOX_FALLBACK", "false").lower() == "true"
+OUTBOX_PATH = os.environ.get("OUTBOX_PATH", "/tmp/backlog-webhook-outbox.db")
+OUTBOX_MAX_BYTES = int(os.environ.get("OUTBOX_MAX_BYTES", str(64 * 1024 * 1024)))
+OUTBOX_SYNCHRONOUS = os.environ.get("OUTBOX_SYNCHRONOUS", "NORMAL").upper()
+# Duplicate-delivery cache; "redis" shares it across instances through REDIS_URL
+DEDUP_ENABLED = os.environ.get("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_BACKEND = os.environ.get("DEDUP_BACKEND", "memory").lower()
+DEDUP_TTL = float(os.environ.get("DEDUP_TTL_SECONDS", "600"))
+DEDUP_MAX_ENTRIES = int(os.environ.get("DEDUP_MAX_ENTRIES", "10000"))
+REDIS_URL = os.environ.get("REDIS_URL")
+# Request bodies above this size are rejected with 413 before they are read
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+# Batch endpoint limits: events per request and total body size
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_BODY_BYTES = int(os.environ.get("BATCH_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+# "auto" uses orjson when installed, otherwise the standard json module
+JSON_DECODER = os.environ.get("JSON_DECODER", "auto").lower()
+# Wire format of published messages, announced in the "encoding"/"compression" attributes
+MESSAGE_ENCODING = os.environ.get("MESSAGE_ENCODING", "json").lower()
+MESSAGE_COMPRESSION = os.environ.get("MESSAGE_COMPRESSION", "none").lower()
+MESSAGE_COMPRESSION_MIN_BYTES = int(os.environ.get("MESSAGE_COMPRESSION_MIN_BYTES", "1024"))
+# Comment bodies larger than this many UTF-8 bytes are written to a blob store and replaced by a
+# reference (content.comment.contentRef); 0 disables. Pub/Sub rejects messages over 10 MB
+CLAIM_CHECK_THRESHOLD_BYTES = int(os.environ.get("CLAIM_CHECK_THRESHOLD_BYTES", "0"))
+# "gcs" stores the bodies in CLAIM_CHECK_BUCKET, "local" in the CLAIM_CHECK_PATH directory
+CLAIM_CHECK_BACKEND = os.environ.get("CLAIM_CHECK_BACKEND", "gcs").lower()
+CLAIM_CHECK_BUCKET = os.environ.get("CLAIM_CHECK_BUCKET")
+CLAIM_CHECK_PATH = os.environ.get("CLAIM_CHECK_PATH")
+CLAIM_CHECK_PREFIX = os.environ.get("CLAIM_CHECK_PREFIX", "comments/")
+# "pubsub" uses Cloud Pub/Sub (or the emulator when PUBSUB_EMULATOR_HOST is set);
+# "fake" keeps messages in memory with FAKE_PUBLISH_LATENCY_MS per RPC, for offline load tests;
+# "http", "file" and "memory" deliver to a sink instead of Pub/Sub (see sinks.py)
+PUBLISHER_BACKEND = os.environ.get("PUBLISHER_BACKEND", "pubsub").lower()
+FAKE_PUBLISH_LATENCY = float(os.environ.get("FAKE_PUBLISH_LATENCY_MS", "0")) / 1000.0
+# Direct push to the consumer: endpoint, per-attempt timeout, retries, concurrent keep-alive connections
+# and the audience of the ID token sent with each request (unset sends none)
+SINK_HTTP_URL = os.environ.get("SINK_HTTP_URL")
+SINK_HTTP_TIMEOUT = float(os.environ.get("SINK_HTTP_TIMEOUT_SECONDS", "10"))
+SINK_HTTP_RETRIES = int(os.environ.get("SINK_HTTP_RETRIES", "3"))
+SINK_HTTP_POOL_SIZE = int(os.environ.get("SINK_HTTP_POOL_SIZE", "8"))
+SINK_HTTP_AUDIENCE = os.environ.get("SINK_HTTP_AUDIENCE")
+# NDJSON file the file sink appends to
+SINK_FILE_PATH = os.environ.get("SINK_FILE_PATH", "/tmp/backlog-webhook-messages.ndjson")
+# Publish with the issue (issueKey) as ordering key so each issue's events arrive in order;
+# the subscription must have message ordering enabled as well
+PUBSUB_ORDERING_ENABLED = os.environ.get("PUBSUB_ORDERING_ENABLED", "false").lower() == "true"
+# Hold comment updates (type 4) this many seconds and publish only the latest version per comment; 0 disables
+COMMENT_COALESCE_WINDOW = float(os.environ.get("COMMENT_COALESCE_WINDOW_SECONDS", "0"))
+# Adaptive limit on concurrent webhook requests; excess requests get CONCURRENCY_LIMIT_STATUS
+# with Retry-After at once. Keep the maximum below gunicorn's --threads so health checks
+# always find a free thread
+CONCURRENCY_LIMIT_ENABLED = os.environ.get("CONCURRENCY_LIMIT_ENABLED", "true").lower() == "true"
+CONCURRENCY_LIMIT_MIN = int(os.environ.get("CONCURRENCY_LIMIT_MIN", "1"))
+CONCURRENCY_LIMIT_MAX = int(os.environ.get("CONCURRENCY_LIMIT_MAX", "6"))
+# Maximum under asgi:app, where a request waiting on Pub/Sub holds no thread; CONCURRENCY_LIMIT_MAX overrides it
+ASGI_CONCURRENCY_LIMIT_MAX = int(os.environ.get("CONCURRENCY_LIMIT_MAX", "500"))
+# Requests slower than this, or failing with 5xx, lower the limit
+CONCURRENCY_LIMIT_LATENCY_TARGET = float(os.environ.get("CONCURRENCY_LIMIT_LATENCY_TARGET_SECONDS", "1.0"))
+CONCURRENCY_LIMIT_STATUS = int(os.environ.get("CONCURRENCY_LIMIT_STATUS", "503"))
+# Token-bucket limits on routed events per project key and per user ID, as "rate/burst" with
+# per-key overrides, e.g. "0.5/20,GENAI=5/50"; empty disables the dimension
+RATE_LIMIT_PROJECT = os.environ.get("RATE_LIMIT_PROJECT", "")
+RATE_LIMIT_USER = os.environ.get("RATE_LIMIT_USER", "")
+# "reject" answers events over a limit with 429, "divert" publishes them to RATE_LIMIT_DIVERT_TOPIC
+RATE_LIMIT_ACTION = os.environ.get("RATE_LIMIT_ACTION", "reject").lower()
+RATE_LIMIT_DIVERT_TOPIC = os.environ.get("RATE_LIMIT_DIVERT_TOPIC")
+# "redis" shares the limits across instances through REDIS_URL
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000"))
+# Tenants served on /webhook/backlog/<tenant>, each with its own tokens, topic and project keys.
+# The JSON object comes from TENANTS_CONFIG_FILE, TENANTS_CONFIG or the secret TENANTS_SECRET_NAME
+# and is reloaded in the background every TENANTS_RELOAD_SECONDS
+TENANTS_RELOAD_SECONDS = float(os.environ.get("TENANTS_RELOAD_SECONDS", str(SECRET_CACHE_TTL)))
+# Per-stage latency histograms and outcome counters served on /metrics
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+# Span exporter for per-request traces: "none", "log" (one log entry per trace, linked to Cloud Trace
+# with LOG_FORMAT=json), "memory" or "module:attribute" of a custom exporter factory
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "none")
+# Fraction of requests traced when the caller sent no trace context
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+# Build the GCP clients in a background thread once the gunicorn worker is up (see gunicorn.conf.py)
+WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "true").lower() == "true"
+# Timeout of the Pub/Sub RPC that opens the channel, and the first backoff after a failed warm-up step
+WARMUP_RPC_TIMEOUT = float(os.environ.get("WARMUP_RPC_TIMEOUT_SECONDS", "10"))
+WARMUP_RETRY_SECONDS = float(os.environ.get("WARMUP_RETRY_SECONDS", "1"))
+# Event parsed, routed and encoded (but not published) during warm-up
+WARMUP_SAMPLE_PATH = os.environ.get("WARMUP_SAMPLE_PATH",
+                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample.json"))
+# Seconds after SIGTERM to flush buffered messages before giving up on them; Cloud Run kills
+# the instance 10 seconds after SIGTERM (gunicorn.conf.py derives graceful_timeout from this)
+SHUTDOWN_DEADLINE = float(os.environ.get("SHUTDOWN_DEADLINE_SECONDS", "8"))
+
+topic_path = f"projects/{PROJECT_ID}/topics/{PUBSUB_TOPIC}"
+_topic_paths = {PUBSUB_TOPIC: topic_path}
+
+# Event type 3 = Comment added, type 4 = Comment updated
+COMMENT_EVENT_TYPES = (3, 4)
+COMMENT_UPDATED_TYPE = 4
+# Content types the batch endpoint reads as one JSON document per line
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+decode_json = get_decoder(JSON_DECODER)
+
+metrics_registry = Registry()
+REQUESTS = metrics_registry.counter(
+    "backlog_webhook_requests_total", "Webhook requests by HTTP status and outcome", ("status", "outcome"))
+REQUEST_SECONDS = metrics_registry.histogram(
+    "backlog_webhook_request_seconds", "Webhook handler latency by outcome", ("outcome",))
+STAGE_SECONDS = metrics_registry.histogram(
+    "backlog_webhook_stage_seconds", "Time spent in each webhook handler stage", ("stage",))
+RATE_LIMITED = metrics_registry.counter(
+    "backlog_webhook_rate_limited_total", "Events over a rate limit by dimension and action",
+    ("dimension", "action"))
+PUBLISH_SECONDS = metrics_registry.histogram(
+    "backlog_webhook_publish_seconds", "Time from submitting a message until Pub/Sub confirms it",
+    ("topic", "result"))
+EVENT_LAG = metrics_registry.histogram(
+    "backlog_webhook_event_lag_seconds",
+    "Age of an event, from its created time in Backlog until it was received or its publish was confirmed",
+    ("stage",), LAG_BUCKETS)
+# StageTimer records nothing when given None
+stage_histogram = STAGE_SECONDS if METRICS_ENABLED else None
+message_codec = MessageCodec(MESSAGE_ENCODING, MESSAGE_COMPRESSION, MESSAGE_COMPRESSION_MIN_BYTES)
+tracer = Tracer(create_exporter(TRACE_EXPORTER, PROJECT_ID), TRACE_SAMPLE_RATE)
+shutdown_coordinator = ShutdownCoordinator(SHUTDOWN_DEADLINE)
+claim_check = ClaimCheck(
+    create_blob_store(CLAIM_CHECK_BACKEND, CLAIM_CHECK_BUCKET, CLAIM_CHECK_PATH),
+    CLAIM_CHECK_THRESHOLD_BYTES,
+    prefix=CLAIM_CHECK_PREFIX
+) if CLAIM_CHECK_THRESHOLD_BYTES > 0 else None
+
+# GCP clients are created on first use rather than at import time. Importing the client
+# libraries and opening gRPC channels dominates cold start, and with gunicorn --preload
+# the import happens in the master process, where gRPC channels must not be created
+# before forking. Tests may assign these directly to install fakes.
+publisher = None
+secret_client = None
+outbox = None
+_client_lock = threading.Lock()
 
-# Initialize Pub/Sub client
-publisher = pubsub_v1.PublisherClient()
-topic_path = publisher.topic_path(PROJECT_ID, PUBSUB_TOPIC)
+def get_publisher():
+    """Return the Pub/Sub publisher, creating it on first use.
+    
+    Batching and flow control are taken from PUBSUB_BATCH_* / PUBSUB_FLOW_*.
+    With PUBLISHER_BACKEND=fake an in-memory stand-in with the same settings is used,
+    and with http, file or memory the sink of that name (SINK_*).
+    
+    Returns:
+        PublisherClient: The shared publisher client, or a sink with the same publish interface
+    """
+    global publisher
+    if publisher is None:
+        with _client_lock:
+            if publisher is None:
+                if PUBLISHER_BACKEND in SINK_BACKENDS:
+                    logging.info(f"Publishing to the {PUBLISHER_BACKEND} sink instead of Pub/Sub")
+                    publisher = create_sink(PUBLISHER_BACKEND, url=SINK_HTTP_URL, timeout=SINK_HTTP_TIMEOUT,
+                                            retries=SINK_HTTP_RETRIES, pool_size=SINK_HTTP_POOL_SIZE,
+                                            audience=SINK_HTTP_AUDIENCE, path=SINK_FILE_PATH)
+                    return publisher
+                from publisher_config import load_publisher_settings
+                batch_settings, publisher_options = load_publisher_settings()
+                logging.info(f"Pub/Sub batch settings: {batch_settings}, flow control: {publisher_options.flow_control}")
+                if PUBLISHER_BACKEND == "fake":
+                    from fake_pubsub import FakePublisherClient
+                    logging.warning(f"Using the in-memory fake publisher (latency {FAKE_PUBLISH_LATENCY * 1000:.0f} ms)")
+                    publisher = FakePublisherClient(batch_settings, publisher_options, latency=FAKE_PUBLISH_LATENCY)
+                else:
+                    from google.cloud import pubsub_v1
+                    publisher = pubsub_v1.PublisherClient(batch_settings=batch_settings, publisher_options=publisher_options)
+    return publisher
 
-# Initialize Secret Manager client
-secret_client = secretmanager.SecretManagerServiceClient()
+def get_secret_client():
+    """Return the Secret Manager client, creating it on first use.
+    
+    Returns:
+        SecretManagerServiceClient: The shared Secret Manager client
+    """
+    global secret_client
+    if secret_client is None:
+        with _client_lock:
+            if secret_client is None:
+                from google.cloud import secretmanager
+                secret_client = secretmanager.SecretManagerServiceClient()
+    return secret_client
+
+def get_outbox():
+    """Return the local outbox, opening it on first use.
+    
+    Opened lazily so the SQLite connection and drainer thread belong to the
+    gunicorn worker rather than the preloading master.
+    
+    Returns:
+        SQLiteOutbox: The shared outbox
+    """
+    global outbox
+    if outbox is None:
+        with _client_lock:
+            if outbox is None:
+                from outbox import SQLiteOutbox
+                outbox = SQLiteOutbox(
+                    OUTBOX_PATH,
+                    publish=lambda record: submit_message(record.message, record.topic),
+                    on_published=_on_outbox_published,
+                    max_bytes=OUTBOX_MAX_BYTES,
+                    synchronous=OUTBOX_SYNCHRONOUS
+                )
+    return outbox
+
+def _warm_pubsub() -> None:
+    """Create the publisher and make one RPC so the gRPC channel and access token are ready."""
+    from google.api_core.exceptions import NotFound, PermissionDenied
+    try:
+        get_publisher().get_topic(request={"topic": topic_path}, timeout=WARMUP_RPC_TIMEOUT)
+    except (NotFound, PermissionDenied):
+        # Any answer from Pub/Sub means the channel is open and the token was accepted;
+        # publishing only needs roles/pubsub.publisher, which does not include topics.get
+        pass
+
+def _warm_secrets() -> None:
+    """Fetch the webhook tokens and every tenant's tokens."""
+    if not os.environ.get("BACKLOG_WEBHOOK_SECRET_TOKEN"):
+        webhook_token_cache.get()
+    if tenant_registry is not None:
+        tenant_registry.load_all()
+
+def _warm_outbox() -> None:
+    """Resume draining messages spooled before a restart."""
+    if PUBLISH_MODE == "outbox" or OUTBOX_FALLBACK:
+        get_outbox().start()
+
+def _warm_extraction() -> None:
+    """Parse, route and encode sample.json without publishing it, so the first webhook runs warm code."""
+    try:
+        with open(WARMUP_SAMPLE_PATH, "rb") as f:
+            raw_body = f.read()
+    except FileNotFoundError:
+        logging.warning(f"Warm-up sample {WARMUP_SAMPLE_PATH} not found, skipping dry extraction")
+        return
+    for routed in event_router.route(decode_json(raw_body)):
+        message_codec.encode(routed.message)
+
+# With the outbox, webhooks are accepted while Pub/Sub is down, so an outage must not hold readiness back
+warmup = Warmup([
+    ("pubsub", _warm_pubsub),
+    ("secrets", _warm_secrets),
+    ("outbox", _warm_outbox),
+    ("extraction", _warm_extraction)
+], retry_interval=WARMUP_RETRY_SECONDS, optional=("pubsub",) if PUBLISH_MODE == "outbox" or OUTBOX_FALLBACK else ())
+
+def warm_up() -> bool:
+    """Run the warm-up steps that have not succeeded yet in the calling thread.
+    
+    Returns:
+        bool: True once the worker is ready
+    """
+    return warmup.run()
+
+def start_warmup() -> None:
+    """Warm up in a background thread so liveness probes keep answering meanwhile.
+    
+    Failed steps are retried until they succeed; /ready reports 503 until then.
+    """
+    warmup.start()
+
+def begin_shutdown() -> None:
+    """Answer new webhooks with 503 from now on; only sets a flag, so it is safe in a signal handler."""
+    shutdown_coordinator.begin()
+
+def _drain_coalescer() -> int:
+    """Release the comment updates held back by the coalescer."""
+    if comment_coalescer is not None:
+        comment_coalescer.flush_all()
+    return 0
+
+def _drain_async_queue() -> int:
+    """Wait until the async queue has handed every payload to the publisher and seen it confirmed.
+    
+    Returns:
+        int: Payloads still queued at the deadline
+    """
+    shutdown_coordinator.wait_until(lambda: not any(publish_queue.stats()[key] for key in ("queued", "in_flight")))
+    return publish_queue.stats()["queued"]
 
-def get_secret(secret_name: str) -> str:
+def _drain_outbox() -> int:
+    """Give the outbox drainer until the deadline to empty the spool, then close it.
+    
+    Returns:
+        int: Messages left in the outbox file
+    """
+    if outbox is None:
+        return 0
+    shutdown_coordinator.wait_until(lambda: outbox.stats()["depth"] == 0)
+    left = outbox.stats()["depth"]
+    outbox.close(timeout=shutdown_coordinator.remaining())
+    return left
+
+def _stop_publisher() -> None:
+    """Send the batches still buffered in the client and refuse further publishes."""
+    if publisher is not None:
+        publisher.stop()
+
+def shutdown() -> Optional[dict]:
+    """Drain the worker before it exits, within SHUTDOWN_DEADLINE_SECONDS of ``begin_shutdown``.
+    
+    Held comment updates, the async queue and the outbox are flushed into the
+    publisher, the publisher is stopped, and the publishes still in flight are
+    awaited. The flushed, failed and abandoned counts are logged.
+    
+    Returns:
+        Optional[dict]: The drain summary, or None if the worker was already drained
+    """
+    return shutdown_coordinator.drain([
+        ("coalescer", _drain_coalescer),
+        ("async_queue", _drain_async_queue),
+        ("outbox", _drain_outbox),
+        ("publisher", _stop_publisher)
+    ])
+
+def get_secret(secret_name: str, version: str = "latest") -> str:
     """Retrieve secret value from Secret Manager.
     
     Args:
         secret_name: Name of the secret to retrieve
+        version: Secret version to access
         
     Returns:
         str: The secret value
@@ -42,18 +399,176 @@ def get_secret(secret_name: str) -> str:
         Exception: If secret retrieval fails
     """
     try:
-        secret_path = f"projects/{PROJECT_ID}/secrets/{secret_name}/versions/latest"
-        response = secret_client.access_secret_version(request={"name": secret_path})
+        secret_path = f"projects/{PROJECT_ID}/secrets/{secret_name}/versions/{version}"
+        response = get_secret_client().access_secret_version(request={"name": secret_path})
         return response.payload.data.decode("UTF-8")
     except Exception as e:
-        logging.error(f"Failed to retrieve secret {secret_name}: {e}")
+        logging.error(f"Failed to retrieve secret {secret_name} (version {version}): {e}")
         raise
 
-def publish_message(payload: dict) -> str:
+def _load_webhook_tokens() -> tuple:
+    """Load every configured version of the webhook token from Secret Manager."""
+    return tuple(get_secret(WEBHOOK_SECRET_NAME, version) for version in WEBHOOK_SECRET_VERSIONS)
+
+webhook_token_cache = SecretCache(
+    _load_webhook_tokens,
+    ttl=SECRET_CACHE_TTL,
+    refresh_ahead=SECRET_CACHE_REFRESH_AHEAD,
+    stale_ttl=SECRET_CACHE_STALE_TTL,
+    name=WEBHOOK_SECRET_NAME
+)
+
+def get_webhook_tokens() -> tuple:
+    """Return the webhook tokens that are currently accepted.
+    
+    BACKLOG_WEBHOOK_SECRET_TOKEN takes precedence and may hold several
+    comma-separated tokens. Otherwise the tokens come from the Secret Manager cache.
+    
+    Returns:
+        tuple: The valid webhook tokens
+        
+    Raises:
+        Exception: If the tokens cannot be loaded and no cached value is usable
+    """
+    env_tokens = os.environ.get("BACKLOG_WEBHOOK_SECRET_TOKEN")
+    if env_tokens:
+        return tuple(t for t in env_tokens.split(",") if t)
+    return webhook_token_cache.get()
+
+_tenant_source = tenant_config_source(get_secret=get_secret)
+tenant_registry = TenantRegistry(
+    _tenant_source[1],
+    get_secret=get_secret,
+    ttl=TENANTS_RELOAD_SECONDS,
+    refresh_ahead=SECRET_CACHE_REFRESH_AHEAD,
+    stale_ttl=SECRET_CACHE_STALE_TTL,
+    name=_tenant_source[0]
+) if _tenant_source else None
+
+def get_request_tokens(tenant_key: Optional[str]) -> Tuple[Optional[Tenant], tuple]:
+    """Return the tenant a request is addressed to and the tokens it accepts.
+    
+    Without a tenant key the single-tenant tokens are used. An unknown tenant
+    accepts no token, so it is rejected exactly like a wrong token and tenant
+    names cannot be probed.
+    
+    Args:
+        tenant_key: Tenant name or project key from the request path, or None
+        
+    Returns:
+        tuple: (tenant, tokens)
+        
+    Raises:
+        Exception: If the tenant configuration or tokens cannot be loaded
+    """
+    if tenant_key is None:
+        return None, get_webhook_tokens()
+    tenant = tenant_registry.resolve(tenant_key)
+    if tenant is None:
+        request_log.warning("Unknown tenant: %s", tenant_key)
+        return None, ()
+    return tenant, tenant.tokens
+
+def is_valid_token(query_token: str, valid_tokens: tuple) -> bool:
+    """Check a query token against every valid token in constant time.
+    
+    Args:
+        query_token: Token supplied by the caller
+        valid_tokens: Tokens currently accepted
+        
+    Returns:
+        bool: True if the token matches one of the valid tokens
+    """
+    query_bytes = query_token.encode("utf-8")
+    matched = False
+    # Compare against every token so timing does not reveal which one matched
+    for token in valid_tokens:
+        matched |= hmac.compare_digest(query_bytes, token.encode("utf-8"))
+    return matched
+
+def get_topic_path(topic: str) -> str:
+    """Return the full resource path of a topic in PROJECT_ID."""
+    path = _topic_paths.get(topic)
+    if path is None:
+        path = _topic_paths[topic] = f"projects/{PROJECT_ID}/topics/{topic}"
+    return path
+
+def submit_message(payload: dict, topic: Optional[str] = None, attributes: Optional[dict] = None):
+    """Start publishing a message to Pub/Sub without waiting for the result.
+    
+    The data is encoded with ``message_codec`` and the encoding is announced in
+    the message attributes. A comment body over CLAIM_CHECK_THRESHOLD_BYTES is
+    first written to the blob store and published as a reference, announced by
+    the ``claim_check`` attribute. Traced messages also get a ``published_at``
+    timestamp. Once Pub/Sub confirms the message, the age of its event is
+    recorded in the event lag histogram. The future is tracked by
+    ``shutdown_coordinator`` so a shutting-down worker can wait for it.
+    
+    Args:
+        payload: The message payload to publish
+        topic: Topic name, defaults to PUBSUB_TOPIC
+        attributes: Extra attributes, see ``event_attributes``
+        
+    Returns:
+        Future: Resolves to the message ID once Pub/Sub confirms the publish
+    """
+    started = time.perf_counter()
+    claimed = claim_check.apply(payload) if claim_check is not None else payload
+    message_data, message_attributes = message_codec.encode(claimed)
+    if claimed is not payload:
+        message_attributes[CLAIM_CHECK_ATTRIBUTE] = "true"
+    if attributes:
+        message_attributes.update(attributes)
+        if TRACEPARENT_ATTRIBUTE in attributes:
+            message_attributes[PUBLISHED_AT_ATTRIBUTE] = format_timestamp(time.time())
+    path = topic_path if topic is None else get_topic_path(topic)
+    ordering_key = message_ordering_key(payload) if PUBSUB_ORDERING_ENABLED else ""
+    client = get_publisher()
+    future = client.publish(path, message_data, ordering_key=ordering_key, **message_attributes)
+    shutdown_coordinator.track(future)
+    if ordering_key:
+        def resume_on_failure(f):
+            # After a failure the client pauses the key until it is resumed explicitly
+            if f.exception():
+                client.resume_publish(path, ordering_key)
+        future.add_done_callback(resume_on_failure)
+    if METRICS_ENABLED:
+        topic_name = topic or PUBSUB_TOPIC
+        # Messages spooled by the outbox carry no attributes; their payload usually keeps "created"
+        created_at = parse_timestamp((attributes or {}).get(EVENT_CREATED_ATTRIBUTE) or payload.get("created"))
+
+        def record_publish(f):
+            failed = f.exception() is not None
+            PUBLISH_SECONDS.observe(time.perf_counter() - started, topic_name, "error" if failed else "ok")
+            if created_at is not None and not failed:
+                EVENT_LAG.observe(max(0.0, time.time() - created_at), "published")
+        future.add_done_callback(record_publish)
+    return future
+
+def event_attributes(payload: dict) -> Optional[dict]:
+    """Return the Pub/Sub attributes added to every message of an event.
+    
+    These are the event's ``created`` time and, when the request is traced,
+    its trace context (``traceparent``) and ``received_at`` time.
+    
+    Returns:
+        Optional[dict]: The attributes, or None if there are none
+    """
+    attributes = {}
+    created = payload.get("created")
+    if isinstance(created, str):
+        attributes[EVENT_CREATED_ATTRIBUTE] = created
+    trace = current_trace()
+    if trace is not None:
+        attributes.update(trace.message_attributes())
+    return attributes or None
+
+def publish_message(payload: dict, topic: Optional[str] = None) -> str:
     """Publish message to Pub/Sub topic.
     
     Args:
         payload: The message payload to publish
+        topic: Topic name, defaults to PUBSUB_TOPIC
         
     Returns:
         str: The message ID
@@ -62,15 +577,233 @@ def publish_message(payload: dict) -> str:
         Exception: If message publishing fails
     """
     try:
-        message_data = json.dumps(payload).encode("utf-8")
-        future = publisher.publish(topic_path, message_data)
-        message_id = future.result()
-        logging.info(f"Published message to {PUBSUB_TOPIC}: {message_id}")
+        message_id = submit_message(payload, topic).result()
+        publish_log.info("Published message to %s: %s", topic or PUBSUB_TOPIC, message_id)
         return message_id
     except Exception as e:
         logging.error(f"Failed to publish message to Pub/Sub: {e}")
         raise
 
+def _comment_id(message: dict):
+    """Return the comment ID of a routed message, or None for non-comment messages."""
+    comment = (message.get("content") or {}).get("comment")
+    return comment.get("id") if isinstance(comment, dict) else None
+
+def _submit_routed(routed: RoutedMessage):
+    return submit_message(routed.message, routed.topic, routed.attributes)
+
+def _on_async_publish_success(routed: RoutedMessage, message_id: str) -> None:
+    publish_log.info("Async published %s message to %s: message_id=%s, comment_id=%s",
+                     routed.rule, routed.topic, message_id, _comment_id(routed.message))
+
+def _on_async_publish_failure(routed: RoutedMessage, error: BaseException) -> None:
+    publish_log.error("Async publish of %s message to %s failed: comment_id=%s, error=%s",
+                      routed.rule, routed.topic, _comment_id(routed.message), error)
+
+def _on_outbox_published(record, message_id: str) -> None:
+    publish_log.info("Outbox published %s message seq=%s to %s: message_id=%s, comment_id=%s",
+                     record.rule, record.seq, record.topic, message_id, _comment_id(record.message))
+    _finish_dedup(record.dedup_key, message_id)
+
+publish_queue = AsyncPublishQueue(
+    _submit_routed,
+    maxsize=ASYNC_PUBLISH_QUEUE_SIZE,
+    on_success=_on_async_publish_success,
+    on_failure=_on_async_publish_failure
+)
+
+dedup_store = create_dedup_store(DEDUP_BACKEND, DEDUP_MAX_ENTRIES, DEDUP_TTL, REDIS_URL) if DEDUP_ENABLED else None
+
+if PUBLISHER_BACKEND not in ("pubsub", "fake") + SINK_BACKENDS:
+    raise ValueError(f"Unknown PUBLISHER_BACKEND: {PUBLISHER_BACKEND}")
+if RATE_LIMIT_ACTION not in ("reject", "divert"):
+    raise ValueError(f"Unknown RATE_LIMIT_ACTION: {RATE_LIMIT_ACTION}")
+if RATE_LIMIT_ACTION == "divert" and not RATE_LIMIT_DIVERT_TOPIC:
+    raise ValueError("RATE_LIMIT_DIVERT_TOPIC must be set when RATE_LIMIT_ACTION=divert")
+event_rate_limiter = create_event_rate_limiter(RATE_LIMIT_PROJECT, RATE_LIMIT_USER, RATE_LIMIT_BACKEND,
+                                               RATE_LIMIT_MAX_KEYS, REDIS_URL)
+
+def _collect_component_stats():
+    """Report the counters kept by the secret cache, async queue, dedup store and outbox as gauges."""
+    components = [("secret_cache", webhook_token_cache.stats()), ("async_queue", publish_queue.stats()),
+                  ("log", logging_stats())]
+    if dedup_store is not None:
+        components.append(("dedup", dedup_store.stats()))
+    if outbox is not None:
+        components.append(("outbox", outbox.stats()))
+    if concurrency_limiter is not None:
+        components.append(("concurrency", concurrency_limiter.stats()))
+    if comment_coalescer is not None:
+        components.append(("coalescer", comment_coalescer.stats()))
+    if tenant_registry is not None:
+        components.append(("tenants", tenant_registry.stats()))
+    if event_rate_limiter is not None:
+        components.append(("rate_limit", event_rate_limiter.stats()))
+    if claim_check is not None:
+        components.append(("claim_check", claim_check.stats()))
+    if tracer.enabled:
+        components.append(("tracing", tracer.stats()))
+    if isinstance(publisher, Sink):
+        components.append(("sink", publisher.stats()))
+    components.append(("warmup", warmup.stats()))
+    components.append(("shutdown", shutdown_coordinator.stats()))
+    for component, stats in components:
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            yield (f"backlog_webhook_{component}_{key}", f"{component} {key.replace('_', ' ')}", {}, value)
+
+metrics_registry.register_collector(_collect_component_stats)
+
+def request_outcome(body, status: int) -> str:
+    """Classify a webhook response for the request counters."""
+    if status == 200 and isinstance(body, dict):
+        if "results" in body:
+            return "batch"
+        if body.get("duplicate"):
+            return "duplicate"
+        return "published" if "message_id" in body else "ignored"
+    if isinstance(body, dict) and body.get("reason") == "overloaded":
+        return "shed"
+    if isinstance(body, dict) and body.get("reason") == "shutting_down":
+        return "shutting_down"
+    return {202: "accepted", 400: "bad_request", 403: "forbidden", 413: "too_large",
+            429: "rate_limited", 503: "unavailable"}.get(status, "error")
+
+def record_request(body, status: int, seconds: float) -> None:
+    """Count a finished webhook request, record its latency and annotate its trace."""
+    trace = current_trace()
+    if trace is not None:
+        trace.set_attribute("http.status_code", status)
+        trace.set_attribute("outcome", request_outcome(body, status))
+    if not METRICS_ENABLED:
+        return
+    outcome = request_outcome(body, status)
+    REQUESTS.inc(str(status), outcome)
+    REQUEST_SECONDS.observe(seconds, outcome)
+
+comment_coalescer = Coalescer(
+    COMMENT_COALESCE_WINDOW,
+    lambda job: publish_coalesced(job),
+    name="comment-coalescer"
+) if COMMENT_COALESCE_WINDOW > 0 else None
+
+def create_concurrency_limiter(max_limit: int) -> Optional[AdaptiveConcurrencyLimiter]:
+    """Create the webhook concurrency limiter with the configured bounds.
+    
+    Args:
+        max_limit: Upper bound of the limit, which depends on the server in use
+        
+    Returns:
+        Optional[AdaptiveConcurrencyLimiter]: The limiter, or None if CONCURRENCY_LIMIT_ENABLED is false
+    """
+    if not CONCURRENCY_LIMIT_ENABLED:
+        return None
+    return AdaptiveConcurrencyLimiter(
+        max_limit=max_limit,
+        min_limit=CONCURRENCY_LIMIT_MIN,
+        latency_target=CONCURRENCY_LIMIT_LATENCY_TARGET
+    )
+
+# Sized for gunicorn gthread workers; asgi.py replaces it with one sized for the event loop
+concurrency_limiter = create_concurrency_limiter(CONCURRENCY_LIMIT_MAX)
+
+def shed_response() -> tuple:
+    """Build the fast rejection for a request over the concurrency limit.
+    
+    Returns:
+        tuple: (body, status, headers) with a Retry-After header
+    """
+    retry_after = concurrency_limiter.retry_after()
+    error = "Too Many Requests" if CONCURRENCY_LIMIT_STATUS == 429 else "Service Unavailable"
+    request_log.warning("%s: concurrency limit reached, retry after %ss", error, retry_after)
+    return ({"error": error, "reason": "overloaded", "retry_after": retry_after},
+            CONCURRENCY_LIMIT_STATUS, {"Retry-After": str(retry_after)})
+
+def draining_response() -> tuple:
+    """Build the fast rejection for a webhook arriving after shutdown has begun.
+    
+    Returns:
+        tuple: (body, status, headers); Backlog retries the event, which reaches another instance
+    """
+    shutdown_coordinator.reject()
+    request_log.warning("Service Unavailable: shutting down")
+    return ({"error": "Service Unavailable", "reason": "shutting_down", "retry_after": 1},
+            503, {"Retry-After": "1"})
+
+def retry_headers(body) -> dict:
+    """Return the Retry-After header for a response body carrying ``retry_after``."""
+    if isinstance(body, dict) and "retry_after" in body:
+        return {"Retry-After": str(body["retry_after"])}
+    return {}
+
+def run_limited(handler) -> tuple:
+    """Run a webhook handler under the concurrency limiter.
+    
+    Args:
+        handler: Callable returning the (body, status) pair of the request
+        
+    Returns:
+        tuple: (body, status, headers); headers are only set when the client is told to retry later
+    """
+    if shutdown_coordinator.draining:
+        return draining_response()
+    if concurrency_limiter is None:
+        body, status = handler()
+        return body, status, retry_headers(body)
+    permit = concurrency_limiter.acquire()
+    if permit is None:
+        return shed_response()
+    success = False
+    try:
+        body, status = handler()
+        success = status < 500
+        return body, status, retry_headers(body)
+    finally:
+        concurrency_limiter.release(permit, success)
+
+@dataclass
+class PublishJob:
+    """Routed messages of a validated event that still have to be published."""
+    messages: List[RoutedMessage]
+    dedup_key: Optional[str] = None
+
+    @property
+    def comment_id(self):
+        """Comment ID reported in responses, taken from the first routed message."""
+        return _comment_id(self.messages[0].message)
+
+def _finish_dedup(dedup_key: Optional[str], message_id: Optional[str]) -> None:
+    """Record a published delivery, or release the claim when publishing failed."""
+    if dedup_store is None or dedup_key is None:
+        return
+    if message_id is None:
+        dedup_store.release(dedup_key)
+    else:
+        dedup_store.complete(dedup_key, message_id)
+
+def _fan_out_completion(dedup_key: Optional[str], count: int):
+    """Return an async on_complete callback that finishes dedup once all messages are done.
+    
+    The delivery counts as published with the first message ID only if every
+    routed message was published; otherwise the claim is released so a retry
+    publishes the event again.
+    """
+    lock = threading.Lock()
+    state = {"remaining": count, "message_id": None, "failed": False}
+
+    def on_complete(message_id: Optional[str], error: Optional[BaseException]) -> None:
+        with lock:
+            state["remaining"] -= 1
+            if message_id is None:
+                state["failed"] = True
+            elif state["message_id"] is None:
+                state["message_id"] = message_id
+            if state["remaining"]:
+                return
+        _finish_dedup(dedup_key, None if state["failed"] else state["message_id"])
+    return on_complete
+
 def is_comment_event(payload: dict) -> bool:
     """Check if the webhook payload is a comment event.
     
@@ -85,21 +818,51 @@ def is_comment_event(payload: dict) -> bool:
         content = payload.get("content", {})
         comment = content.get("comment")
         
-        # Event type 3 = Comment added, type 4 = Comment updated
-        if event_type in [3, 4] and comment:
-            logging.info(f"Comment event detected: type={event_type}, comment_id={comment.get('id')}")
+        if event_type in COMMENT_EVENT_TYPES and comment:
+            request_log.info("Comment event detected: type=%s, comment_id=%s", event_type, comment.get('id'))
             return True
         
-        logging.info(f"Non-comment event ignored: type={event_type}")
+        request_log.info("Non-comment event ignored: type=%s", event_type)
         return False
     except Exception as e:
         logging.error(f"Error checking comment event: {e}")
         return False
 
+# Shape of the messages the AI processor expects; EVENT_PROJECTIONS may replace it by
+# defining "comment", or add smaller projections for other consumers (see projection.py)
+DEFAULT_COMMENT_PROJECTION = {
+    "content": {
+        "comment": {
+            "id": "content.comment.id",
+            "content": {"$path": "content.comment.content", "$default": ""},
+            "created": "content.comment.created",
+            "updated": "content.comment.updated",
+            "createdUser": "createdUser"
+        },
+        # In Backlog webhooks, content itself holds the issue when the comment is on an issue
+        "issue": {
+            "$root": [{"path": "content", "require": ["id", "summary"]}, "content.issue"],
+            "$optional": True,
+            "id": "id",
+            "issueKey": "issueKey",
+            "summary": "summary"
+        }
+    },
+    "project": {"id": "project.id", "projectKey": "project.projectKey", "name": "project.name"},
+    "createdUser": "createdUser",
+    "type": "type",
+    "created": "created"
+}
+projection_extractors = compile_projections(load_projections() or {})
+project_comment = projection_extractors.pop("comment", None) or compile_projection(DEFAULT_COMMENT_PROJECTION, "comment")
+
 def extract_comment_data(payload: dict) -> dict:
     """Extract relevant comment data from webhook payload.
     Format the data to match the existing AI processor's expected structure.
     
+    The fields are taken by ``project_comment``, compiled from
+    DEFAULT_COMMENT_PROJECTION unless EVENT_PROJECTIONS overrides it.
+    
     Args:
         payload: The webhook payload
         
@@ -107,126 +870,701 @@ def extract_comment_data(payload: dict) -> dict:
         dict: Extracted comment data in AI processor compatible format
     """
     try:
-        # Preserve the original webhook structure for AI processor compatibility
-        content = payload.get("content", {})
-        comment = content.get("comment", {})
-        project = payload.get("project", {})
-        created_user = payload.get("createdUser", {})
-        
-        # Extract issue information - in Backlog webhooks, content itself contains issue info
-        # when it's a comment event on an issue
-        issue = content if content.get("id") and content.get("summary") else content.get("issue", {})
-        
-        # Format data to match existing AI processor expectations
-        comment_data = {
-            "content": {
-                "comment": {
-                    "id": comment.get("id"),
-                    "content": comment.get("content", ""),
-                    "created": comment.get("created"),
-                    "updated": comment.get("updated"),
-                    "createdUser": created_user
-                },
-                "issue": {
-                    "id": issue.get("id"),
-                    "issueKey": issue.get("issueKey"),
-                    "summary": issue.get("summary")
-                } if issue else None
-            },
-            "project": {
-                "id": project.get("id"),
-                "projectKey": project.get("projectKey"),
-                "name": project.get("name")
-            },
-            "createdUser": created_user,
-            "type": payload.get("type"),
-            "created": payload.get("created")
-        }
+        comment_data = project_comment(payload)
         
-        logging.info(f"Extracted comment data: comment_id={comment_data['content']['comment']['id']}, "
-                    f"user={comment_data['createdUser']['name']}")
+        request_log.info("Extracted comment data: comment_id=%s, user=%s",
+                         _comment_id(comment_data), (payload.get("createdUser") or {}).get("name"))
         
         return comment_data
     except Exception as e:
         logging.error(f"Error extracting comment data: {e}")
         raise
 
+# The default rule reproduces the original behaviour: comment events go to PUBSUB_TOPIC
+DEFAULT_ROUTE_RULES = [{
+    "name": "comment",
+    "types": list(COMMENT_EVENT_TYPES),
+    "where": {"content.comment": {"present": True}},
+    "extractor": "comment"
+}]
+event_router = EventRouter(
+    load_route_rules() or DEFAULT_ROUTE_RULES,
+    default_topic=PUBSUB_TOPIC,
+    extractors={**projection_extractors, "comment": extract_comment_data}
+)
+
 @app.route("/")
 def health_check():
-    """Health check endpoint for Cloud Run."""
-    logging.info("Health check endpoint accessed successfully")
+    """Liveness endpoint for Cloud Run; answers as soon as the worker serves requests."""
+    # Probes arrive every few seconds; they are only logged with LOG_LEVEL=DEBUG
+    probe_log.debug("Health check endpoint accessed successfully")
     return "OK", 200
 
-@app.route("/webhook/backlog/fm", methods=["POST"])
-def handle_backlog_webhook():
-    """Receives and validates a webhook from Backlog, then publishes to Pub/Sub for processing."""
+@app.route("/ready")
+def readiness_check():
+    """Readiness endpoint for the Cloud Run startup probe; 503 until warm-up has completed."""
+    status = readiness_status()
+    probe_log.debug("Readiness check: %s", status["state"])
+    return jsonify(status), 200 if status["ready"] else 503
+
+def readiness_status() -> dict:
+    """Return the warm-up report, treating a disabled warm-up as ready and a draining worker as not ready."""
+    if not WARMUP_ON_START:
+        warmup.disable()
+    status = warmup.status()
+    if shutdown_coordinator.draining:
+        status.update(ready=False, state="draining")
+    return status
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus metrics endpoint."""
+    if not METRICS_ENABLED:
+        return "Not Found", 404
+    return metrics_registry.render(), 200, {"Content-Type": METRICS_CONTENT_TYPE}
+
+def process_webhook(secret_tokens: tuple, query_token: str, is_json: bool, read_body,
+                    tenant: Optional[Tenant] = None) -> tuple:
+    """Run the transport-independent part of the webhook handler.
+    
+    Validates the token and payload and routes the event through ``event_router``,
+    which extracts one message per matching rule. Events of a type no rule
+    accepts are recognised from the raw body and ignored before the JSON
+    document is parsed. In async publish mode the messages are queued here as
+    well. Both the Flask and the ASGI entry points call this so their behaviour
+    stays identical.
+    
+    Args:
+        secret_tokens: Tokens currently accepted
+        query_token: Token supplied in the query string
+        is_json: Whether the request declares a JSON content type
+        read_body: Callable returning the raw request body, raising PayloadTooLarge
+            when it exceeds MAX_BODY_BYTES
+        tenant: Tenant the request is addressed to, None for the single-tenant route
+        
+    Returns:
+        tuple: (response, job). ``response`` is a (body, status) pair when the
+        request is finished; otherwise it is None and ``job.messages`` must be
+        published, followed by ``published_response`` or ``publish_failed_response``.
+    """
+    timer = StageTimer(stage_histogram)
+
+    # Validate webhook token
+    valid_token = bool(secret_tokens) and is_valid_token(query_token, secret_tokens)
+    timer.mark("token")
+    if not valid_token:
+        request_log.warning("Forbidden: Invalid or missing token provided.")
+        return ({"error": "Forbidden"}, 403), None
+
+    # Validate content type
+    if not is_json:
+        request_log.error("Bad Request: Content-Type is not application/json.")
+        return ({"error": "Bad Request"}, 400), None
+
+    # Read the body within the size limit
     try:
-        # Get secret token from environment or Secret Manager
-        secret_token = os.environ.get("BACKLOG_WEBHOOK_SECRET_TOKEN")
-        if not secret_token:
+        raw_body = read_body()
+    except PayloadTooLarge as e:
+        request_log.error("Payload Too Large: %s", e)
+        return ({"error": "Payload Too Large"}, 413), None
+    timer.mark("read_body")
+
+    return process_event_body(raw_body, timer, tenant)
+
+def process_event_body(raw_body: bytes, timer: StageTimer, tenant: Optional[Tenant] = None) -> tuple:
+    """Parse one raw event and hand it to ``process_event``.
+    
+    Events of a type no rule accepts are ignored before the JSON document is parsed.
+    
+    Args:
+        raw_body: The raw JSON event
+        timer: Stage timer of the request
+        tenant: Tenant the event was delivered for, if any
+        
+    Returns:
+        tuple: (response, job), as returned by ``process_webhook``
+    """
+    if not looks_like_json_object(raw_body):
+        request_log.error("Bad Request: Payload is not a JSON object.")
+        return ({"error": "Bad Request"}, 400), None
+
+    # Ignore events no rule can route without materializing the whole document
+    accepted_types = event_router.accepted_types
+    may_match = accepted_types is None or may_match_event_types(raw_body, accepted_types)
+    timer.mark("prescan")
+    if not may_match:
+        if request_log.isEnabledFor(logging.INFO):
+            request_log.info("Unrouted event ignored before parsing: type=%s", prescan_event_type(raw_body))
+        return ({"success": True, "message": "Event ignored - not a comment"}, 200), None
+
+    # Parse JSON payload
+    try:
+        payload = decode_json(raw_body)
+    except Exception as e:
+        request_log.error("Bad Request: Failed to parse JSON payload. Error: %s", e)
+        return ({"error": "Bad Request"}, 400), None
+    timer.mark("parse")
+
+    return process_event(payload, timer, tenant)
+
+def process_event(payload: dict, timer: StageTimer, tenant: Optional[Tenant] = None) -> tuple:
+    """Route a parsed event, claim it for dedup and, in async or outbox mode, enqueue it.
+    
+    For a tenant, messages for the default topic go to the tenant's topic, and
+    dedup and coalescing keys are scoped to the tenant since IDs of different
+    Backlog spaces can collide.
+    
+    Args:
+        payload: The parsed Backlog event
+        timer: Stage timer of the request
+        tenant: Tenant the event was delivered for, if any
+        
+    Returns:
+        tuple: (response, job), as returned by ``process_webhook``
+    """
+    request_log.info("Received Backlog webhook payload: event_type=%s", payload.get('type'))
+    
+    if tenant is not None:
+        project_key = (payload.get("project") or {}).get("projectKey")
+        if not tenant.accepts_project(project_key):
+            request_log.warning("Forbidden: project %s does not belong to tenant %s", project_key, tenant.name)
+            return ({"error": "Forbidden"}, 403), None
+
+    # Route the event and extract one message per matching rule
+    try:
+        messages = event_router.route(payload)
+    except Exception as e:
+        request_log.error("Failed to extract event data: %s", e)
+        return ({"error": "Internal Server Error"}, 500), None
+    timer.mark("route")
+
+    if not messages:
+        request_log.info("Webhook event matched no route, ignoring: type=%s", payload.get('type'))
+        return ({"success": True, "message": "Event ignored - not a comment"}, 200), None
+    if tenant is not None and tenant.topic:
+        messages = [routed._replace(topic=tenant.topic) if routed.topic == PUBSUB_TOPIC else routed
+                    for routed in messages]
+    attributes = event_attributes(payload)
+    if attributes is not None:
+        messages = [routed._replace(attributes=attributes) for routed in messages]
+        created_at = parse_timestamp(attributes.get(EVENT_CREATED_ATTRIBUTE))
+        if METRICS_ENABLED and created_at is not None:
+            EVENT_LAG.observe(max(0.0, time.time() - created_at), "received")
+    job = PublishJob(messages)
+    scope = f"{tenant.name}:" if tenant is not None else ""
+
+    # Answer retried or repeated deliveries without publishing them again
+    if dedup_store is not None:
+        job.dedup_key = scope + make_dedup_key(payload)
+        claimed, original_message_id = dedup_store.claim(job.dedup_key)
+        timer.mark("dedup")
+        if not claimed:
+            request_log.info("Duplicate delivery ignored: key=%s, message_id=%s",
+                             job.dedup_key, original_message_id or 'pending')
+            return ({
+                "success": True,
+                "message": "Duplicate delivery - already published",
+                "duplicate": True,
+                "message_id": original_message_id if original_message_id != PENDING else None,
+                "comment_id": job.comment_id
+            }, 200), None
+
+    # Charge the event against the per-project and per-user limits; repeated deliveries
+    # were answered above and cost nothing
+    if event_rate_limiter is not None:
+        exceeded = event_rate_limiter.check(payload, scope)
+        timer.mark("rate_limit")
+        if exceeded is not None:
+            dimension, wait = exceeded
+            if METRICS_ENABLED:
+                RATE_LIMITED.inc(dimension, RATE_LIMIT_ACTION)
+            if RATE_LIMIT_ACTION == "divert":
+                request_log.info("Event over the %s rate limit diverted to %s: comment_id=%s",
+                                 dimension, RATE_LIMIT_DIVERT_TOPIC, job.comment_id)
+                job.messages = [routed._replace(topic=RATE_LIMIT_DIVERT_TOPIC) for routed in job.messages]
+            else:
+                _finish_dedup(job.dedup_key, None)
+                retry_after = max(1, math.ceil(wait))
+                request_log.warning("Too Many Requests: %s rate limit exceeded, retry after %ss",
+                                    dimension, retry_after)
+                return ({
+                    "error": "Too Many Requests",
+                    "reason": "rate_limited",
+                    "limit": dimension,
+                    "retry_after": retry_after,
+                    "comment_id": job.comment_id
+                }, 429), None
+
+    # Hold rapid edits of the same comment and publish only the latest version. The
+    # dedup claims of superseded edits stay pending until they expire, so their
+    # redeliveries are still recognised.
+    if comment_coalescer is not None:
+        issue_key = message_ordering_key(payload)
+        issue_key = scope + issue_key if issue_key else ""
+        if payload.get("type") == COMMENT_UPDATED_TYPE and job.comment_id is not None:
+            comment_coalescer.offer(scope + str(job.comment_id), job, issue_key)
+            timer.mark("enqueue")
+            return ({
+                "success": True,
+                "message": "Comment update held for coalescing",
+                "mode": "coalesce",
+                "comment_id": job.comment_id,
+                "topics": [routed.topic for routed in job.messages]
+            }, 202), None
+        # Any other event of the issue must not overtake an edit that is still held
+        comment_coalescer.flush_group(issue_key)
+
+    # In async mode hand the messages to the in-process queue and acknowledge at once
+    if PUBLISH_MODE == "async":
+        if not enqueue_job(job):
+            request_log.error("Service Unavailable: async publish queue is full.")
+            return ({"error": "Service Unavailable", "mode": "async"}, 503), None
+        
+        timer.mark("enqueue")
+        return ({
+            "success": True,
+            "message": "Comment accepted for processing",
+            "mode": "async",
+            "comment_id": job.comment_id,
+            "topics": [routed.topic for routed in job.messages]
+        }, 202), None
+
+    # In outbox mode spool the messages to disk and acknowledge at once
+    if PUBLISH_MODE == "outbox":
+        response = spool_job(job)
+        timer.mark("enqueue")
+        return response, None
+
+    return None, job
+
+def publish_coalesced(job: PublishJob) -> None:
+    """Publish a comment update released by the coalescer in the configured publish mode.
+    
+    In sync mode the messages are submitted in the calling thread, so they reach
+    the publisher before any event whose arrival made the coalescer flush them.
+    """
+    if PUBLISH_MODE == "outbox":
+        spool_job(job)
+        return
+    if PUBLISH_MODE == "async":
+        if not enqueue_job(job):
+            publish_log.error("Async publish queue is full, dropped coalesced update: comment_id=%s", job.comment_id)
+        return
+
+    on_complete = _fan_out_completion(job.dedup_key, len(job.messages))
+
+    def done(future, routed):
+        error = future.exception()
+        if error is None:
+            _on_async_publish_success(routed, future.result())
+            on_complete(future.result(), None)
+        else:
+            _on_async_publish_failure(routed, error)
+            on_complete(None, error)
+
+    for routed in job.messages:
+        try:
+            future = submit_message(routed.message, routed.topic, routed.attributes)
+        except Exception as e:
+            _on_async_publish_failure(routed, e)
+            on_complete(None, e)
+            continue
+        future.add_done_callback(lambda f, r=routed: done(f, r))
+
+def enqueue_job(job: PublishJob) -> bool:
+    """Submit every routed message of a job to the async publish queue.
+    
+    Returns:
+        bool: False if the queue was full; messages already queued are still
+        published, so a retry of the event may repeat them
+    """
+    on_complete = _fan_out_completion(job.dedup_key, len(job.messages))
+    for position, routed in enumerate(job.messages):
+        if not publish_queue.submit(routed, on_complete):
+            for _ in job.messages[position:]:
+                on_complete(None, None)
+            return False
+    return True
+
+def publish_job(job: PublishJob) -> List[str]:
+    """Publish every routed message of a job and wait for all of them.
+    
+    The messages are submitted together so fan-out to several topics costs one
+    round trip rather than one per topic.
+    
+    Args:
+        job: The job to publish
+        
+    Returns:
+        List[str]: The message IDs, in the order of ``job.messages``
+        
+    Raises:
+        Exception: If any message fails to publish
+    """
+    try:
+        futures = [submit_message(routed.message, routed.topic, routed.attributes) for routed in job.messages]
+        message_ids = [future.result(timeout=PUBLISH_TIMEOUT) for future in futures]
+    except Exception as e:
+        publish_log.error("Failed to publish message to Pub/Sub: %s", e)
+        raise
+    for routed, message_id in zip(job.messages, message_ids):
+        publish_log.info("Published %s message to %s: %s", routed.rule, routed.topic, message_id)
+    return message_ids
+
+def published_response(job: PublishJob, message_ids: List[str]) -> tuple:
+    """Build the response for a job published in sync mode.
+    
+    Args:
+        job: The published job
+        message_ids: The Pub/Sub message IDs, in the order of ``job.messages``
+        
+    Returns:
+        tuple: (body, status) pair
+    """
+    _finish_dedup(job.dedup_key, message_ids[0])
+    request_log.info("Successfully published event to Pub/Sub: message_ids=%s, comment_id=%s",
+                     message_ids, job.comment_id)
+    
+    return {
+        "success": True,
+        "message": "Comment published for processing",
+        "mode": "sync",
+        "message_id": message_ids[0],
+        "comment_id": job.comment_id,
+        "topics": [routed.topic for routed in job.messages]
+    }, 200
+
+def publish_failed_response(job: PublishJob, error: Exception) -> tuple:
+    """Build the response for a job whose sync publish failed.
+    
+    With OUTBOX_FALLBACK the job is spooled to the outbox instead, so a Pub/Sub
+    incident does not depend on Backlog's limited retries.
+    
+    Args:
+        job: The job that failed to publish
+        error: The publish error
+        
+    Returns:
+        tuple: (body, status) pair
+    """
+    publish_log.error("Failed to publish message to Pub/Sub: %s", error)
+    if OUTBOX_FALLBACK:
+        return spool_job(job)
+    _finish_dedup(job.dedup_key, None)
+    return {"error": "Internal Server Error"}, 500
+
+def spool_job(job: PublishJob) -> tuple:
+    """Append a job to the outbox and build the response.
+    
+    The dedup entry stays pending until the drainer publishes the messages.
+    
+    Args:
+        job: The job to spool
+        
+    Returns:
+        tuple: (body, status) pair; 503 if the outbox is full
+    """
+    try:
+        seqs = get_outbox().append(
+            (routed.rule, routed.topic, routed.message, job.dedup_key) for routed in job.messages)
+    except OutboxFull as e:
+        _finish_dedup(job.dedup_key, None)
+        request_log.error("Service Unavailable: %s", e)
+        return {"error": "Service Unavailable", "mode": "outbox"}, 503
+    except Exception as e:
+        _finish_dedup(job.dedup_key, None)
+        request_log.error("Failed to append to the outbox: %s", e)
+        return {"error": "Internal Server Error"}, 500
+
+    request_log.info("Spooled event to the outbox: seq=%s, comment_id=%s", seqs, job.comment_id)
+    return {
+        "success": True,
+        "message": "Comment accepted for processing",
+        "mode": "outbox",
+        "comment_id": job.comment_id,
+        "topics": [routed.topic for routed in job.messages]
+    }, 202
+
+@dataclass
+class BatchJob:
+    """Per-item results of a batch request and the jobs still to publish in sync mode."""
+    results: List[Optional[dict]]
+    pending: List[Tuple[int, PublishJob]]
+
+def _item_result(index: int, body: dict, status: int) -> dict:
+    """Result of one batch item: the single-event response body with its index and status."""
+    return {"index": index, "status": status, **body}
+
+def process_batch(secret_tokens: tuple, query_token: str, mimetype: str, read_body,
+                  tenant: Optional[Tenant] = None) -> tuple:
+    """Run the transport-independent part of the batch handler.
+    
+    Accepts a JSON array (``application/json``) or one event per line
+    (``application/x-ndjson``). The token is checked once, then every item goes
+    through the same routing, dedup and enqueueing as a single webhook.
+    
+    Args:
+        secret_tokens: Tokens currently accepted
+        query_token: Token supplied in the query string
+        mimetype: Lower-case request content type without parameters
+        read_body: Callable returning the raw request body, raising PayloadTooLarge
+            when it exceeds BATCH_MAX_BODY_BYTES
+        tenant: Tenant the request is addressed to, None for the single-tenant route
+        
+    Returns:
+        tuple: (response, batch). ``response`` is a (body, status) pair when the
+        request is finished; otherwise it is None and the jobs in ``batch.pending``
+        must be published with ``submit_jobs``, followed by ``batch_response``.
+    """
+    timer = StageTimer(stage_histogram)
+
+    valid_token = bool(secret_tokens) and is_valid_token(query_token, secret_tokens)
+    timer.mark("token")
+    if not valid_token:
+        request_log.warning("Forbidden: Invalid or missing token provided.")
+        return ({"error": "Forbidden"}, 403), None
+
+    ndjson = mimetype in NDJSON_MIMETYPES
+    if not ndjson and not is_json_mimetype(mimetype):
+        request_log.error("Bad Request: Content-Type is neither JSON nor NDJSON.")
+        return ({"error": "Bad Request"}, 400), None
+
+    try:
+        raw_body = read_body()
+        timer.mark("read_body")
+        if ndjson:
+            items = split_ndjson(raw_body, BATCH_MAX_ITEMS)
+        else:
             try:
-                secret_token = get_secret("backlog-webhook-secret-token")
+                items = decode_json(raw_body)
             except Exception as e:
-                logging.error(f"Failed to retrieve webhook secret: {e}")
-                return jsonify(error="Internal Server Error"), 500
-        
-        query_token = request.args.get("token", "")
+                request_log.error("Bad Request: Failed to parse JSON batch. Error: %s", e)
+                return ({"error": "Bad Request"}, 400), None
+            if not isinstance(items, list):
+                request_log.error("Bad Request: Batch is not a JSON array.")
+                return ({"error": "Bad Request"}, 400), None
+            if len(items) > BATCH_MAX_ITEMS:
+                raise PayloadTooLarge(f"Batch has {len(items)} items, more than {BATCH_MAX_ITEMS}")
+    except PayloadTooLarge as e:
+        request_log.error("Payload Too Large: %s", e)
+        return ({"error": "Payload Too Large", "max_items": BATCH_MAX_ITEMS,
+                 "max_bytes": BATCH_MAX_BODY_BYTES}, 413), None
+    timer.mark("parse")
+    request_log.info("Received batch of %s events", len(items))
 
-        # Validate webhook token
-        if not secret_token or not hmac.compare_digest(query_token, secret_token):
-            logging.warning("Forbidden: Invalid or missing token provided.")
-            return jsonify(error="Forbidden"), 403
+    batch = BatchJob([None] * len(items), [])
+    for index, item in enumerate(items):
+        if ndjson:
+            response, job = process_event_body(item, timer, tenant)
+        elif isinstance(item, dict):
+            response, job = process_event(item, timer, tenant)
+        else:
+            response, job = ({"error": "Bad Request"}, 400), None
+        if job is None:
+            batch.results[index] = _item_result(index, *response)
+        else:
+            batch.pending.append((index, job))
 
-        # Validate content type
-        if not request.is_json:
-            logging.error("Bad Request: Content-Type is not application/json.")
-            return jsonify(error="Bad Request"), 400
+    if not batch.pending:
+        return batch_response(batch, []), None
+    return None, batch
+
+def submit_jobs(jobs: List[PublishJob]) -> list:
+    """Start publishing every message of several jobs before waiting for any of them.
+    
+    Submitting them together lets the client pack them into as few publish
+    requests as its batch settings allow.
+    
+    Args:
+        jobs: The jobs to publish
+        
+    Returns:
+        list: Per job, the list of futures or the exception raised while submitting
+    """
+    submitted = []
+    for job in jobs:
+        try:
+            submitted.append([submit_message(routed.message, routed.topic, routed.attributes)
+                              for routed in job.messages])
+        except Exception as e:
+            submitted.append(e)
+    return submitted
 
-        # Parse JSON payload
+def wait_for_jobs(submitted: list) -> list:
+    """Wait for jobs started with ``submit_jobs``; PUBLISH_TIMEOUT bounds the whole wait.
+    
+    Args:
+        submitted: The return value of ``submit_jobs``
+        
+    Returns:
+        list: Per job, the list of message IDs or the exception it failed with
+    """
+    deadline = None if PUBLISH_TIMEOUT is None else time.monotonic() + PUBLISH_TIMEOUT
+    outcomes = []
+    for futures in submitted:
+        if isinstance(futures, Exception):
+            outcomes.append(futures)
+            continue
         try:
-            payload = request.get_json()
+            outcomes.append([
+                future.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+                for future in futures
+            ])
         except Exception as e:
-            logging.error(f"Bad Request: Failed to parse JSON payload. Error: {e}")
-            return jsonify(error="Bad Request"), 400
+            outcomes.append(e)
+    return outcomes
 
-        logging.info(f"Received Backlog webhook payload: event_type={payload.get('type')}")
+def batch_response(batch: BatchJob, outcomes: list) -> tuple:
+    """Record the publish outcome of each pending job and build the batch response.
+    
+    Failed jobs are handled like a failed single webhook (dedup released, or
+    spooled with OUTBOX_FALLBACK). The response is 200 whenever the batch itself
+    was valid; each item carries its own status.
+    
+    Args:
+        batch: The batch returned by ``process_batch``
+        outcomes: Per pending job, its message IDs or the exception it failed with
         
-        # Check if this is a comment event
-        if not is_comment_event(payload):
-            logging.info("Webhook event is not a comment event, ignoring.")
-            return jsonify(success=True, message="Event ignored - not a comment"), 200
+    Returns:
+        tuple: (body, status) pair
+    """
+    for (index, job), outcome in zip(batch.pending, outcomes):
+        if isinstance(outcome, Exception):
+            body, status = publish_failed_response(job, outcome)
+        else:
+            for routed, message_id in zip(job.messages, outcome):
+                publish_log.info("Published %s message to %s: %s", routed.rule, routed.topic, message_id)
+            body, status = published_response(job, outcome)
+        batch.results[index] = _item_result(index, body, status)
+
+    status_counts = {}
+    for result in batch.results:
+        key = str(result["status"])
+        status_counts[key] = status_counts.get(key, 0) + 1
+    request_log.info("Processed batch of %s events: %s", len(batch.results), status_counts)
+    return {
+        "success": all(result["status"] < 300 for result in batch.results),
+        "mode": PUBLISH_MODE,
+        "items": len(batch.results),
+        "status_counts": status_counts,
+        "results": batch.results
+    }, 200
+
+def trace_request(name: str):
+    """Trace the current Flask request, continuing the caller's trace context if it sent one."""
+    return tracer.request(name, request.headers.get("traceparent"), request.headers.get("X-Cloud-Trace-Context"))
+
+@app.route("/webhook/backlog/fm", methods=["POST"])
+def handle_backlog_webhook():
+    """Receives and validates a webhook from Backlog, then publishes to Pub/Sub for processing."""
+    with trace_request("POST /webhook/backlog/fm"):
+        started = time.perf_counter()
+        body, status, headers = run_limited(_handle_backlog_webhook)
+        record_request(body, status, time.perf_counter() - started)
+    return jsonify(body), status, headers
 
-        # Extract and structure comment data
+@app.route("/webhook/backlog/<tenant_key>", methods=["POST"])
+def handle_tenant_webhook(tenant_key: str):
+    """Receives a webhook for one tenant of the registry; /webhook/backlog/fm keeps the single-tenant setup."""
+    if tenant_registry is None:
+        return "Not Found", 404
+    with trace_request("POST /webhook/backlog/<tenant>"):
+        started = time.perf_counter()
+        body, status, headers = run_limited(lambda: _handle_backlog_webhook(tenant_key))
+        record_request(body, status, time.perf_counter() - started)
+    return jsonify(body), status, headers
+
+def _handle_backlog_webhook(tenant_key: Optional[str] = None) -> tuple:
+    """Run the webhook handler and return its (body, status) pair."""
+    try:
+        timer = StageTimer(stage_histogram)
+        # Get secret tokens from environment, the Secret Manager cache or the tenant registry
         try:
-            comment_data = extract_comment_data(payload)
+            tenant, secret_tokens = get_request_tokens(tenant_key)
         except Exception as e:
-            logging.error(f"Failed to extract comment data: {e}")
-            return jsonify(error="Internal Server Error"), 500
+            request_log.error("Failed to retrieve webhook secret: %s", e)
+            return {"error": "Internal Server Error"}, 500
+        timer.mark("secret")
+        
+        response, job = process_webhook(
+            secret_tokens,
+            request.args.get("token", ""),
+            request.is_json,
+            lambda: read_limited(request.stream, MAX_BODY_BYTES, request.content_length),
+            tenant
+        )
+        if response:
+            return response
 
         # Publish to Pub/Sub for async processing
+        timer.skip()
         try:
-            message_id = publish_message(comment_data)
-            logging.info(f"Successfully published comment to Pub/Sub: message_id={message_id}, "
-                        f"comment_id={comment_data['content']['comment']['id']}")
-            
-            return jsonify({
-                "success": True,
-                "message": "Comment published for processing",
-                "message_id": message_id,
-                "comment_id": comment_data['content']['comment']['id']
-            }), 200
-            
+            message_ids = publish_job(job)
+        except Exception as e:
+            return publish_failed_response(job, e)
+        timer.mark("publish")
+
+        return published_response(job, message_ids)
+
+    except Exception as e:
+        request_log.exception("Unexpected error in webhook handler: %s", e)
+        return {"error": "Internal Server Error"}, 500
+
+@app.route("/webhook/backlog/fm/batch", methods=["POST"])
+def handle_backlog_webhook_batch():
+    """Receives an array or NDJSON stream of Backlog events and publishes them together."""
+    with trace_request("POST /webhook/backlog/fm/batch"):
+        started = time.perf_counter()
+        body, status, headers = run_limited(_handle_backlog_webhook_batch)
+        record_request(body, status, time.perf_counter() - started)
+    return jsonify(body), status, headers
+
+@app.route("/webhook/backlog/<tenant_key>/batch", methods=["POST"])
+def handle_tenant_webhook_batch(tenant_key: str):
+    """Batch endpoint for one tenant of the registry."""
+    if tenant_registry is None:
+        return "Not Found", 404
+    with trace_request("POST /webhook/backlog/<tenant>/batch"):
+        started = time.perf_counter()
+        body, status, headers = run_limited(lambda: _handle_backlog_webhook_batch(tenant_key))
+        record_request(body, status, time.perf_counter() - started)
+    return jsonify(body), status, headers
+
+def _handle_backlog_webhook_batch(tenant_key: Optional[str] = None) -> tuple:
+    """Run the batch handler and return its (body, status) pair."""
+    try:
+        timer = StageTimer(stage_histogram)
+        try:
+            tenant, secret_tokens = get_request_tokens(tenant_key)
         except Exception as e:
-            logging.error(f"Failed to publish message to Pub/Sub: {e}")
-            return jsonify(error="Internal Server Error"), 500
+            request_log.error("Failed to retrieve webhook secret: %s", e)
+            return {"error": "Internal Server Error"}, 500
+        timer.mark("secret")
+
+        response, batch = process_batch(
+            secret_tokens,
+            request.args.get("token", ""),
+            request.mimetype,
+            lambda: read_limited(request.stream, BATCH_MAX_BODY_BYTES, request.content_length),
+            tenant
+        )
+        if response:
+            return response
+
+        timer.skip()
+        outcomes = wait_for_jobs(submit_jobs([job for _, job in batch.pending]))
+        timer.mark("publish")
+        return batch_response(batch, outcomes)
 
     except Exception as e:
-        logging.error(f"Unexpected error in webhook handler: {e}")
-        return jsonify(error="Internal Server Error"), 500
+        request_log.exception("Unexpected error in batch handler: %s", e)
+        return {"error": "Internal Server Error"}, 500
 
 if __name__ == "__main__":
     # This block is for local development.
     # In Cloud Run, Gunicorn will be used as the server.
     port = int(os.environ.get("PORT", 8080))
+    if WARMUP_ON_START:
+        start_warmup()
     app.run(host="0.0.0.0", port=port, debug=False)
 
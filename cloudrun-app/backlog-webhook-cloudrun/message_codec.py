@@ -0,0 +1,147 @@
+import gzip
+import json
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Pub/Sub attribute names announcing how the message data was produced
+ENCODING_ATTRIBUTE = "encoding"
+COMPRESSION_ATTRIBUTE = "compression"
+
+ENCODINGS = ("json", "orjson", "msgpack")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+
+class MessageCodec:
+    """Encodes published payloads and announces the format in message attributes.
+
+    ``json`` and ``orjson`` both produce compact UTF-8 JSON and are announced as
+    ``encoding=json``, so consumers only need to distinguish JSON from msgpack.
+    Compression is applied only when the encoded payload reaches
+    ``compression_min_bytes``; smaller messages are announced as
+    ``compression=none`` because the framing overhead would outweigh the gain.
+
+    Messages published with the defaults (json, no compression) stay plain JSON
+    and can still be read by consumers that ignore the attributes.
+    """
+
+    def __init__(self, encoding: str = "json", compression: str = "none",
+                 compression_min_bytes: int = 1024, compression_level: Optional[int] = None):
+        """Validate the configuration and bind the encoder and compressor.
+
+        Args:
+            encoding: "json", "orjson" or "msgpack"
+            compression: "none", "gzip" or "zstd"
+            compression_min_bytes: Smallest encoded size that gets compressed
+            compression_level: Codec-specific level; gzip defaults to 6, zstd to 3
+
+        Raises:
+            ValueError: If a name is unknown or its optional package is not installed
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown MESSAGE_ENCODING: {encoding}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown MESSAGE_COMPRESSION: {compression}")
+        if encoding == "orjson" and orjson is None:
+            raise ValueError("MESSAGE_ENCODING=orjson requires the 'orjson' package")
+        if encoding == "msgpack" and msgpack is None:
+            raise ValueError("MESSAGE_ENCODING=msgpack requires the 'msgpack' package")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("MESSAGE_COMPRESSION=zstd requires the 'zstandard' package")
+
+        self.encoding = encoding
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self._wire_encoding = "msgpack" if encoding == "msgpack" else "json"
+
+        if encoding == "orjson":
+            self._encode = orjson.dumps
+        elif encoding == "msgpack":
+            self._encode = msgpack.packb
+        else:
+            self._encode = _dumps_compact_json
+
+        if compression == "gzip":
+            level = 6 if compression_level is None else compression_level
+            self._compress = lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+        elif compression == "zstd":
+            # ZstdCompressor is not thread-safe, and publishing happens on request threads
+            level = 3 if compression_level is None else compression_level
+            self._compress = lambda data: zstandard.ZstdCompressor(level=level).compress(data)
+        else:
+            self._compress = None
+
+    def encode(self, payload) -> tuple:
+        """Encode a payload for publishing.
+
+        Args:
+            payload: JSON-compatible message payload
+
+        Returns:
+            tuple: (data, attributes) to pass to ``PublisherClient.publish``
+        """
+        data = self._encode(payload)
+        compression = "none"
+        if self._compress is not None and len(data) >= self.compression_min_bytes:
+            data = self._compress(data)
+            compression = self.compression
+        return data, {ENCODING_ATTRIBUTE: self._wire_encoding, COMPRESSION_ATTRIBUTE: compression}
+
+    def __repr__(self) -> str:
+        return (f"MessageCodec(encoding={self.encoding!r}, compression={self.compression!r}, "
+                f"compression_min_bytes={self.compression_min_bytes})")
+
+
+def _dumps_compact_json(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_message(data: bytes, attributes: Optional[dict] = None):
+    """Decode message data using the format announced in its attributes.
+
+    Messages without attributes are treated as uncompressed JSON, which is what
+    the service published before encodings were configurable.
+
+    Args:
+        data: The Pub/Sub message data
+        attributes: The Pub/Sub message attributes
+
+    Returns:
+        The decoded payload
+
+    Raises:
+        ValueError: If the announced format is unknown or its package is not installed
+    """
+    attributes = attributes or {}
+    compression = attributes.get(COMPRESSION_ATTRIBUTE, "none")
+    encoding = attributes.get(ENCODING_ATTRIBUTE, "json")
+
+    if compression == "gzip":
+        data = gzip.decompress(data)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd-compressed message requires the 'zstandard' package")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif compression != "none":
+        raise ValueError(f"Unknown message compression: {compression}")
+
+    if encoding == "json":
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    if encoding == "msgpack":
+        if msgpack is None:
+            raise ValueError("msgpack-encoded message requires the 'msgpack' package")
+        return msgpack.unpackb(data)
+    raise ValueError(f"Unknown message encoding: {encoding}")
@@ -0,0 +1,256 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tracing import current_trace
+
+# Latency buckets in seconds, from 50 microseconds (in-process stages) to 10 seconds (slow publishes)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Age buckets in seconds, for lags that include Backlog's delivery delay and retries
+LAG_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _merge_counts(total: dict, shard: dict) -> None:
+    for labels, value in list(shard.items()):
+        total[labels] = total.get(labels, 0) + value
+
+
+def _merge_entries(total: dict, shard: dict) -> None:
+    # New lists rather than in-place sums, so copies handed to readers never change
+    for labels, entry in list(shard.items()):
+        current = total.get(labels)
+        total[labels] = list(entry) if current is None else [a + b for a, b in zip(current, entry)]
+
+
+class _ThreadShards:
+    """Per-thread value dicts, so the request path updates metrics without taking a lock.
+
+    Each thread only writes its own dict; readers merge all of them. Shards of
+    finished threads are folded into one retired dict whenever a shard is added
+    or read, so short-lived threads (the Pub/Sub client commits every batch on
+    a new one) keep their counts without leaving a shard each behind.
+    """
+
+    def __init__(self, merge: Callable[[dict, dict], None]):
+        # Callers read local.values directly and call add() on AttributeError
+        self.local = threading.local()
+        self._merge = merge
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def add(self) -> dict:
+        values = self.local.values = {}
+        with self._lock:
+            self._fold_finished()
+            self._shards.append((threading.current_thread(), values))
+        return values
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            self._fold_finished()
+            return [dict(self._retired)] + [values for _, values in self._shards]
+
+    def _fold_finished(self) -> None:
+        # A finished thread no longer writes its shard, so it can be merged without racing
+        live = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                live.append((thread, values))
+            else:
+                self._merge(self._retired, values)
+        self._shards = live
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_merge_counts)
+        self._local = self._shards.local
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        """Increase the counter for the given label values."""
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._shards.add()
+        values[labelvalues] = values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        """Return the current value for the given label values."""
+        return sum(shard.get(labelvalues, 0) for shard in self._shards.all())
+
+    def _merged(self) -> Dict[tuple, float]:
+        merged: Dict[tuple, float] = {}
+        for shard in self._shards.all():
+            _merge_counts(merged, shard)
+        return merged
+
+    def render(self) -> List[str]:
+        items = sorted(self._merged().items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                  for labels, value in items]
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and optional labels."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: [count per bucket, plus one for +Inf, then the sum]
+        self._shards = _ThreadShards(_merge_entries)
+        self._local = self._shards.local
+
+    def observe(self, value: float, *labelvalues) -> None:
+        """Record one observation for the given label values."""
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._shards.add()
+        entry = values.get(labelvalues)
+        if entry is None:
+            entry = values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def _merged(self) -> Dict[tuple, list]:
+        merged: Dict[tuple, list] = {}
+        for shard in self._shards.all():
+            _merge_entries(merged, shard)
+        return merged
+
+    def snapshot(self, *labelvalues) -> Tuple[int, float]:
+        """Return (count, sum) for the given label values."""
+        entry = self._merged().get(labelvalues)
+        return (sum(entry[:-1]), entry[-1]) if entry else (0, 0.0)
+
+    def render(self) -> List[str]:
+        items = sorted((labels, (entry[:-1], entry[-1])) for labels, entry in self._merged().items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format.
+
+    Besides counters and histograms updated on the request path, collectors
+    registered with ``register_collector`` are called at scrape time to report
+    gauges from components that already keep their own counters.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]) -> None:
+        """Register a scrape-time collector.
+
+        Args:
+            collector: Callable returning (name, help, labels dict, value) gauge samples
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text, ending with a newline
+        """
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+
+        described = set()
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                lines.append(f"# collector failed: {_escape(e)}")
+                continue
+            for name, help_text, labels, value in samples:
+                if name not in described:
+                    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+                    described.add(name)
+                lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """Records the time between successive marks into a stage histogram.
+
+    One ``perf_counter`` call and one histogram observation per stage keeps
+    the cost of instrumenting a request in the low microseconds. When the
+    request is traced, each stage is also recorded as a span.
+    """
+
+    __slots__ = ("_histogram", "_trace", "_last")
+
+    def __init__(self, histogram: Optional[Histogram]):
+        self._histogram = histogram
+        self._trace = current_trace()
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Record the time since the previous mark (or creation) as ``stage``."""
+        if self._histogram is None and self._trace is None:
+            return
+        now = time.perf_counter()
+        if self._histogram is not None:
+            self._histogram.observe(now - self._last, stage)
+        if self._trace is not None:
+            self._trace.add_span(stage, self._last, now)
+        self._last = now
+
+    def skip(self) -> None:
+        """Restart timing without recording, e.g. after time spent elsewhere."""
+        self._last = time.perf_counter()
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+def message_ordering_key(message: dict) -> str:
+    """Derive the Pub/Sub ordering key of a message from the issue it belongs to.
+
+    Works on raw webhook payloads (issue fields inside ``content``) as well as
+    on extracted comment messages (``content.issue``), and gives both the same
+    key. ``issue.id`` is used when present, since both carry it; otherwise the
+    issue key (``GENAI-1``), rebuilt from ``project.projectKey`` and
+    ``content.key_id`` if needed.
+
+    Args:
+        message: A webhook payload or routed message
+
+    Returns:
+        str: The ordering key, or "" for messages that belong to no issue
+    """
+    content = message.get("content")
+    if not isinstance(content, dict):
+        return ""
+    issue = content.get("issue")
+    if not isinstance(issue, dict):
+        issue = content if "summary" in content or "key_id" in content else None
+    if not issue:
+        return ""
+    if issue.get("id") is not None:
+        return f"issue-{issue['id']}"
+    key = issue.get("issueKey")
+    if not key:
+        project_key = (message.get("project") or {}).get("projectKey")
+        if project_key and issue.get("key_id") is not None:
+            key = f"{project_key}-{issue['key_id']}"
+    return str(key or "")
+
+
+class Coalescer:
+    """Holds items for a short window and keeps only the latest one per key.
+
+    The first ``offer`` for a key starts its window; later offers within the
+    window replace the held item without extending it, so no item waits longer
+    than ``window`` seconds. Due items are handed to ``flush`` by a background
+    thread in the order their keys were first offered. ``flush_group`` hands
+    over every held item of a group (the ordering key) at once, so that an
+    event published immediately never overtakes an earlier held one.
+    """
+
+    def __init__(self, window: float, flush: Callable[[Any], None],
+                 clock: Callable[[], float] = time.monotonic, name: str = "coalescer"):
+        """Create a coalescer.
+
+        Args:
+            window: Seconds an item is held before it is flushed
+            flush: Callable receiving each item when it is released
+            clock: Monotonic clock, replaceable in tests
+            name: Name of the background thread
+        """
+        self.window = window
+        self._flush = flush
+        self._clock = clock
+        self._name = name
+
+        self._cond = threading.Condition()
+        # Held while items are popped and handed over, so a group flush waits for a
+        # background release in progress instead of overtaking it
+        self._flush_lock = threading.Lock()
+        # key -> [item, group, deadline]; dicts keep the order keys were first offered
+        self._pending: Dict[Any, list] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._held = 0
+        self._superseded = 0
+        self._flushed = 0
+
+    def offer(self, key, item, group: str = "") -> Optional[Any]:
+        """Hold an item, replacing the one already held for the same key.
+
+        Args:
+            key: Items with equal keys collapse into the latest one
+            item: The item to hold
+            group: Group flushed together by ``flush_group``
+
+        Returns:
+            The item that was replaced, or None
+        """
+        self._ensure_worker()
+        with self._cond:
+            entry = self._pending.get(key)
+            self._held += 1
+            if entry is not None:
+                replaced = entry[0]
+                entry[0] = item
+                entry[1] = group
+                self._superseded += 1
+                return replaced
+            self._pending[key] = [item, group, self._clock() + self.window]
+            self._cond.notify()
+        return None
+
+    def flush_group(self, group: str) -> int:
+        """Flush every held item of a group now, in the calling thread.
+
+        Returns:
+            int: The number of items flushed
+        """
+        if not group:
+            return 0
+        with self._flush_lock:
+            with self._cond:
+                keys = [key for key, entry in self._pending.items() if entry[1] == group]
+                items = [self._pending.pop(key)[0] for key in keys]
+            self._release(items)
+        return len(items)
+
+    def flush_all(self) -> int:
+        """Flush every held item now, e.g. before shutting down.
+
+        Returns:
+            int: The number of items flushed
+        """
+        with self._flush_lock:
+            with self._cond:
+                items = [entry[0] for entry in self._pending.values()]
+                self._pending.clear()
+            self._release(items)
+        return len(items)
+
+    def stats(self) -> dict:
+        """Return coalescer counters for monitoring.
+
+        Returns:
+            dict: Held (offered), superseded, flushed and currently pending counts
+        """
+        with self._cond:
+            return {
+                "held": self._held,
+                "superseded": self._superseded,
+                "flushed": self._flushed,
+                "pending": len(self._pending),
+            }
+
+    def _release(self, items: list) -> None:
+        for item in items:
+            try:
+                self._flush(item)
+            except Exception as e:
+                logging.error(f"Coalesced item flush failed: {e}")
+        if items:
+            with self._cond:
+                self._flushed += len(items)
+
+    def _ensure_worker(self) -> None:
+        # Started lazily so the thread lives in the gunicorn worker, not the preloading master
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = min((entry[2] for entry in self._pending.values()), default=None)
+                now = self._clock()
+                if deadline is None or deadline > now:
+                    self._cond.wait(None if deadline is None else deadline - now)
+                    continue
+            with self._flush_lock:
+                with self._cond:
+                    now = self._clock()
+                    due = [key for key, entry in self._pending.items() if entry[2] <= now]
+                    items = [self._pending.pop(key)[0] for key in due]
+                self._release(items)
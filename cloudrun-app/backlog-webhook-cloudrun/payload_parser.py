@@ -0,0 +1,122 @@
+import json
+import re
+from typing import Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Any numeric "type" member, at any depth. Scanning raw bytes with a compiled
+# regex runs in C and is far cheaper than materializing the whole document.
+_TYPE_MEMBER = re.compile(rb'"type"\s*:\s*(-?\d+)')
+_LEADING_WHITESPACE = b" \t\r\n"
+
+
+class PayloadTooLarge(Exception):
+    """Raised when a request body exceeds the configured size limit."""
+
+
+def get_decoder(name: str = "auto"):
+    """Return the JSON decoding function selected by configuration.
+
+    Args:
+        name: "orjson", "json", or "auto" to use orjson when it is installed
+
+    Returns:
+        Callable[[bytes], object]: Function decoding UTF-8 JSON bytes
+
+    Raises:
+        ValueError: If the name is unknown or orjson is requested but not installed
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("JSON_DECODER=orjson requires the 'orjson' package")
+        return orjson.loads
+    if name == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON_DECODER: {name}")
+
+
+def read_limited(stream, max_bytes: int, content_length: Optional[int] = None) -> bytes:
+    """Read a request body, failing fast once it exceeds ``max_bytes``.
+
+    Args:
+        stream: File-like object with a ``read(size)`` method
+        max_bytes: Maximum accepted body size
+        content_length: Declared Content-Length, checked before reading anything
+
+    Returns:
+        bytes: The request body
+
+    Raises:
+        PayloadTooLarge: If the declared or actual body size exceeds the limit
+    """
+    if content_length is not None and content_length > max_bytes:
+        raise PayloadTooLarge(f"Content-Length {content_length} exceeds {max_bytes} bytes")
+    body = stream.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        raise PayloadTooLarge(f"Body exceeds {max_bytes} bytes")
+    return body
+
+
+def may_match_event_types(raw: bytes, accepted_types: Iterable[int]) -> bool:
+    """Cheaply decide whether a raw payload could be one of the accepted event types.
+
+    Only numeric ``"type"`` members are considered. If none of them, at any
+    depth, holds an accepted value, the top-level ``type`` cannot hold one
+    either and the payload can be rejected without parsing. A match only means
+    the payload must be fully parsed; nested members or text inside strings can
+    produce false positives but never false negatives.
+
+    Args:
+        raw: The raw JSON request body
+        accepted_types: Event types worth parsing
+
+    Returns:
+        bool: False if the payload is certainly not one of the accepted types
+    """
+    accepted = set(accepted_types)
+    for match in _TYPE_MEMBER.finditer(raw):
+        if int(match.group(1)) in accepted:
+            return True
+    return False
+
+
+def prescan_event_type(raw: bytes) -> Optional[int]:
+    """Return the first numeric ``type`` member found in the raw payload, for logging."""
+    match = _TYPE_MEMBER.search(raw)
+    return int(match.group(1)) if match else None
+
+
+def looks_like_json_object(raw: bytes) -> bool:
+    """Return True if the body starts with ``{`` after optional whitespace."""
+    return raw.lstrip(_LEADING_WHITESPACE)[:1] == b"{"
+
+
+def is_json_mimetype(mimetype: str) -> bool:
+    """Return True for ``application/json`` and ``application/*+json``, like Flask's ``request.is_json``."""
+    return mimetype == "application/json" or (mimetype.startswith("application/") and mimetype.endswith("+json"))
+
+
+def split_ndjson(raw: bytes, max_items: int) -> List[bytes]:
+    """Split a newline-delimited JSON body into its non-blank lines.
+
+    Lines are not parsed here, so each can still be pre-scanned before decoding.
+
+    Args:
+        raw: The raw request body
+        max_items: Maximum number of lines accepted
+
+    Returns:
+        List[bytes]: One raw JSON document per line
+
+    Raises:
+        PayloadTooLarge: If the body holds more than ``max_items`` lines
+    """
+    lines = [line for line in raw.split(b"\n") if line.strip()]
+    if len(lines) > max_items:
+        raise PayloadTooLarge(f"Batch has {len(lines)} items, more than {max_items}")
+    return lines
@@ -0,0 +1,255 @@
+import copy
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+# Sentinel for a missing field in generated extractors
+_MISSING = object()
+_EMPTY: dict = {}
+
+_OBJECT_DIRECTIVES = {"$root", "$optional"}
+_LEAF_DIRECTIVES = {"$path", "$default"}
+
+
+def load_projections(environ=None) -> Optional[dict]:
+    """Load projection specs from EVENT_PROJECTIONS_FILE or EVENT_PROJECTIONS.
+
+    Both hold a JSON object mapping extractor names to projection specs; the
+    file takes precedence.
+
+    Args:
+        environ: Mapping to read variables from (defaults to os.environ)
+
+    Returns:
+        Optional[dict]: The specs by name, or None if none are configured
+
+    Raises:
+        ValueError: If the configuration is not a JSON object
+    """
+    if environ is None:
+        environ = os.environ
+    path = environ.get("EVENT_PROJECTIONS_FILE")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            specs = json.load(f)
+        source = path
+    elif environ.get("EVENT_PROJECTIONS"):
+        specs = json.loads(environ["EVENT_PROJECTIONS"])
+        source = "EVENT_PROJECTIONS"
+    else:
+        return None
+    if not isinstance(specs, dict):
+        raise ValueError(f"{source} must contain a JSON object mapping extractor names to projections")
+    return specs
+
+
+class _Codegen:
+    """Emits the body of one extractor function, caching path prefixes in locals.
+
+    Unless ``checked`` is set, intermediate values are assumed to be objects
+    when present, and a value that is not raises AttributeError on ``.get``.
+    """
+
+    def __init__(self, name: str, checked: bool = True):
+        self.name = name
+        self.checked = checked
+        self.lines: List[str] = []
+        self.constants: list = []
+        self._counter = 0
+
+    def var(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def const(self, value) -> str:
+        self.constants.append(value)
+        ref = f"_C{len(self.constants) - 1}"
+        # Mutable defaults are copied so messages never share them
+        return f"_copy({ref})" if isinstance(value, (dict, list)) else ref
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def keys(self, path) -> List[str]:
+        if not isinstance(path, str) or not path or any(not key for key in path.split(".")):
+            raise ValueError(f"Projection {self.name}: invalid path {path!r}")
+        return path.split(".")
+
+    @staticmethod
+    def get(source: str, key: str, default: str) -> str:
+        """Return an expression for ``source[key]``, or ``default`` if it is missing."""
+        return f"{source}.get({key!r})" if default == "None" else f"{source}.get({key!r}, {default})"
+
+    def resolve(self, base: str, keys: List[str], cache: dict, indent: int) -> str:
+        """Emit the lookup of the object at a key path below ``base``.
+
+        Every step that is missing or not an object becomes the shared empty
+        dict, so the returned variable always holds a dict and the leaves below
+        it need no further checks.
+        """
+        current = base
+        prefix = ()
+        for key in keys:
+            prefix += (key,)
+            cached = cache.get((base, prefix))
+            if cached is None:
+                cached = self.var("v")
+                self.emit(indent, f"{cached} = {current}.get({key!r}, _E)")
+                if self.checked:
+                    self.emit(indent, f"if not isinstance({cached}, dict):")
+                    self.emit(indent + 1, f"{cached} = _E")
+                cache[(base, prefix)] = cached
+            current = cached
+        return current
+
+    def node(self, spec, base: str, cache: dict, indent: int, where: str) -> str:
+        """Emit one output value and return the variable or expression holding it."""
+        if isinstance(spec, (str, list)):
+            return self.leaf({"$path": spec}, base, cache, indent, where)
+        if not isinstance(spec, dict):
+            raise ValueError(f"Projection {self.name}: {where} must be a path, a list of paths or an object")
+        if "$path" in spec:
+            return self.leaf(spec, base, cache, indent, where)
+        return self.obj(spec, base, cache, indent, where)
+
+    def leaf(self, spec: dict, base: str, cache: dict, indent: int, where: str) -> str:
+        unknown = set(spec) - _LEAF_DIRECTIVES
+        if unknown:
+            raise ValueError(f"Projection {self.name}: {where} has unknown keys {sorted(unknown)}")
+        paths = spec["$path"] if isinstance(spec["$path"], list) else [spec["$path"]]
+        if not paths:
+            raise ValueError(f"Projection {self.name}: {where} has no path")
+        paths = [self.keys(path) for path in paths]
+        default = self.const(spec["$default"]) if "$default" in spec else "None"
+        if len(paths) == 1 and not default.startswith("_copy"):
+            # The last key is looked up inline, with the default as fallback
+            parent = self.resolve(base, paths[0][:-1], cache, indent)
+            return self.get(parent, paths[0][-1], default)
+        result = self.var("r")
+        parent = self.resolve(base, paths[0][:-1], cache, indent)
+        self.emit(indent, f"{result} = {self.get(parent, paths[0][-1], '_M')}")
+        # Later alternatives are only looked up when the earlier ones are missing
+        for keys in paths[1:]:
+            self.emit(indent, f"if {result} is _M:")
+            parent = self.resolve(base, keys[:-1], dict(cache), indent + 1)
+            self.emit(indent + 1, f"{result} = {self.get(parent, keys[-1], '_M')}")
+        return f"({default} if {result} is _M else {result})"
+
+    def obj(self, spec: dict, base: str, cache: dict, indent: int, where: str) -> str:
+        unknown = {key for key in spec if key.startswith("$")} - _OBJECT_DIRECTIVES
+        if unknown:
+            raise ValueError(f"Projection {self.name}: {where} has unknown directives {sorted(unknown)}")
+        fields = [(key, value) for key, value in spec.items() if not key.startswith("$")]
+        if "$root" not in spec:
+            if "$optional" in spec:
+                raise ValueError(f"Projection {self.name}: {where} uses $optional without $root")
+            return self.fields(fields, base, cache, indent, where)
+
+        # Paths below $root are relative to the first candidate that is a non-empty
+        # object with every required field set
+        root = self.var("b")
+        self.emit(indent, f"{root} = _M")
+        candidates = spec["$root"] if isinstance(spec["$root"], list) else [spec["$root"]]
+        for position, candidate in enumerate(candidates):
+            if isinstance(candidate, str):
+                candidate = {"path": candidate}
+            if not isinstance(candidate, dict) or set(candidate) - {"path", "require"}:
+                raise ValueError(f"Projection {self.name}: invalid $root candidate {candidate!r} in {where}")
+            scope_indent = indent if position == 0 else indent + 1
+            scope_cache = cache if position == 0 else dict(cache)
+            if position:
+                self.emit(indent, f"if {root} is _M:")
+            value = self.resolve(base, self.keys(candidate.get("path")), scope_cache, scope_indent)
+            tests = [value] + [f"{value}.get({field!r})" for field in candidate.get("require", [])]
+            self.emit(scope_indent, f"if {' and '.join(tests)}:")
+            self.emit(scope_indent + 1, f"{root} = {value}")
+
+        if not spec.get("$optional"):
+            self.emit(indent, f"if {root} is _M:")
+            self.emit(indent + 1, f"{root} = _E")
+            return self.fields(fields, root, cache, indent, where)
+        result = self.var("o")
+        self.emit(indent, f"if {root} is _M:")
+        self.emit(indent + 1, f"{result} = None")
+        self.emit(indent, "else:")
+        self.emit(indent + 1, f"{result} = {self.fields(fields, root, dict(cache), indent + 1, where)}")
+        return result
+
+    def fields(self, fields: list, base: str, cache: dict, indent: int, where: str) -> str:
+        """Emit the fields of an output object and return the dict display building it."""
+        values = [(key, self.node(value, base, cache, indent, f"{where}.{key}" if where else key))
+                  for key, value in fields]
+        return f"{{{', '.join(f'{key!r}: {value}' for key, value in values)}}}"
+
+
+def compile_projection(spec: dict, name: str = "projection") -> Callable[[dict], dict]:
+    """Compile a projection spec into an extractor function.
+
+    The spec has the shape of the output. Each value is a dotted source path,
+    a list of alternative paths (the first present one wins), an object with
+    ``$path`` and an optional ``$default`` used when the field is missing, or a
+    nested output object. A nested object may set ``$root`` to one or more
+    candidate paths, optionally as ``{"path": ..., "require": [fields]}``; its
+    paths are then relative to the first candidate that is a non-empty object
+    with every required field set, and with ``$optional`` it becomes null when
+    no candidate matches. Missing fields without a default become null.
+
+    The spec is turned into Python source once, so extracting a message costs
+    no interpretation of the spec. The generated function skips type checks and
+    falls back to a fully checked variant only for payloads where a field on a
+    path is set but is not an object (e.g. null).
+
+    Args:
+        spec: The projection spec
+        name: Name used in error messages and as the function name
+
+    Returns:
+        Callable[[dict], dict]: The extractor
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    if not isinstance(spec, dict) or "$path" in spec:
+        raise ValueError(f"Projection {name}: the spec must be an output object")
+    checked = _generate(spec, name, checked=True)
+    fast = _generate(spec, name, checked=False)
+    fast.lines = ["    try:"] + ["    " + line for line in fast.lines] + [
+        "    except AttributeError:",
+        "        return _checked(payload)"]
+
+    checked_extract = _define(checked, name, {})
+    extract = _define(fast, name, {"_checked": checked_extract})
+    extract.source = "\n".join([extract.source, checked_extract.source])
+    return extract
+
+
+def _generate(spec: dict, name: str, checked: bool) -> _Codegen:
+    codegen = _Codegen(name, checked)
+    result = codegen.obj(spec, "payload", {}, 1, "")
+    codegen.emit(1, f"return {result}")
+    return codegen
+
+
+def _define(codegen: _Codegen, name: str, extra: dict) -> Callable[[dict], dict]:
+    # Constants and helpers are bound as default arguments, which are read like locals
+    bound = {"_M": _MISSING, "_E": _EMPTY, "_copy": copy.deepcopy, "isinstance": isinstance, "dict": dict}
+    bound.update((f"_C{index}", value) for index, value in enumerate(codegen.constants))
+    bound.update(extra)
+    body = "\n".join(codegen.lines)
+    parameters = ", ".join(["payload"] + [f"{key}={key}" for key in bound if key in body])
+    source = f"def extract({parameters}):\n{body}\n"
+    namespace = dict(bound)
+    exec(compile(source, f"<projection {name}>", "exec"), namespace)
+    extract = namespace["extract"]
+    extract.__name__ = extract.__qualname__ = f"project_{name.replace('-', '_')}"
+    extract.source = source
+    return extract
+
+
+def compile_projections(specs: Dict[str, dict]) -> Dict[str, Callable[[dict], dict]]:
+    """Compile several projection specs, e.g. those returned by ``load_projections``.
+
+    Raises:
+        ValueError: If a spec is malformed
+    """
+    return {name: compile_projection(spec, name) for name, spec in specs.items()}
@@ -0,0 +1,43 @@
+import os
+from typing import Mapping, Optional, Tuple
+
+from google.cloud.pubsub_v1 import types
+
+
+def load_publisher_settings(environ: Optional[Mapping[str, str]] = None) -> Tuple[types.BatchSettings, types.PublisherOptions]:
+    """Build Pub/Sub batch settings and publisher options from environment variables.
+
+    Unset variables fall back to the client library defaults, so an empty
+    environment produces the same publisher as ``PublisherClient()``.
+
+    Args:
+        environ: Mapping to read from, defaults to ``os.environ``
+
+    Returns:
+        Tuple[BatchSettings, PublisherOptions]: Settings for ``PublisherClient``
+
+    Raises:
+        ValueError: If a variable holds an invalid value
+    """
+    env = os.environ if environ is None else environ
+    batch_defaults = types.BatchSettings()
+    flow_defaults = types.PublishFlowControl()
+
+    batch_settings = types.BatchSettings(
+        max_bytes=int(env.get("PUBSUB_BATCH_MAX_BYTES", batch_defaults.max_bytes)),
+        max_latency=float(env.get("PUBSUB_BATCH_MAX_LATENCY", batch_defaults.max_latency)),
+        max_messages=int(env.get("PUBSUB_BATCH_MAX_MESSAGES", batch_defaults.max_messages))
+    )
+
+    behavior = env.get("PUBSUB_FLOW_LIMIT_BEHAVIOR", flow_defaults.limit_exceeded_behavior.value).lower()
+    flow_control = types.PublishFlowControl(
+        message_limit=int(env.get("PUBSUB_FLOW_MAX_MESSAGES", flow_defaults.message_limit)),
+        byte_limit=int(env.get("PUBSUB_FLOW_MAX_BYTES", flow_defaults.byte_limit)),
+        limit_exceeded_behavior=types.LimitExceededBehavior(behavior)
+    )
+
+    # Ordering keys are rejected by the client unless ordering is enabled
+    enable_ordering = env.get("PUBSUB_ORDERING_ENABLED", "false").lower() == "true"
+
+    return batch_settings, types.PublisherOptions(flow_control=flow_control,
+                                                  enable_message_ordering=enable_ordering)
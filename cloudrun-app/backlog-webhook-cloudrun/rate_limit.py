@@ -0,0 +1,312 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# Limit of one dimension: (events per second, burst)
+Limit = Tuple[float, float]
+
+
+def parse_limit_spec(text: str) -> Tuple[Optional[Limit], Dict[str, Limit]]:
+    """Parse a RATE_LIMIT_PROJECT / RATE_LIMIT_USER value, e.g. ``"0.5/20,GENAI=5/50"``.
+
+    An entry without a name is the default limit for every key; named entries
+    override it for one key.
+
+    Args:
+        text: Comma-separated ``rate/burst`` or ``key=rate/burst`` entries
+
+    Returns:
+        tuple: (default limit or None, overrides by key)
+
+    Raises:
+        ValueError: If an entry is malformed or a rate or burst is not positive
+    """
+    default = None
+    overrides = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        key, sep, value = part.rpartition("=")
+        rate, slash, burst = value.partition("/")
+        if not slash:
+            raise ValueError(f"Invalid rate limit {part!r}, expected [key=]rate/burst")
+        limit = (float(rate), float(burst))
+        if limit[0] <= 0 or limit[1] < 1:
+            raise ValueError(f"Rate limit {part!r} needs a positive rate and a burst of at least 1")
+        if sep:
+            overrides[key.strip()] = limit
+        else:
+            default = limit
+    return default, overrides
+
+
+class TokenBucketLimiter:
+    """In-process token buckets, one per key, bounded by an LRU.
+
+    Each bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+    second; an event takes one token. Evicting an idle key only resets its
+    bucket to full, which is what it would have refilled to anyway.
+    """
+
+    def __init__(self, default: Optional[Limit], overrides: Optional[Dict[str, Limit]] = None,
+                 max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        """Create a limiter.
+
+        Args:
+            default: (rate, burst) for keys without an override; None leaves them unlimited
+            overrides: (rate, burst) by key
+            max_keys: Maximum number of buckets kept; the least recently used are evicted
+            clock: Monotonic clock, replaceable in tests
+        """
+        self._default = default
+        self._overrides = overrides or {}
+        self._max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._limited = 0
+        self._evictions = 0
+
+    def acquire(self, key: str, scope: str = "") -> float:
+        """Take one token from the bucket of a key.
+
+        Args:
+            key: The limited key, e.g. a project key
+            scope: Prefix keeping the buckets of different tenants apart
+
+        Returns:
+            float: 0 if the event is allowed, otherwise the seconds until a token is available
+        """
+        limit = self._overrides.get(key, self._default)
+        if limit is None:
+            return 0.0
+        rate, burst = limit
+        key = scope + key
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now)
+                self._allowed += 1
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                self._limited += 1
+                wait = (1.0 - tokens) / rate
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+                self._evictions += 1
+        return wait
+
+    def refund(self, key: str, scope: str = "") -> None:
+        """Return the token taken by an allowed ``acquire`` whose event was rejected elsewhere."""
+        limit = self._overrides.get(key, self._default)
+        if limit is None:
+            return
+        key = scope + key
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets[key] = (min(limit[1], bucket[0] + 1.0), bucket[1])
+            self._allowed -= 1
+
+    def stats(self) -> dict:
+        """Return limiter counters for monitoring."""
+        with self._lock:
+            return {"backend": "memory", "allowed": self._allowed, "limited": self._limited,
+                    "evictions": self._evictions, "keys": len(self._buckets)}
+
+
+class RedisRateLimiter:
+    """Rate limit shared across Cloud Run instances through Redis.
+
+    Allows ``burst`` events per key in each fixed window of ``burst / rate``
+    seconds, counted with INCR so no server-side script is needed. Works with
+    any client offering ``incr`` and ``expire``, such as ``redis.Redis`` or the
+    local ``fake_redis`` stand-in. Redis errors fail open.
+    """
+
+    def __init__(self, client, default: Optional[Limit], overrides: Optional[Dict[str, Limit]] = None,
+                 prefix: str = "backlog-webhook:ratelimit:", clock: Callable[[], float] = time.time):
+        """Create a Redis-backed limiter.
+
+        Args:
+            client: Redis client
+            default: (rate, burst) for keys without an override; None leaves them unlimited
+            overrides: (rate, burst) by key
+            prefix: Prefix added to every key
+            clock: Wall clock shared by all instances, replaceable in tests
+        """
+        self._client = client
+        self._default = default
+        self._overrides = overrides or {}
+        self._prefix = prefix
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._limited = 0
+        self._errors = 0
+
+    def acquire(self, key: str, scope: str = "") -> float:
+        """Count one event for a key. See ``TokenBucketLimiter.acquire``."""
+        limit = self._overrides.get(key, self._default)
+        if limit is None:
+            return 0.0
+        rate, burst = limit
+        window = burst / rate
+        now = self._clock()
+        index = int(now // window)
+        redis_key = f"{self._prefix}{scope}{key}:{index}"
+        try:
+            count = self._client.incr(redis_key)
+            if count == 1:
+                self._client.expire(redis_key, max(1, math.ceil(window)) + 1)
+        except Exception as e:
+            self._count("_errors")
+            logging.warning(f"Rate limit store unavailable, allowing event: {e}")
+            return 0.0
+        if count <= burst:
+            self._count("_allowed")
+            return 0.0
+        self._count("_limited")
+        return (index + 1) * window - now
+
+    def refund(self, key: str, scope: str = "") -> None:
+        """Uncount an allowed event rejected elsewhere. See ``TokenBucketLimiter.refund``.
+
+        The count of the current window is decremented, which may be the window
+        after the one the event was counted in; either way one more event fits.
+        """
+        limit = self._overrides.get(key, self._default)
+        if limit is None:
+            return
+        rate, burst = limit
+        index = int(self._clock() // (burst / rate))
+        try:
+            self._client.incr(f"{self._prefix}{scope}{key}:{index}", -1)
+        except Exception as e:
+            self._count("_errors")
+            logging.warning(f"Rate limit store unavailable, token not refunded: {e}")
+            return
+        with self._lock:
+            self._allowed -= 1
+
+    def stats(self) -> dict:
+        """Return limiter counters for monitoring."""
+        with self._lock:
+            return {"backend": "redis", "allowed": self._allowed, "limited": self._limited,
+                    "errors": self._errors}
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class EventRateLimiter:
+    """Applies the per-project and per-user limits to webhook events."""
+
+    def __init__(self, limiters: Dict[str, object]):
+        """Create the event limiter.
+
+        Args:
+            limiters: Limiter by dimension, "project" (``project.projectKey``)
+                and/or "user" (``createdUser.id``)
+        """
+        self.limiters = limiters
+
+    def check(self, payload: dict, scope: str = "") -> Optional[Tuple[str, float]]:
+        """Charge an event against every dimension.
+
+        Dimensions are checked in order and the first exhausted one stops the
+        check, so a rejected event does not take tokens from later dimensions;
+        the tokens it took from earlier dimensions are refunded.
+
+        Args:
+            payload: The webhook payload
+            scope: Prefix keeping the keys of different tenants apart
+
+        Returns:
+            Optional[Tuple[str, float]]: None if the event is allowed, otherwise
+            the exhausted dimension and the seconds until it allows events again
+        """
+        acquired = []
+        for dimension, limiter in self.limiters.items():
+            key = event_key(payload, dimension)
+            if key is None:
+                continue
+            wait = limiter.acquire(key, scope)
+            if wait > 0:
+                for earlier, earlier_key in acquired:
+                    earlier.refund(earlier_key, scope)
+                return dimension, wait
+            acquired.append((limiter, key))
+        return None
+
+    def stats(self) -> dict:
+        """Return the counters of every dimension, prefixed with its name."""
+        stats = {}
+        for dimension, limiter in self.limiters.items():
+            for key, value in limiter.stats().items():
+                stats[f"{dimension}_{key}"] = value
+        return stats
+
+
+def event_key(payload: dict, dimension: str) -> Optional[str]:
+    """Return the project key or user ID an event is limited by, or None if it has none."""
+    if dimension == "project":
+        value = (payload.get("project") or {}).get("projectKey")
+    else:
+        value = (payload.get("createdUser") or {}).get("id")
+    return None if value is None else str(value)
+
+
+def create_event_rate_limiter(project_spec: str, user_spec: str, backend: str = "memory",
+                              max_keys: int = 10000, redis_url: Optional[str] = None
+                              ) -> Optional[EventRateLimiter]:
+    """Create the event limiter selected by configuration.
+
+    Args:
+        project_spec: Limits by project key, see ``parse_limit_spec``
+        user_spec: Limits by user ID, see ``parse_limit_spec``
+        backend: "memory" or "redis"
+        max_keys: Size bound of each memory limiter
+        redis_url: Connection URL for the redis backend
+
+    Returns:
+        Optional[EventRateLimiter]: The limiter, or None if no limit is configured
+
+    Raises:
+        ValueError: If a spec or the backend is invalid, or redis is selected without a URL
+        ImportError: If the redis backend is selected but the redis package is missing
+    """
+    specs = {}
+    for dimension, text in (("project", project_spec), ("user", user_spec)):
+        default, overrides = parse_limit_spec(text)
+        if default is not None or overrides:
+            specs[dimension] = (default, overrides)
+    if not specs:
+        return None
+    if backend == "memory":
+        return EventRateLimiter({dimension: TokenBucketLimiter(default, overrides, max_keys=max_keys)
+                                 for dimension, (default, overrides) in specs.items()})
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL must be set when RATE_LIMIT_BACKEND=redis")
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("RATE_LIMIT_BACKEND=redis requires the 'redis' package")
+        client = redis.Redis.from_url(redis_url, socket_timeout=0.2)
+        return EventRateLimiter({
+            dimension: RedisRateLimiter(client, default, overrides,
+                                        prefix=f"backlog-webhook:ratelimit:{dimension}:")
+            for dimension, (default, overrides) in specs.items()
+        })
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
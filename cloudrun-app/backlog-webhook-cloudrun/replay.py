@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Replay saved Backlog webhook payloads through the extraction pipeline
+Streams an NDJSON file or a JSON array file with constant memory, routes and
+extracts every event in a worker pool with the same rules as the webhook
+(EVENT_ROUTES; comment events through extract_comment_data by default), and
+publishes the messages with the configured publisher and its PUBSUB_BATCH_*
+settings, optionally capped to a rate. With --dry-run the messages are written
+to a file instead. Progress is checkpointed, so an interrupted replay can be
+resumed with --resume.
+
+Examples:
+  python replay.py events.ndjson --rate 200 --checkpoint replay.ckpt
+  python replay.py export.json --dry-run messages.ndjson
+  python replay.py events.ndjson --checkpoint replay.ckpt --resume
+"""
+
+import argparse
+import codecs
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterator, List, Optional, Tuple
+
+import main
+from rate_limit import TokenBucketLimiter
+
+# Bytes read at a time when streaming a JSON array
+READ_CHUNK_BYTES = 1024 * 1024
+
+replay_log = logging.getLogger("webhook.replay")
+
+
+def iter_ndjson(f: IO[bytes]) -> Iterator[bytes]:
+    """Yield the non-blank lines of an NDJSON file without decoding them."""
+    for line in f:
+        if line.strip():
+            yield line
+
+
+def iter_json_array(f: IO[bytes], chunk_bytes: int = READ_CHUNK_BYTES) -> Iterator[object]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the element being decoded and one read chunk are held in memory, so
+    arrays larger than memory can be streamed.
+
+    Raises:
+        ValueError: If the file is not a JSON array or is truncated
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_bytes)
+        eof = not chunk
+        buffer = buffer[position:] + text_decoder.decode(chunk, final=eof)
+        position = 0
+        return True
+
+    def skip_whitespace() -> Optional[str]:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return None
+
+    if skip_whitespace() != "[":
+        raise ValueError("Expected a JSON array")
+    position += 1
+    while True:
+        char = skip_whitespace()
+        if char is None:
+            raise ValueError("Unterminated JSON array")
+        if char == "]":
+            return
+        if started:
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+            position += 1
+            skip_whitespace()
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element may continue in the next chunk
+                if fill():
+                    continue
+                raise ValueError("Truncated JSON array")
+            # A number cut by the end of the buffer decodes as a shorter number
+            if (not eof and isinstance(element, (int, float)) and not isinstance(element, bool)
+                    and (end == len(buffer) or buffer[end] in ".eE+-")):
+                fill()
+                continue
+            break
+        position = end
+        started = True
+        yield element
+
+
+def iter_events(f: IO[bytes]) -> Iterator[object]:
+    """Yield the events of a JSON array file or, for anything else, of an NDJSON file.
+
+    NDJSON lines are yielded undecoded so the worker pool decodes them; array
+    elements are necessarily decoded while scanning the array.
+    """
+    first = f.peek(64)[:64].lstrip(b"\xef\xbb\xbf \t\r\n")[:1] if hasattr(f, "peek") else b""
+    return iter_json_array(f) if first == b"[" else iter_ndjson(f)
+
+
+def extract_events(chunk: List[Tuple[int, object]]) -> List[Tuple[int, Optional[list], Optional[str]]]:
+    """Decode, route and extract a chunk of events; runs in the worker pool.
+
+    Args:
+        chunk: (index, event) pairs, the event as raw bytes or already decoded
+
+    Returns:
+        list: Per event (index, routed messages, None), or (index, None, error)
+        for events that cannot be decoded or extracted
+    """
+    results = []
+    for index, event in chunk:
+        try:
+            payload = main.decode_json(event) if isinstance(event, (bytes, str)) else event
+            if not isinstance(payload, dict):
+                raise ValueError("event is not a JSON object")
+            messages = main.event_router.route(payload)
+            attributes = main.event_attributes(payload)
+            if attributes is not None:
+                messages = [routed._replace(attributes=attributes) for routed in messages]
+            results.append((index, messages, None))
+        except Exception as e:
+            results.append((index, None, str(e)))
+    return results
+
+
+def extract_in_pool(events: Iterator[Tuple[int, object]], workers: int,
+                    chunk_size: int) -> Iterator[Tuple[int, Optional[list], Optional[str]]]:
+    """Run ``extract_events`` over the events and yield the results in input order.
+
+    At most ``workers * 4`` chunks are submitted ahead of the consumer, so
+    memory stays bounded however long the input is. With one worker the
+    events are extracted in the calling process.
+    """
+    def chunks():
+        chunk = []
+        for item in events:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    if workers <= 1:
+        for chunk in chunks():
+            yield from extract_events(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for chunk in chunks():
+            window.append(pool.submit(extract_events, chunk))
+            if len(window) >= workers * 4:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+class Progress:
+    """Counts replayed events and tracks how far the replay has been confirmed.
+
+    Events are added in input order. The checkpoint position is the first
+    event that still has an unconfirmed message, or that had a message fail
+    to publish, so a resumed replay never skips an event that did not reach
+    Pub/Sub. Events after it may be published again (at-least-once).
+    """
+
+    def __init__(self, source: str, start: int = 0):
+        self.source = source
+        self._cond = threading.Condition()
+        self._outstanding = OrderedDict()
+        self._next = start
+        self._first_failed = None
+        self.counts = {"events": 0, "messages": 0, "published": 0, "failed": 0, "written": 0, "ignored": 0,
+                       "invalid": 0}
+
+    def add(self, index: int, messages: int, written: bool = False) -> None:
+        """Record an event and its messages.
+
+        Args:
+            index: Position of the event in the input
+            messages: Number of messages routed from the event
+            written: The messages were written by a dry run and need no confirmation
+        """
+        with self._cond:
+            self._next = index + 1
+            self.counts["events"] += 1
+            self.counts["messages"] += messages
+            if not messages:
+                self.counts["ignored"] += 1
+            elif written:
+                self.counts["written"] += messages
+            else:
+                self._outstanding[index] = messages
+
+    def invalid(self, index: int) -> None:
+        """Record an event that could not be decoded or extracted; it is skipped, not retried."""
+        with self._cond:
+            self._next = index + 1
+            self.counts["events"] += 1
+            self.counts["invalid"] += 1
+
+    def done(self, index: int, failed: bool = False) -> None:
+        """Confirm one message of an event."""
+        with self._cond:
+            self.counts["failed" if failed else "published"] += 1
+            if failed and (self._first_failed is None or index < self._first_failed):
+                self._first_failed = index
+            self._outstanding[index] -= 1
+            if not self._outstanding[index]:
+                del self._outstanding[index]
+            if not self._outstanding:
+                self._cond.notify_all()
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return sum(self._outstanding.values())
+
+    def position(self) -> int:
+        """Return the index a resumed replay starts from."""
+        with self._cond:
+            position = next(iter(self._outstanding), self._next)
+            if self._first_failed is not None:
+                position = min(position, self._first_failed)
+            return position
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every added message is confirmed.
+
+        Returns:
+            bool: False if messages were still outstanding at the timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._outstanding, timeout)
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically."""
+        with self._cond:
+            counts = dict(self.counts)
+        checkpoint = {"source": self.source, "next_index": self.position(), "counts": counts,
+                      "updated": time.time()}
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(temporary, path)
+
+
+def load_checkpoint(path: str, source: str) -> int:
+    """Return the index to resume from, 0 if there is no checkpoint yet.
+
+    Raises:
+        ValueError: If the checkpoint was written for another input file
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0
+    if checkpoint.get("source") != source:
+        raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('source')}, not {source}")
+    return int(checkpoint["next_index"])
+
+
+def replay(path: str, workers: int = 1, chunk_size: int = 256, rate: float = 0.0,
+           max_in_flight: int = 1000, dry_run: Optional[str] = None, checkpoint: Optional[str] = None,
+           resume: bool = False, checkpoint_every: int = 1000) -> dict:
+    """Replay the events of a file.
+
+    Args:
+        path: NDJSON or JSON array file of Backlog webhook payloads
+        workers: Processes decoding and extracting events; 1 runs them in this process
+        chunk_size: Events handed to a worker at a time
+        rate: Maximum messages published per second, 0 for no limit
+        max_in_flight: Maximum messages submitted but not yet confirmed by Pub/Sub
+        dry_run: Write the messages to this file ("-" for stdout) instead of publishing
+        checkpoint: Checkpoint file, updated every ``checkpoint_every`` events and at the end
+        resume: Start after the events recorded as done in ``checkpoint``
+        checkpoint_every: Events between checkpoint writes
+
+    Returns:
+        dict: Event and message counts, the resume position and the seconds taken
+    """
+    source = os.path.abspath(path)
+    start = load_checkpoint(checkpoint, source) if checkpoint and resume else 0
+    progress = Progress(source, start)
+    limiter = TokenBucketLimiter((rate, max(1.0, rate))) if rate > 0 and not dry_run else None
+    slots = threading.BoundedSemaphore(max_in_flight)
+    if start:
+        replay_log.info(f"Resuming replay of {path} at event {start}")
+
+    if dry_run == "-":
+        output = sys.stdout
+    elif dry_run:
+        output = open(dry_run, "a" if start else "w", encoding="utf-8")
+    else:
+        output = None
+
+    def confirm(future, index):
+        slots.release()
+        failed = future.exception() is not None
+        if failed:
+            replay_log.error(f"Replay publish of event {index} failed: {future.exception()}")
+        progress.done(index, failed)
+
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            events = ((index, event) for index, event in enumerate(iter_events(f)) if index >= start)
+            for index, messages, error in extract_in_pool(events, workers, chunk_size):
+                if error is not None:
+                    replay_log.warning(f"Skipping event {index}: {error}")
+                    progress.invalid(index)
+                elif output is not None:
+                    for routed in messages:
+                        output.write(json.dumps({"index": index, "rule": routed.rule, "topic": routed.topic,
+                                                 "attributes": routed.attributes, "message": routed.message},
+                                                ensure_ascii=False) + "\n")
+                    progress.add(index, len(messages), written=True)
+                else:
+                    progress.add(index, len(messages))
+                    for routed in messages:
+                        while limiter is not None:
+                            wait = limiter.acquire("replay")
+                            if not wait:
+                                break
+                            time.sleep(wait)
+                        slots.acquire()
+                        try:
+                            future = main.submit_message(routed.message, routed.topic, routed.attributes)
+                        except Exception as e:
+                            slots.release()
+                            replay_log.error(f"Replay publish of event {index} failed: {e}")
+                            progress.done(index, failed=True)
+                            continue
+                        future.add_done_callback(lambda f, i=index: confirm(f, i))
+                if checkpoint and progress.counts["events"] % checkpoint_every == 0:
+                    progress.save(checkpoint)
+        progress.wait()
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+        if checkpoint:
+            progress.save(checkpoint)
+
+    summary = dict(progress.counts, next_index=progress.position(), seconds=time.perf_counter() - started)
+    replay_log.info(f"Replayed {summary['events']} events of {path} in {summary['seconds']:.1f}s: "
+                 f"messages={summary['messages']}, published={summary['published']}, failed={summary['failed']}, "
+                 f"written={summary['written']}, ignored={summary['ignored']}, invalid={summary['invalid']}")
+    return summary
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    """Parse the command line and run the replay.
+
+    Returns:
+        int: Exit status; 1 if any message failed to publish
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="NDJSON or JSON array file of Backlog webhook payloads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes decoding and extracting events (1 = in this process)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="events handed to a worker at a time")
+    parser.add_argument("--rate", type=float, default=0.0, help="maximum messages per second (0 = unlimited)")
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="maximum messages waiting for Pub/Sub confirmation")
+    parser.add_argument("--dry-run", metavar="OUTPUT",
+                        help="write the extracted messages as NDJSON to OUTPUT ('-' for stdout) instead of publishing")
+    parser.add_argument("--checkpoint", help="progress file updated while replaying")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="events between checkpoint writes")
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint")
+    parser.add_argument("--verbose", action="store_true", help="keep the per-event webhook request logs")
+    args = parser.parse_args(argv)
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+
+    if not args.verbose:
+        # Routing and extraction log one line per event, which would drown the replay's own messages
+        logging.getLogger().setLevel(logging.WARNING)
+        replay_log.setLevel(logging.INFO)
+    summary = replay(args.path, workers=args.workers, chunk_size=args.chunk_size, rate=args.rate,
+                     max_in_flight=args.max_in_flight, dry_run=args.dry_run, checkpoint=args.checkpoint,
+                     resume=args.resume, checkpoint_every=args.checkpoint_every)
+    if not args.dry_run and main.publisher is not None:
+        main.publisher.stop()
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+
+class SecretCache:
+    """Thread-safe in-process cache for a set of secret values.
+
+    Values are served from memory until the TTL expires. Once a cached value
+    enters the refresh window, the next read triggers a background reload so
+    request threads never wait on Secret Manager while the cache is warm. If a
+    reload fails, the previous values keep being served for up to ``stale_ttl``
+    seconds past expiry, with reloads retried every ``retry_interval`` seconds.
+
+    The loader returns a tuple so several token versions can be valid at the
+    same time during a rotation.
+    """
+
+    def __init__(self, loader: Callable[[], Tuple[str, ...]], ttl: float = 300.0,
+                 refresh_ahead: float = 60.0, stale_ttl: float = 3600.0,
+                 retry_interval: float = 5.0, name: str = "secret"):
+        """Create a cache around a loader.
+
+        Args:
+            loader: Callable returning the tuple of currently valid secret values
+            ttl: Seconds a loaded value is considered fresh
+            refresh_ahead: Seconds before expiry at which a background refresh starts
+            stale_ttl: Seconds past expiry during which old values are served if reloads fail
+            retry_interval: Seconds to wait after a failed reload before trying again
+            name: Name used in log messages
+        """
+        self._loader = loader
+        self._ttl = ttl
+        self._refresh_ahead = min(refresh_ahead, ttl)
+        self._stale_ttl = stale_ttl
+        self._retry_interval = retry_interval
+        self._name = name
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._values: Optional[Tuple[str, ...]] = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._retry_at = 0.0
+
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._errors = 0
+        self._stale_served = 0
+
+    def get(self) -> Tuple[str, ...]:
+        """Return the cached secret values, loading them if necessary.
+
+        Returns:
+            Tuple[str, ...]: The currently valid secret values
+
+        Raises:
+            Exception: If no value has ever been loaded and the loader fails,
+                or the cached value is older than the stale limit
+        """
+        values = self.peek()
+        if values is not None:
+            return values
+        return self.load()
+
+    def peek(self) -> Optional[Tuple[str, ...]]:
+        """Return the cached values without ever calling the loader.
+
+        Callers that must not block, such as an event loop, use this and fall
+        back to running ``load`` in a thread when it returns None.
+
+        Returns:
+            Optional[Tuple[str, ...]]: The cached values, or None if a load is needed
+        """
+        now = time.monotonic()
+        with self._lock:
+            values = self._values
+            age = now - self._loaded_at
+            if values is not None and age < self._ttl:
+                self._hits += 1
+                # A failed refresh sets _retry_at, so the next one waits retry_interval
+                if age >= self._ttl - self._refresh_ahead and not self._refreshing and now >= self._retry_at:
+                    self._refreshing = True
+                    threading.Thread(target=self._background_refresh, daemon=True,
+                                     name=f"{self._name}-refresh").start()
+                return values
+            if values is not None and now < self._retry_at and age < self._ttl + self._stale_ttl:
+                # Secret Manager failed recently; do not hammer it on every request.
+                self._stale_served += 1
+                return values
+            self._misses += 1
+        return None
+
+    def invalidate(self) -> None:
+        """Drop the cached values so the next read reloads them."""
+        with self._lock:
+            self._values = None
+            self._loaded_at = 0.0
+            self._retry_at = 0.0
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring.
+
+        Returns:
+            dict: Hit, miss, refresh, error and stale counters plus current state
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "refreshes": self._refreshes,
+                "errors": self._errors,
+                "stale_served": self._stale_served,
+                "versions": len(self._values) if self._values else 0,
+                "age_seconds": time.monotonic() - self._loaded_at if self._values else None,
+            }
+
+    def load(self) -> Tuple[str, ...]:
+        """Load the values through the loader, falling back to stale values on failure.
+
+        Only one thread talks to the loader at a time; concurrent callers wait
+        and reuse its result.
+
+        Returns:
+            Tuple[str, ...]: The currently valid secret values
+
+        Raises:
+            Exception: If the loader fails and no usable cached value exists
+        """
+        with self._load_lock:
+            with self._lock:
+                if self._values is not None and time.monotonic() - self._loaded_at < self._ttl:
+                    return self._values
+            try:
+                return self._reload()
+            except Exception as e:
+                with self._lock:
+                    stale_age = time.monotonic() - self._loaded_at
+                    if self._values is not None and stale_age < self._ttl + self._stale_ttl:
+                        self._stale_served += 1
+                        logging.warning(f"Serving stale {self._name} after reload failure "
+                                        f"(age={stale_age:.0f}s): {e}")
+                        return self._values
+                raise
+
+    def _reload(self) -> Tuple[str, ...]:
+        try:
+            values = tuple(self._loader())
+            if not values:
+                raise ValueError(f"Loader returned no values for {self._name}")
+        except Exception:
+            with self._lock:
+                self._errors += 1
+                self._retry_at = time.monotonic() + self._retry_interval
+            raise
+        with self._lock:
+            self._values = values
+            self._loaded_at = time.monotonic()
+            self._refreshes += 1
+        logging.info(f"Loaded {self._name}: versions={len(values)}")
+        return values
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._load_lock:
+                self._reload()
+        except Exception as e:
+            logging.warning(f"Background refresh of {self._name} failed, keeping cached value: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
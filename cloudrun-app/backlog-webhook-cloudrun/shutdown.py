@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+
+class ShutdownCoordinator:
+    """Drains a worker before it exits.
+
+    Every publish future is registered with ``track``, so the number still in
+    flight is known at any time. ``begin`` only sets a flag, which makes it
+    safe to call from a signal handler; webhook handlers check ``draining``
+    and reject new events from then on. ``drain`` runs the flush steps in
+    order and waits for the remaining publishes, all within one deadline
+    counted from ``begin``.
+    """
+
+    def __init__(self, deadline: float, clock: Callable[[], float] = time.monotonic):
+        """Create the coordinator.
+
+        Args:
+            deadline: Seconds from ``begin`` until the drain gives up on what is left
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.deadline = deadline
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._started: Optional[float] = None
+        self._drained = False
+        self._pending = 0
+        self._flushed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def draining(self) -> bool:
+        """True once shutdown has begun."""
+        return self._started is not None
+
+    def begin(self) -> bool:
+        """Start rejecting new webhooks and start the deadline.
+
+        Returns:
+            bool: False if shutdown had already begun
+        """
+        # No lock and no logging: this runs inside the SIGTERM handler
+        if self._started is not None:
+            return False
+        self._started = self._clock()
+        return True
+
+    def remaining(self) -> float:
+        """Return the seconds left until the deadline; the full deadline before ``begin``."""
+        if self._started is None:
+            return self.deadline
+        return max(0.0, self._started + self.deadline - self._clock())
+
+    def track(self, future: Future) -> None:
+        """Count a publish future as in flight until it completes."""
+        with self._cond:
+            self._pending += 1
+        future.add_done_callback(self._on_done)
+
+    def reject(self) -> None:
+        """Count a webhook turned away because the worker is shutting down."""
+        with self._cond:
+            self._rejected += 1
+
+    def wait_until(self, predicate: Callable[[], bool], interval: float = 0.01) -> bool:
+        """Poll ``predicate`` until it holds or the deadline passes.
+
+        Returns:
+            bool: The last value of the predicate
+        """
+        while not predicate():
+            remaining = self.remaining()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+        return True
+
+    def drain(self, steps: List[Tuple[str, Callable[[], Optional[int]]]]) -> Optional[dict]:
+        """Run the flush steps, then wait for the publishes still in flight.
+
+        A step returns the number of messages it had to leave behind, or None.
+        A failing step is logged and counted as leaving nothing behind, so the
+        later steps still run.
+
+        Args:
+            steps: (name, callable) pairs run in order
+
+        Returns:
+            Optional[dict]: Seconds taken and the flushed, failed and abandoned
+            message counts, with the count left behind by each step; None if
+            the worker was already drained
+        """
+        self.begin()
+        with self._cond:
+            if self._drained:
+                return None
+            self._drained = True
+            in_flight = self._pending
+        logging.info(f"Shutting down: {in_flight} publishes in flight, "
+                     f"{self.remaining():.1f}s left to drain, new webhooks get 503")
+
+        left = {}
+        for name, step in steps:
+            try:
+                left[name] = step() or 0
+            except Exception as e:
+                logging.error(f"Shutdown step {name} failed: {e}")
+                left[name] = 0
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending == 0, self.remaining())
+            summary = {
+                "seconds": self._clock() - self._started,
+                "flushed": self._flushed,
+                "failed": self._failed,
+                "abandoned": self._pending + sum(left.values()),
+                "rejected": self._rejected,
+                "left": left
+            }
+        message = (f"Shutdown drain finished in {summary['seconds'] * 1000:.0f} ms: flushed={summary['flushed']}, "
+                   f"failed={summary['failed']}, abandoned={summary['abandoned']}, rejected={summary['rejected']}")
+        details = ", ".join(f"{name}={count}" for name, count in left.items() if count)
+        if summary["abandoned"]:
+            logging.warning(f"{message} (in flight={summary['abandoned'] - sum(left.values())}"
+                            + (f", {details}" if details else "") + ")")
+        else:
+            logging.info(message)
+        return summary
+
+    def stats(self) -> dict:
+        """Return shutdown counters for monitoring."""
+        with self._cond:
+            return {
+                "draining": int(self.draining),
+                "in_flight": self._pending,
+                "flushed": self._flushed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def _on_done(self, future: Future) -> None:
+        failed = future.cancelled() or future.exception() is not None
+        with self._cond:
+            self._pending -= 1
+            # Only publishes completed while draining count as flushed by the shutdown
+            if self._started is not None:
+                if failed:
+                    self._failed += 1
+                else:
+                    self._flushed += 1
+            if self._pending == 0:
+                self._cond.notify_all()
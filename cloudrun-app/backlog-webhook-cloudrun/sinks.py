@@ -0,0 +1,303 @@
+import abc
+import base64
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from tracing import format_timestamp
+
+SINK_BACKENDS = ("http", "file", "memory")
+
+
+class Sink(abc.ABC):
+    """Destination of published messages other than Pub/Sub.
+
+    A sink offers the part of ``pubsub_v1.PublisherClient`` that main.py uses:
+    ``publish`` returns a future resolving to a message ID, and ``get_topic``,
+    ``resume_publish`` and ``stop`` behave like the client's. The publish path
+    is therefore the same whichever sink PUBLISHER_BACKEND selects; batching
+    and flow control settings only apply to Pub/Sub.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._published = 0
+        self._failed = 0
+
+    @abc.abstractmethod
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs) -> Future:
+        """Deliver one message.
+
+        Returns:
+            Future: Resolves to the message ID once the message is delivered
+
+        Raises:
+            RuntimeError: If the sink has been stopped
+        """
+
+    def get_topic(self, request: dict, timeout: Optional[float] = None, **kwargs) -> dict:
+        """Prepare the sink for the first message; called by the warm-up."""
+        return {"name": request["topic"]}
+
+    def resume_publish(self, topic: str, ordering_key: str) -> None:
+        """Accept the resume call made after a failed ordered publish; sinks never pause keys."""
+
+    def stop(self) -> None:
+        """Deliver what is pending and refuse further messages."""
+        with self._lock:
+            self._stopped = True
+
+    def stats(self) -> dict:
+        """Return delivery counters for monitoring."""
+        with self._lock:
+            return {"published": self._published, "failed": self._failed}
+
+    def _check_open(self) -> None:
+        if self._stopped:
+            raise RuntimeError("Cannot publish on a stopped sink.")
+
+    def _count(self, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self._failed += 1
+            else:
+                self._published += 1
+
+
+def _record(data: bytes, ordering_key: str, attrs: dict, message_id: str) -> dict:
+    """The Pub/Sub message shape written by the file sink and pushed by the HTTP sink."""
+    record = {
+        "messageId": message_id,
+        "publishTime": format_timestamp(time.time()),
+        "data": base64.b64encode(data).decode("ascii"),
+        "attributes": attrs
+    }
+    if ordering_key:
+        record["orderingKey"] = ordering_key
+    return record
+
+
+class MemorySink(Sink):
+    """Keeps messages in memory, for tests and benchmarks.
+
+    ``messages`` has the same entries as ``FakePublisherClient(record=True)``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self._ids = itertools.count(1)
+
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs) -> Future:
+        future = Future()
+        with self._lock:
+            self._check_open()
+            message_id = str(next(self._ids))
+            self.messages.append({"topic": topic, "data": data, "attributes": attrs, "ordering_key": ordering_key})
+            self._published += 1
+        future.set_result(message_id)
+        return future
+
+
+class FileSink(Sink):
+    """Appends messages to a local NDJSON file.
+
+    Each line holds the topic and the message as Pub/Sub would deliver it
+    (``data`` base64-encoded), so the file can be fed to a consumer offline.
+    The file is opened on the first message, in the process that writes it.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._file = None
+
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs) -> Future:
+        future = Future()
+        message_id = uuid.uuid4().hex
+        line = json.dumps({"topic": topic, "message": _record(data, ordering_key, attrs, message_id)},
+                          ensure_ascii=False) + "\n"
+        with self._lock:
+            self._check_open()
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(line)
+                self._file.flush()
+            except OSError as e:
+                self._failed += 1
+                future.set_exception(e)
+                return future
+            self._published += 1
+        future.set_result(message_id)
+        return future
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class HttpPushError(Exception):
+    """The push endpoint answered with a status that is not retried, or kept failing."""
+
+
+class HttpPushSink(Sink):
+    """Pushes each message straight to an HTTP endpoint, skipping the Pub/Sub hop.
+
+    The request body is the envelope of a Pub/Sub push subscription
+    (``{"message": {...}, "subscription": ...}``, with the topic path in
+    ``subscription``), so a consumer already behind a push subscription can
+    receive it unchanged. Requests reuse keep-alive connections from a pool
+    and are sent by ``pool_size`` lanes; messages with the same ordering key
+    share a lane and are delivered in order. Connection errors, timeouts,
+    429 and 5xx answers are retried with exponential backoff.
+    """
+
+    # Statuses worth retrying; any other non-2xx answer fails the message at once
+    RETRY_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+    def __init__(self, url: str, timeout: float = 10.0, retries: int = 3, pool_size: int = 8,
+                 backoff: float = 0.1, token_provider: Optional[Callable[[], str]] = None, session=None):
+        """Create the sink.
+
+        Args:
+            url: Push endpoint
+            timeout: Seconds for connecting and for reading the answer of one attempt
+            retries: Attempts after the first one
+            pool_size: Concurrent requests, and keep-alive connections kept open
+            backoff: Seconds before the first retry, doubled for each further one
+            token_provider: Returns an ID token sent as ``Authorization: Bearer``, e.g. ``id_token_provider``
+            session: requests.Session to use instead of a new pooled one, for tests
+        """
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._token_provider = token_provider
+        if session is None:
+            import requests
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self._session = session
+        self._lanes = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"http-sink-{lane}")
+                       for lane in range(pool_size)]
+        self._next_lane = itertools.count()
+        self._retried = 0
+
+    def get_topic(self, request: dict, timeout: Optional[float] = None, **kwargs) -> dict:
+        """Open a keep-alive connection to the endpoint; any HTTP answer counts as reachable."""
+        self._session.head(self.url, headers=self._headers(), timeout=timeout or self.timeout)
+        return {"name": request["topic"]}
+
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs) -> Future:
+        with self._lock:
+            self._check_open()
+            lane = hash(ordering_key) if ordering_key else next(self._next_lane)
+        message_id = uuid.uuid4().hex
+        body = json.dumps({"message": _record(data, ordering_key, attrs, message_id), "subscription": topic},
+                          ensure_ascii=False).encode("utf-8")
+        return self._lanes[lane % len(self._lanes)].submit(self._send, body, message_id)
+
+    def stop(self) -> None:
+        """Refuse further messages; those already accepted are still sent and their futures resolve later."""
+        with self._lock:
+            self._stopped = True
+        # Not waiting here: retries could outlast the shutdown deadline, which bounds the wait for the futures
+        for lane in self._lanes:
+            lane.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"published": self._published, "failed": self._failed, "retried": self._retried}
+
+    def _headers(self) -> dict:
+        headers = {"Content-Type": "application/json"}
+        if self._token_provider is not None:
+            headers["Authorization"] = f"Bearer {self._token_provider()}"
+        return headers
+
+    def _send(self, body: bytes, message_id: str) -> str:
+        import requests
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(delay)
+                delay *= 2
+                with self._lock:
+                    self._retried += 1
+            try:
+                response = self._session.post(self.url, data=body, headers=self._headers(), timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                continue
+            if response.status_code < 300:
+                self._count(failed=False)
+                return message_id
+            error = HttpPushError(f"{self.url} answered {response.status_code}")
+            if response.status_code not in self.RETRY_STATUSES:
+                break
+        self._count(failed=True)
+        logging.warning(f"HTTP push of message {message_id} failed after {attempt + 1} attempts: {error}")
+        raise error
+
+
+def id_token_provider(audience: str, refresh_seconds: float = 3000.0) -> Callable[[], str]:
+    """Return a function giving a Google-signed ID token for ``audience``, e.g. a Cloud Run URL.
+
+    The token comes from the metadata server (or the local application default
+    credentials) and is reused for ``refresh_seconds``, below its one-hour lifetime.
+    """
+    lock = threading.Lock()
+    cached = [None, 0.0]
+
+    def get_token() -> str:
+        with lock:
+            if cached[0] is None or time.monotonic() >= cached[1]:
+                import google.auth.transport.requests
+                import google.oauth2.id_token
+                cached[0] = google.oauth2.id_token.fetch_id_token(google.auth.transport.requests.Request(), audience)
+                cached[1] = time.monotonic() + refresh_seconds
+            return cached[0]
+    return get_token
+
+
+def create_sink(backend: str, url: Optional[str] = None, timeout: float = 10.0, retries: int = 3,
+                pool_size: int = 8, audience: Optional[str] = None, path: Optional[str] = None) -> Sink:
+    """Create the sink selected by configuration.
+
+    Args:
+        backend: "http", "file" or "memory"
+        url: Push endpoint of the http sink
+        timeout: Per-attempt timeout of the http sink
+        retries: Retries of the http sink
+        pool_size: Concurrent requests and keep-alive connections of the http sink
+        audience: Audience of the ID token the http sink sends; None sends no token
+        path: NDJSON file of the file sink
+
+    Raises:
+        ValueError: If the backend is unknown or its destination is not configured
+    """
+    if backend == "memory":
+        return MemorySink()
+    if backend == "file":
+        if not path:
+            raise ValueError("SINK_FILE_PATH must be set for PUBLISHER_BACKEND=file")
+        return FileSink(path)
+    if backend == "http":
+        if not url:
+            raise ValueError("SINK_HTTP_URL must be set for PUBLISHER_BACKEND=http")
+        return HttpPushSink(url, timeout=timeout, retries=retries, pool_size=pool_size,
+                            token_provider=id_token_provider(audience) if audience else None)
+    raise ValueError(f"Unknown sink backend: {backend}")
@@ -0,0 +1,258 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Tuple
+
+from secret_cache import SecretCache
+
+# Returned by TenantRegistry.resolve(block=False) when a load would have to wait
+LOAD_REQUIRED = object()
+
+_TENANT_FIELDS = {"tokens", "token_secret", "token_secret_versions", "topic", "project_keys"}
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """One Backlog space or project served by the shared webhook."""
+    name: str
+    tokens: Tuple[str, ...] = ()
+    token_secret: Optional[str] = None
+    token_secret_versions: Tuple[str, ...] = ("latest",)
+    topic: Optional[str] = None
+    project_keys: Tuple[str, ...] = ()
+
+    def accepts_project(self, project_key: Optional[str]) -> bool:
+        """Whether an event of the given project may be delivered through this tenant."""
+        return not self.project_keys or project_key in self.project_keys
+
+
+class TenantTable:
+    """Parsed tenant configuration with constant-time lookup by name or project key."""
+
+    def __init__(self, tenants: Dict[str, Tenant]):
+        """Index the tenants.
+
+        Args:
+            tenants: Tenants by name
+
+        Raises:
+            ValueError: If two tenants claim the same project key, or a project
+                key equals another tenant's name
+        """
+        self.tenants = dict(tenants)
+        self._by_key = dict(self.tenants)
+        for tenant in self.tenants.values():
+            for project_key in tenant.project_keys:
+                owner = self._by_key.get(project_key)
+                if owner is not None and owner is not tenant:
+                    raise ValueError(f"Project key {project_key!r} of tenant {tenant.name!r} "
+                                     f"is already used by tenant {owner.name!r}")
+                self._by_key[project_key] = tenant
+
+    def lookup(self, key: str) -> Optional[Tenant]:
+        """Return the tenant named ``key``, or the one owning project key ``key``."""
+        return self._by_key.get(key)
+
+    def __len__(self) -> int:
+        return len(self.tenants)
+
+
+def _string_tuple(tenant: str, field: str, value) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        value = [v.strip() for v in value.split(",")]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"Tenant {tenant!r}: {field} must be a list of strings")
+    return tuple(v for v in value if v)
+
+
+def parse_tenants(spec) -> TenantTable:
+    """Build a tenant table from its JSON definition.
+
+    The definition maps tenant names (the path segment of
+    ``/webhook/backlog/<tenant>``) to their options, for example
+    ``{"space-a": {"token_secret": "space-a-webhook-token", "topic": "space-a-events",
+    "project_keys": ["GENAI"]}}``.
+
+    Args:
+        spec: The decoded JSON definition
+
+    Returns:
+        TenantTable: The indexed tenants
+
+    Raises:
+        ValueError: If the definition is malformed or a tenant has no token source
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Tenant configuration must be a JSON object mapping tenant names to options")
+    tenants = {}
+    for name, options in spec.items():
+        if not name or "/" in name:
+            raise ValueError(f"Invalid tenant name {name!r}")
+        if not isinstance(options, dict):
+            raise ValueError(f"Tenant {name!r}: options must be a JSON object")
+        unknown = set(options) - _TENANT_FIELDS
+        if unknown:
+            raise ValueError(f"Tenant {name!r}: unknown fields {sorted(unknown)}")
+        tenant = Tenant(
+            name=name,
+            tokens=_string_tuple(name, "tokens", options.get("tokens", [])),
+            token_secret=options.get("token_secret") or None,
+            token_secret_versions=_string_tuple(name, "token_secret_versions",
+                                                options.get("token_secret_versions", ["latest"])),
+            topic=options.get("topic") or None,
+            project_keys=_string_tuple(name, "project_keys", options.get("project_keys", [])),
+        )
+        if not tenant.tokens and not tenant.token_secret:
+            raise ValueError(f"Tenant {name!r} needs tokens or a token_secret")
+        if tenant.token_secret and not tenant.token_secret_versions:
+            raise ValueError(f"Tenant {name!r}: token_secret_versions is empty")
+        tenants[name] = tenant
+    return TenantTable(tenants)
+
+
+def tenant_config_source(environ=None, get_secret: Optional[Callable[[str], str]] = None
+                         ) -> Optional[Tuple[str, Callable[[], str]]]:
+    """Find where the tenant configuration comes from.
+
+    TENANTS_CONFIG_FILE takes precedence over TENANTS_CONFIG (inline JSON),
+    which takes precedence over the Secret Manager secret TENANTS_SECRET_NAME.
+
+    Args:
+        environ: Mapping to read variables from (defaults to os.environ)
+        get_secret: Callable returning the latest value of a secret, required
+            for TENANTS_SECRET_NAME
+
+    Returns:
+        Optional[Tuple[str, Callable[[], str]]]: The source name and a callable
+        reading the raw JSON, or None if no tenants are configured
+
+    Raises:
+        ValueError: If TENANTS_SECRET_NAME is set but no get_secret was given
+    """
+    if environ is None:
+        environ = os.environ
+    path = environ.get("TENANTS_CONFIG_FILE")
+    if path:
+        def read_file() -> str:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        return path, read_file
+    inline = environ.get("TENANTS_CONFIG")
+    if inline:
+        return "TENANTS_CONFIG", lambda: inline
+    secret_name = environ.get("TENANTS_SECRET_NAME")
+    if secret_name:
+        if get_secret is None:
+            raise ValueError("TENANTS_SECRET_NAME requires a Secret Manager reader")
+        return secret_name, lambda: get_secret(secret_name)
+    return None
+
+
+class TenantRegistry:
+    """In-memory tenant registry that reloads its configuration in the background.
+
+    The parsed table and each tenant's Secret Manager tokens are held in
+    ``SecretCache`` instances, so they get the same refresh-ahead reloads and
+    stale fallback as the single-tenant token: a configuration that fails to
+    load or parse keeps the previous table in service.
+    """
+
+    def __init__(self, read_config: Callable[[], str], get_secret: Optional[Callable[[str, str], str]] = None,
+                 ttl: float = 300.0, refresh_ahead: float = 60.0, stale_ttl: float = 3600.0,
+                 name: str = "tenants"):
+        """Create a registry.
+
+        Args:
+            read_config: Callable returning the raw JSON tenant configuration
+            get_secret: Callable (secret_name, version) -> value used for token_secret
+            ttl: Seconds the configuration and tenant tokens are considered fresh
+            refresh_ahead: Seconds before expiry at which a background reload starts
+            stale_ttl: Seconds past expiry during which old values are served if reloads fail
+            name: Name used in log messages
+        """
+        self._get_secret = get_secret
+        self._cache_options = {"ttl": ttl, "refresh_ahead": refresh_ahead, "stale_ttl": stale_ttl}
+        self._read_config = read_config
+        self._table_cache = SecretCache(self._load_table, name=name, **self._cache_options)
+        self._token_caches: Dict[Tuple[str, Tuple[str, ...]], SecretCache] = {}
+        self._lock = threading.Lock()
+        self._tenant_count = 0
+
+    def table(self) -> TenantTable:
+        """Return the current tenant table, loading it if necessary.
+
+        Raises:
+            Exception: If no configuration has ever loaded and loading fails
+        """
+        return self._table_cache.get()[0]
+
+    def resolve(self, key: str, block: bool = True):
+        """Find a tenant and the tokens it currently accepts.
+
+        Args:
+            key: Tenant name or project key from the request path
+            block: If False, return LOAD_REQUIRED instead of waiting for a load
+
+        Returns:
+            Optional[Tenant]: The tenant with ``tokens`` holding every accepted
+            token, None if no tenant matches, or LOAD_REQUIRED
+
+        Raises:
+            Exception: If the configuration or the tenant's token secret cannot be loaded
+        """
+        values = self._table_cache.get() if block else self._table_cache.peek()
+        if values is None:
+            return LOAD_REQUIRED
+        tenant = values[0].lookup(key)
+        if tenant is None or not tenant.token_secret:
+            return tenant
+        cache = self._token_cache(tenant)
+        secret_tokens = cache.get() if block else cache.peek()
+        if secret_tokens is None:
+            return LOAD_REQUIRED
+        return replace(tenant, tokens=tenant.tokens + secret_tokens)
+
+    def load_all(self) -> None:
+        """Load the configuration and every tenant's token secret, e.g. during warm-up.
+
+        Raises:
+            Exception: If the configuration or a token secret cannot be loaded
+        """
+        for tenant in self.table().tenants.values():
+            if tenant.token_secret:
+                self._token_cache(tenant).get()
+
+    def stats(self) -> dict:
+        """Return registry counters for monitoring.
+
+        Returns:
+            dict: Number of tenants plus the configuration cache counters
+        """
+        stats = self._table_cache.stats()
+        del stats["versions"]
+        stats["tenants"] = self._tenant_count
+        stats["token_secrets"] = len(self._token_caches)
+        return stats
+
+    def _load_table(self) -> Tuple[TenantTable]:
+        table = parse_tenants(json.loads(self._read_config()))
+        self._tenant_count = len(table)
+        return (table,)
+
+    def _token_cache(self, tenant: Tenant) -> SecretCache:
+        key = (tenant.token_secret, tenant.token_secret_versions)
+        cache = self._token_caches.get(key)
+        if cache is None:
+            with self._lock:
+                cache = self._token_caches.get(key)
+                if cache is None:
+                    if self._get_secret is None:
+                        raise ValueError(f"Tenant {tenant.name!r} uses token_secret but no secret reader is set")
+                    secret, versions = key
+                    cache = self._token_caches[key] = SecretCache(
+                        lambda: tuple(self._get_secret(secret, version) for version in versions),
+                        name=secret, **self._cache_options)
+                    logging.info(f"Tenant {tenant.name} reads its tokens from secret {secret}")
+        return cache
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the ASGI entry point
+Sends the same requests to main:app and asgi:app and checks the responses match
+"""
+
+import asyncio
+import json
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import main and asgi
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def call_asgi(method, path, query=b"", body=b"", content_type=b"application/json", headers=()):
+    """Run one request through asgi.app and return (status, parsed body)"""
+    import asgi
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query,
+             "headers": [(b"content-type", content_type)] + list(headers)}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    data = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    try:
+        return sent[0]["status"], json.loads(data)
+    except ValueError:
+        return sent[0]["status"], data.decode("utf-8")
+
+def test_same_responses():
+    """Test that both entry points answer every case identically"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing Flask/ASGI parity...")
+
+    try:
+        import main
+        from fake_pubsub import FakePublisherClient
+
+        main.publisher = FakePublisherClient()
+        client = main.app.test_client()
+        token = os.environ["BACKLOG_WEBHOOK_SECRET_TOKEN"]
+        comment = json.dumps(load_sample_data()).encode("utf-8")
+
+        cases = [
+            ("comment event", f"token={token}", comment, "application/json"),
+            ("non-comment event", f"token={token}", b'{"type": 1}', "application/json"),
+            ("invalid token", "token=wrong", comment, "application/json"),
+            ("wrong content type", f"token={token}", comment, "text/plain"),
+            ("malformed json", f"token={token}", b'{"type": 3, bad', "application/json"),
+            ("oversized body", f"token={token}", b'{"type": 3, "x": "' + b"a" * (main.MAX_BODY_BYTES + 1) + b'"}',
+             "application/json"),
+        ]
+
+        all_match = True
+        for name, query, body, content_type in cases:
+            flask_response = client.post(f"/webhook/backlog/fm?{query}", data=body, content_type=content_type)
+            flask_result = (flask_response.status_code, flask_response.get_json())
+            asgi_result = call_asgi("POST", "/webhook/backlog/fm", query.encode(), body, content_type.encode())
+
+            # Message IDs come from the fake publisher's counter and differ between calls
+            for _, result_body in (flask_result, asgi_result):
+                if isinstance(result_body, dict) and "message_id" in result_body:
+                    result_body["message_id"] = "<id>"
+
+            if flask_result == asgi_result:
+                logger.info(f"   {name}: {asgi_result[0]}")
+            else:
+                logger.error(f"   {name}: flask={flask_result} asgi={asgi_result}")
+                all_match = False
+
+        health = call_asgi("GET", "/")
+        if health != (200, "OK"):
+            logger.error(f"   health check: {health}")
+            all_match = False
+
+        if all_match:
+            logger.info("✅ Flask/ASGI parity PASSED")
+        else:
+            logger.error("❌ Flask/ASGI parity FAILED")
+        return all_match
+
+    except Exception as e:
+        logger.error(f"❌ Flask/ASGI parity error: {e}")
+        return False
+
+def test_blocking_backends_off_loop():
+    """Test that Redis dedup calls run in worker threads and in-memory processing stays on the loop"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing blocking backends...")
+
+    import asgi
+    import main
+    import threading
+    from dedup import MemoryDedupStore, RedisDedupStore
+    from fake_pubsub import FakePublisherClient
+    from fake_redis import FakeRedis
+
+    class RecordingRedis(FakeRedis):
+        """Remembers the thread of each command"""
+        def set(self, key, value, nx=False, ex=None):
+            command_threads.append(threading.current_thread())
+            return super().set(key, value, nx=nx, ex=ex)
+
+    command_threads = []
+    comment = json.dumps(load_sample_data()).encode("utf-8")
+    original = (main.publisher, main.dedup_store, main.PUBLISH_MODE)
+    try:
+        main.publisher = FakePublisherClient()
+        main.dedup_store = MemoryDedupStore()
+        inline = not asgi.processing_may_block()
+        main.PUBLISH_MODE = "outbox"
+        outbox_offloaded = asgi.processing_may_block()
+        main.PUBLISH_MODE = original[2]
+        main.dedup_store = RedisDedupStore(RecordingRedis())
+        status = call_asgi("POST", "/webhook/backlog/fm", b"token=test-token", comment)[0]
+        main.publisher.stop()
+    finally:
+        main.publisher, main.dedup_store, main.PUBLISH_MODE = original
+
+    # call_asgi runs the event loop on this thread
+    ok = (inline and outbox_offloaded and status == 200 and len(command_threads) == 2
+          and threading.current_thread() not in command_threads)
+
+    if ok:
+        logger.info("✅ Blocking backends PASSED")
+        return True
+    logger.error(f"❌ Blocking backends FAILED: inline={inline}, outbox={outbox_offloaded}, status={status}, "
+                 f"threads={command_threads}")
+    return False
+
+def test_default_concurrency_limit():
+    """Test that asgi:app admits more concurrent webhooks than gunicorn's threads with the default settings"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing default ASGI concurrency limit...")
+
+    import asgi
+    import main
+    from fake_pubsub import FakePublisherClient
+
+    requests = 20
+    comment = json.dumps(load_sample_data()).encode("utf-8")
+    scope = {"type": "http", "method": "POST", "path": "/webhook/backlog/fm", "query_string": b"token=test-token",
+             "headers": [(b"content-type", b"application/json")]}
+
+    async def send_webhook():
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": comment, "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi.app(scope, receive, send)
+        return sent[0]["status"]
+
+    async def send_all():
+        return await asyncio.gather(*(send_webhook() for _ in range(requests)))
+
+    original = main.publisher
+    try:
+        # Each publish holds its request long enough for all of them to be in flight together
+        main.publisher = FakePublisherClient(latency=0.2)
+        statuses = asyncio.run(send_all())
+        main.publisher.stop()
+    finally:
+        main.publisher = original
+
+    limit = main.concurrency_limiter.max_limit
+    ok = statuses == [200] * requests and limit > main.CONCURRENCY_LIMIT_MAX
+
+    if ok:
+        logger.info(f"✅ Default ASGI concurrency limit PASSED: {requests} concurrent requests, max {limit}")
+        return True
+    logger.error(f"❌ Default ASGI concurrency limit FAILED: statuses={statuses}, max={limit}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for ASGI Entry Point")
+
+    tests = [
+        ("Flask/ASGI Parity", test_same_responses),
+        ("Blocking Backends Off the Event Loop", test_blocking_backends_off_loop),
+        ("Default Concurrency Limit", test_default_concurrency_limit)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 ASGI Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall ASGI Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
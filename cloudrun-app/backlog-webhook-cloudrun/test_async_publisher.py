@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the asynchronous publish queue
+Tests queueing, completion callbacks and back-pressure with a fake publisher
+"""
+
+import sys
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+# Add the current directory to the path to import async_publisher
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_publisher import AsyncPublishQueue
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def wait_for(condition, timeout=2.0):
+    """Poll until condition() is true or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def resolved_future(result=None, error=None):
+    """Return a future that is already completed"""
+    future = Future()
+    if error:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+def test_success_callback():
+    """Test that published payloads reach the success callback"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing success callbacks...")
+
+    succeeded = []
+    publish_queue = AsyncPublishQueue(
+        lambda payload: resolved_future(f"msg-{payload['n']}"),
+        on_success=lambda payload, message_id: succeeded.append(message_id)
+    )
+    accepted = all(publish_queue.submit({"n": n}) for n in range(3))
+
+    if accepted and wait_for(lambda: len(succeeded) == 3) and publish_queue.stats()["published"] == 3:
+        logger.info(f"✅ Success callback PASSED: {succeeded}")
+        return True
+    logger.error(f"❌ Success callback FAILED: {succeeded}, stats={publish_queue.stats()}")
+    return False
+
+def test_failure_callback():
+    """Test that failed publishes reach the failure callback"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing failure callbacks...")
+
+    failed = []
+    publish_queue = AsyncPublishQueue(
+        lambda payload: resolved_future(error=RuntimeError("publish failed")),
+        on_failure=lambda payload, error: failed.append(str(error))
+    )
+    publish_queue.submit({"n": 1})
+
+    if wait_for(lambda: failed == ["publish failed"]) and publish_queue.stats()["failed"] == 1:
+        logger.info("✅ Failure callback PASSED")
+        return True
+    logger.error(f"❌ Failure callback FAILED: {failed}, stats={publish_queue.stats()}")
+    return False
+
+def test_queue_full_rejects():
+    """Test that a full queue rejects new payloads instead of blocking"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing queue back-pressure...")
+
+    release = threading.Event()
+
+    def blocking_publish(payload):
+        release.wait()
+        return resolved_future("msg")
+
+    publish_queue = AsyncPublishQueue(blocking_publish, maxsize=2)
+    results = [publish_queue.submit({"n": n}) for n in range(4)]
+    release.set()
+
+    # The worker holds one payload, two wait in the queue, the fourth is rejected
+    if results.count(False) >= 1 and publish_queue.stats()["rejected"] == results.count(False):
+        logger.info(f"✅ Queue back-pressure PASSED: {results}")
+        return True
+    logger.error(f"❌ Queue back-pressure FAILED: {results}, stats={publish_queue.stats()}")
+    return False
+
+def test_pending_never_hidden():
+    """Test that a dequeued payload stays counted until its outcome is recorded, as the shutdown drain relies on"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing pending accounting...")
+
+    # A payload held by the publish call has left the queue but must still count as in flight
+    entered, release = threading.Event(), threading.Event()
+
+    def held_publish(payload):
+        entered.set()
+        release.wait()
+        return resolved_future("msg")
+
+    held_queue = AsyncPublishQueue(held_publish)
+    held_queue.submit({"n": 0})
+    entered.wait(5)
+    held = held_queue.stats()
+    release.set()
+    deadline = time.time() + 5
+    while held_queue.stats()["published"] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    finished = held_queue.stats()
+
+    # Every snapshot taken while submitters race the worker must account for each accepted payload
+    publish_queue = AsyncPublishQueue(lambda payload: resolved_future("msg"), maxsize=10000)
+    done = threading.Event()
+    inconsistent = []
+
+    def sample():
+        while not done.is_set():
+            stats = publish_queue.stats()
+            if stats["accepted"] != stats["published"] + stats["failed"] + stats["queued"] + stats["in_flight"]:
+                inconsistent.append(stats)
+
+    def submit_many():
+        for n in range(1000):
+            publish_queue.submit({"n": n})
+
+    sampler = threading.Thread(target=sample)
+    submitters = [threading.Thread(target=submit_many) for _ in range(4)]
+    sampler.start()
+    for thread in submitters:
+        thread.start()
+    for thread in submitters:
+        thread.join()
+    deadline = time.time() + 10
+    while publish_queue.stats()["published"] < 4000 and time.time() < deadline:
+        time.sleep(0.01)
+    done.set()
+    sampler.join()
+    stats = publish_queue.stats()
+
+    ok = (held["queued"] == 0 and held["in_flight"] == 1 and held["accepted"] == 1
+          and finished["in_flight"] == 0 and finished["published"] == 1
+          and not inconsistent and stats["published"] == 4000 and stats["in_flight"] == 0 and stats["queued"] == 0)
+    if ok:
+        logger.info("✅ Pending accounting PASSED")
+    else:
+        logger.error(f"❌ Pending accounting FAILED: held={held}, finished={finished}, "
+                     f"inconsistent={inconsistent[:3]}, stats={stats}")
+    # Asserted as well, so the failure is not lost when the test is collected by pytest
+    assert ok, "pending accounting"
+    return ok
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Async Publish Queue")
+
+    tests = [
+        ("Success Callback", test_success_callback),
+        ("Failure Callback", test_failure_callback),
+        ("Queue Back-pressure", test_queue_full_rejects),
+        ("Pending Accounting", test_pending_never_hidden)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Async Publish Queue Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Async Publish Queue Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
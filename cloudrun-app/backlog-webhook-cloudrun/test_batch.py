@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the batch endpoint
+Tests JSON array and NDJSON batches, per-item results, limits and Flask/ASGI parity
+"""
+
+import copy
+import json
+import sys
+import os
+import logging
+from concurrent.futures import Future
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Items reuse sample.json, so duplicate-delivery detection is enabled only where tested
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from fake_pubsub import FakePublisherClient
+from test_asgi import call_asgi
+
+BATCH_PATH = "/webhook/backlog/fm/batch"
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def comment_event(seq: int, text: str = "comment") -> dict:
+    """Return sample.json as a distinct comment event"""
+    event = copy.deepcopy(load_sample_data())
+    event["id"] += seq
+    event["content"]["comment"]["id"] += seq
+    event["content"]["comment"]["content"] = text
+    return event
+
+class FailingPublisher(FakePublisherClient):
+    """Fake publisher that fails every message containing FAIL."""
+
+    def publish(self, topic, data, ordering_key="", **attrs):
+        if b"FAIL" in data:
+            future = Future()
+            future.set_exception(RuntimeError("publish failed"))
+            return future
+        return super().publish(topic, data, ordering_key, **attrs)
+
+def post(client, body, content_type="application/json", token="test-token"):
+    response = client.post(f"{BATCH_PATH}?token={token}", data=body, content_type=content_type)
+    return response.status_code, response.get_json()
+
+def test_json_array():
+    """Test per-item results for a JSON array, published together in one RPC"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing JSON array batch...")
+
+    import main
+
+    original_publisher = main.publisher
+    main.publisher = FakePublisherClient(record=True)
+    try:
+        events = [comment_event(1), {"type": 1, "content": {}}, "not an object", comment_event(2)]
+        status, body = post(main.app.test_client(), json.dumps(events))
+        rpc_count = main.publisher.rpc_count
+        published = len(main.publisher.messages)
+    finally:
+        main.publisher.stop()
+        main.publisher = original_publisher
+
+    results = body["results"]
+    ok = (status == 200
+          and [r["index"] for r in results] == [0, 1, 2, 3]
+          and [r["status"] for r in results] == [200, 200, 400, 200]
+          and results[0]["message_id"] and results[3]["comment_id"] == comment_event(2)["content"]["comment"]["id"]
+          and "message_id" not in results[1]
+          and body["status_counts"] == {"200": 3, "400": 1}
+          and body["success"] is False
+          and published == 2 and rpc_count == 1)
+
+    if ok:
+        logger.info("✅ JSON array batch PASSED")
+        return True
+    logger.error(f"❌ JSON array batch FAILED: status={status}, body={body}, rpcs={rpc_count}")
+    return False
+
+def test_ndjson():
+    """Test NDJSON batches, including blank lines, malformed lines and failed publishes"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing NDJSON batch...")
+
+    import main
+
+    original_publisher = main.publisher
+    main.publisher = FailingPublisher()
+    try:
+        lines = [json.dumps(comment_event(1)), "", json.dumps({"type": 2}), '{"type": 3, bad',
+                 json.dumps(comment_event(3, "FAIL"))]
+        status, body = post(main.app.test_client(), "\n".join(lines) + "\n", "application/x-ndjson")
+    finally:
+        main.publisher.stop()
+        main.publisher = original_publisher
+
+    statuses = [r["status"] for r in body["results"]]
+    ok = status == 200 and statuses == [200, 200, 400, 500] and body["items"] == 4
+
+    if ok:
+        logger.info("✅ NDJSON batch PASSED")
+        return True
+    logger.error(f"❌ NDJSON batch FAILED: status={status}, statuses={statuses}")
+    return False
+
+def test_duplicates_in_batch():
+    """Test that a repeated event within one batch is published only once"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing duplicates within a batch...")
+
+    import main
+    from dedup import MemoryDedupStore
+
+    original_publisher, original_store = main.publisher, main.dedup_store
+    main.publisher = FakePublisherClient(record=True)
+    main.dedup_store = MemoryDedupStore()
+    try:
+        status, body = post(main.app.test_client(), json.dumps([comment_event(5), comment_event(5)]))
+        published = len(main.publisher.messages)
+    finally:
+        main.publisher.stop()
+        main.publisher, main.dedup_store = original_publisher, original_store
+
+    results = body["results"]
+    ok = status == 200 and published == 1 and results[1].get("duplicate") is True and results[0]["message_id"]
+
+    if ok:
+        logger.info("✅ Duplicates within a batch PASSED")
+        return True
+    logger.error(f"❌ Duplicates within a batch FAILED: published={published}, results={results}")
+    return False
+
+def test_limits():
+    """Test the token, content type, item count and body size checks"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing batch limits...")
+
+    import main
+
+    client = main.app.test_client()
+    too_many = "\n".join(['{"type": 1}'] * (main.BATCH_MAX_ITEMS + 1))
+    too_large = json.dumps([{"type": 1, "x": "a" * main.BATCH_MAX_BODY_BYTES}])
+    checks = {
+        "invalid token": post(client, "[]", token="wrong")[0] == 403,
+        "wrong content type": post(client, "[]", "text/plain")[0] == 400,
+        "not an array": post(client, json.dumps(load_sample_data()))[0] == 400,
+        "too many NDJSON items": post(client, too_many, "application/x-ndjson")[0] == 413,
+        "too many array items": post(client, "[" + too_many.replace("\n", ",") + "]")[0] == 413,
+        "body too large": post(client, too_large)[0] == 413,
+        "empty batch": post(client, "[]") == (200, {"success": True, "mode": main.PUBLISH_MODE, "items": 0,
+                                                    "status_counts": {}, "results": []}),
+    }
+    failed = [name for name, passed in checks.items() if not passed]
+
+    if not failed:
+        logger.info("✅ Batch limits PASSED")
+        return True
+    logger.error(f"❌ Batch limits FAILED: {failed}")
+    return False
+
+def test_asgi_parity():
+    """Test that the ASGI entry point answers batches like Flask"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing Flask/ASGI batch parity...")
+
+    import main
+
+    original_publisher = main.publisher
+    main.publisher = FailingPublisher()
+    try:
+        array = json.dumps([comment_event(1), {"type": 1}, comment_event(2, "FAIL")]).encode()
+        ndjson = b'{"type": 1}\n' + json.dumps(comment_event(3)).encode()
+        cases = [("array", array, "application/json"), ("ndjson", ndjson, "application/x-ndjson"),
+                 ("wrong content type", array, "text/plain")]
+        client = main.app.test_client()
+        mismatched = []
+        for name, body, content_type in cases:
+            flask_result = post(client, body, content_type)
+            asgi_result = call_asgi("POST", BATCH_PATH, b"token=test-token", body, content_type.encode())
+            # Message IDs come from the fake publisher's counter and differ between calls
+            for _, result_body in (flask_result, asgi_result):
+                for item in result_body.get("results", []):
+                    if item.get("message_id"):
+                        item["message_id"] = "<id>"
+            if flask_result != asgi_result:
+                mismatched.append((name, flask_result, asgi_result))
+    finally:
+        main.publisher.stop()
+        main.publisher = original_publisher
+
+    if not mismatched:
+        logger.info("✅ Flask/ASGI batch parity PASSED")
+        return True
+    logger.error(f"❌ Flask/ASGI batch parity FAILED: {mismatched}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Batch Endpoint")
+
+    tests = [
+        ("JSON Array Batch", test_json_array),
+        ("NDJSON Batch", test_ndjson),
+        ("Duplicates Within a Batch", test_duplicates_in_batch),
+        ("Batch Limits", test_limits),
+        ("Flask/ASGI Batch Parity", test_asgi_parity)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Batch Endpoint Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Batch Endpoint Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
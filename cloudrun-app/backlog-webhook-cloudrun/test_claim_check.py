@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the claim check of oversized comments
+Tests offloading comment bodies to the local blob store and publishing references instead
+"""
+
+import copy
+import json
+import sys
+import os
+import logging
+import tempfile
+import threading
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from claim_check import ClaimCheck, LocalBlobStore, resolve_comment_content
+from message_codec import decode_message
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def comment_message(text: str) -> dict:
+    """A message in the shape of the comment extractor's output"""
+    return {"content": {"comment": {"id": 1, "content": text}, "issue": {"id": 2}}, "type": 3}
+
+def test_claim_check():
+    """Test the byte threshold, references, content hashing and store failures"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing claim check...")
+
+    class BrokenStore:
+        def put(self, name, data):
+            raise OSError("bucket unavailable")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = LocalBlobStore(root)
+        check = ClaimCheck(store, threshold_bytes=100)
+
+        small = comment_message("x" * 100)
+        small_result = check.apply(small)
+        # 40 characters, but 120 bytes in UTF-8
+        large = comment_message("あ" * 40)
+        original = copy.deepcopy(large)
+        large_result = check.apply(large)
+        again = check.apply(comment_message("あ" * 40))
+        other = check.apply({"type": 1, "content": {"summary": "no comment"}})
+        ref = large_result["content"]["comment"]["contentRef"]
+        resolved = resolve_comment_content(large_result, store)
+        stats = check.stats()
+
+        broken = ClaimCheck(BrokenStore(), threshold_bytes=10)
+        try:
+            broken.apply(comment_message("y" * 20))
+            raised = False
+        except OSError:
+            raised = True
+
+    ok = (small_result is small and large == original
+          and large_result["content"]["comment"]["content"] is None
+          and large_result["content"]["issue"] is large["content"]["issue"]
+          and ref["bytes"] == 120 and ref["uri"].startswith("file://") and ref["uri"].endswith(ref["sha256"])
+          and again["content"]["comment"]["contentRef"] == ref
+          and resolved == "あ" * 40 and resolve_comment_content(small, store) == "x" * 100
+          and other["content"] == {"summary": "no comment"}
+          and stats["inline"] == 1 and stats["offloaded"] == 2 and stats["offloaded_bytes"] == 240
+          and abs(stats["hit_rate"] - 2 / 3) < 1e-9
+          and raised and broken.stats()["errors"] == 1)
+
+    if ok:
+        logger.info("✅ Claim check PASSED")
+        return True
+    logger.error(f"❌ Claim check FAILED: small={small_result}, large={large_result}, resolved={resolved!r}, "
+                 f"stats={stats}, raised={raised}")
+    return False
+
+def test_webhook_claim_check():
+    """Test that oversized comments are published as references and small ones inline"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook claim check...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from test_asgi import call_asgi
+
+    class RecordingStore(LocalBlobStore):
+        """Remembers the thread of each upload"""
+        def put(self, name, data):
+            upload_threads.append(threading.current_thread())
+            return super().put(name, data)
+
+    upload_threads = []
+    original = (main.publisher, main.claim_check)
+    main.publisher = FakePublisherClient(record=True)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    long_comment = copy.deepcopy(sample)
+    long_comment["content"]["comment"]["content"] = "ログ\n" * 2000
+
+    with tempfile.TemporaryDirectory() as root:
+        store = RecordingStore(root)
+        try:
+            main.claim_check = ClaimCheck(store, threshold_bytes=4096)
+            statuses = [client.post("/webhook/backlog/fm?token=test-token", json=event).status_code
+                        for event in (sample, long_comment)]
+            metrics_text = client.get("/metrics").get_data(as_text=True)
+            # The upload must not run on the event loop, which is this thread under asyncio.run
+            asgi_status = call_asgi("POST", "/webhook/backlog/fm", b"token=test-token",
+                                    json.dumps(long_comment).encode())[0]
+            main.publisher.stop()
+            published = [(decode_message(m["data"], m["attributes"]), m["attributes"])
+                         for m in main.publisher.messages]
+            resolved = resolve_comment_content(published[1][0], store)
+            published = published[:2]
+        finally:
+            main.publisher, main.claim_check = original
+
+    inline, offloaded = published
+    ok = (statuses == [200, 200] and asgi_status == 200
+          and len(upload_threads) == 2 and upload_threads[1] is not threading.current_thread()
+          and inline[0]["content"]["comment"]["content"] == sample["content"]["comment"]["content"]
+          and "claim_check" not in inline[1]
+          and offloaded[0]["content"]["comment"]["content"] is None
+          and offloaded[1]["claim_check"] == "true"
+          and resolved == long_comment["content"]["comment"]["content"]
+          and "backlog_webhook_claim_check_offloaded 1" in metrics_text
+          and "backlog_webhook_claim_check_threshold_bytes 4096" in metrics_text
+          and "backlog_webhook_claim_check_hit_rate 0.5" in metrics_text)
+
+    if ok:
+        logger.info("✅ Webhook claim check PASSED")
+        return True
+    logger.error(f"❌ Webhook claim check FAILED: statuses={statuses}, asgi={asgi_status}, "
+                 f"upload_threads={upload_threads}, published={published}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Claim Check")
+
+    tests = [
+        ("Claim Check", test_claim_check),
+        ("Webhook Claim Check", test_webhook_claim_check)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Claim Check Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Claim Check Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
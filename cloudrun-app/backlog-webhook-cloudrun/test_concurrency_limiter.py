@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the adaptive concurrency limiter
+Tests the AIMD limit, fast shedding with Retry-After and the exempt health check
+"""
+
+import json
+import sys
+import os
+import logging
+import threading
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_aimd():
+    """Test admission, one multiplicative decrease per burst and bounded additive increase"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing AIMD limit...")
+
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4, min_limit=1, latency_target=1.0, backoff=0.5, clock=clock)
+
+    permits = [limiter.acquire() for _ in range(5)]
+    admitted = sum(p is not None for p in permits)
+
+    # Four slow requests from the same burst lower the limit only once
+    clock.now += 2.0
+    for permit in permits[:4]:
+        limiter.release(permit)
+    after_burst = limiter.stats()["limit"]
+
+    # A failure from a later request lowers it again, down to the minimum
+    permit = limiter.acquire()
+    limiter.release(permit, success=False)
+    after_failure = limiter.stats()["limit"]
+
+    # Fast requests at full utilization grow the limit back, but not above the maximum
+    for _ in range(20):
+        batch = [p for p in (limiter.acquire() for _ in range(4)) if p is not None]
+        clock.now += 0.01
+        for permit in batch:
+            limiter.release(permit)
+    stats = limiter.stats()
+
+    # Sequential requests use at most one slot, so they do not grow the limit further
+    idle = AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=2, clock=clock)
+    for _ in range(20):
+        idle.release(idle.acquire())
+
+    ok = (admitted == 4 and permits[4] is None
+          and after_burst == 2 and after_failure == 1
+          and stats["limit"] == 4 and stats["in_flight"] == 0 and idle.stats()["limit"] == 2
+          and stats["decreases"] == 2)
+
+    if ok:
+        logger.info("✅ AIMD limit PASSED")
+        return True
+    logger.error(f"❌ AIMD limit FAILED: admitted={admitted}, after_burst={after_burst}, "
+                 f"after_failure={after_failure}, stats={stats}")
+    return False
+
+def test_shedding():
+    """Test 503 with Retry-After over the limit, on both entry points, with the health check exempt"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing load shedding...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from test_asgi import call_asgi
+
+    original_publisher, original_limiter = main.publisher, main.concurrency_limiter
+    main.publisher = FakePublisherClient()
+    main.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    try:
+        held = main.concurrency_limiter.acquire()
+        shed = client.post("/webhook/backlog/fm?token=test-token", json=sample)
+        shed_batch = client.post("/webhook/backlog/fm/batch?token=test-token", json=[sample])
+        asgi_shed = call_asgi("POST", "/webhook/backlog/fm", b"token=test-token", json.dumps(sample).encode())
+        health = client.get("/")
+        metrics_text = client.get("/metrics").get_data(as_text=True)
+        main.concurrency_limiter.release(held)
+        admitted = client.post("/webhook/backlog/fm?token=test-token", json=sample)
+    finally:
+        main.publisher.stop()
+        main.publisher, main.concurrency_limiter = original_publisher, original_limiter
+
+    ok = (shed.status_code == 503 and shed.headers.get("Retry-After") == "1"
+          and shed.get_json()["reason"] == "overloaded"
+          and shed_batch.status_code == 503
+          and asgi_shed[0] == 503 and asgi_shed[1] == shed.get_json()
+          and health.status_code == 200
+          and "backlog_webhook_concurrency_limit 1" in metrics_text
+          and 'backlog_webhook_requests_total{status="503",outcome="shed"}' in metrics_text
+          and admitted.status_code == 200)
+
+    if ok:
+        logger.info("✅ Load shedding PASSED")
+        return True
+    logger.error(f"❌ Load shedding FAILED: shed={shed.status_code} {dict(shed.headers)}, "
+                 f"asgi={asgi_shed}, health={health.status_code}, admitted={admitted.status_code}")
+    return False
+
+def test_slow_publisher():
+    """Test that a slow publisher lowers the limit and excess requests are answered fast"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing slow publisher...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+
+    original_publisher, original_limiter = main.publisher, main.concurrency_limiter
+    main.publisher = FakePublisherClient(latency=0.3)
+    main.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=4, latency_target=0.1)
+    client_lock = threading.Lock()
+    results = []
+    sample = load_sample_data()
+
+    def post():
+        client = main.app.test_client()
+        started = time.perf_counter()
+        status = client.post("/webhook/backlog/fm?token=test-token", json=sample).status_code
+        with client_lock:
+            results.append((status, time.perf_counter() - started))
+
+    try:
+        for _ in range(3):
+            threads = [threading.Thread(target=post) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        stats = main.concurrency_limiter.stats()
+    finally:
+        main.publisher.stop()
+        main.publisher, main.concurrency_limiter = original_publisher, original_limiter
+
+    shed = [elapsed for status, elapsed in results if status == 503]
+    published = [status for status, _ in results if status == 200]
+    ok = shed and published and max(shed) < 0.25 and stats["limit"] < 4 and stats["in_flight"] == 0
+
+    if ok:
+        logger.info(f"✅ Slow publisher PASSED ({len(published)} published, {len(shed)} shed, limit {stats['limit']})")
+        return True
+    logger.error(f"❌ Slow publisher FAILED: results={results}, stats={stats}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Concurrency Limiter")
+
+    tests = [
+        ("AIMD Limit", test_aimd),
+        ("Load Shedding", test_shedding),
+        ("Slow Publisher", test_slow_publisher)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Concurrency Limiter Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Concurrency Limiter Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
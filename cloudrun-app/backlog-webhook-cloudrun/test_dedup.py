@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for duplicate-delivery detection
+Tests the in-memory LRU/TTL store and the Redis store against a local stand-in
+"""
+
+import json
+import sys
+import os
+import time
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dedup import MemoryDedupStore, RedisDedupStore, make_dedup_key, PENDING
+from fake_redis import FakeRedis
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_dedup_key():
+    """Test that retries share a key and comment edits do not"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing dedup key...")
+
+    payload = load_sample_data()
+    retry = load_sample_data()
+    edited = load_sample_data()
+    edited["content"]["comment"]["updated"] = "2024-01-01T00:00:00Z"
+    null_keys = [make_dedup_key({"id": 5, "content": None}), make_dedup_key({"id": 5, "content": {"comment": None}})]
+
+    if make_dedup_key(payload) == make_dedup_key(retry) and make_dedup_key(payload) != make_dedup_key(edited) \
+            and null_keys == ["5:None:", "5:None:"]:
+        logger.info(f"✅ Dedup key PASSED: {make_dedup_key(payload)}")
+        return True
+    logger.error(f"❌ Dedup key FAILED: null_keys={null_keys}")
+    return False
+
+def run_claim_lifecycle(store):
+    """Run claim/complete/release against a store and return the observed results"""
+    first = store.claim("k")
+    in_flight = store.claim("k")
+    store.complete("k", "msg-1")
+    after_publish = store.claim("k")
+    store.release("k")
+    after_release = store.claim("k")
+    return [first, in_flight, after_publish, after_release]
+
+EXPECTED_LIFECYCLE = [(True, None), (False, PENDING), (False, "msg-1"), (True, None)]
+
+def test_memory_store():
+    """Test claim, complete and release on the memory store"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing memory store lifecycle...")
+
+    results = run_claim_lifecycle(MemoryDedupStore())
+    if results == EXPECTED_LIFECYCLE:
+        logger.info("✅ Memory store PASSED")
+        return True
+    logger.error(f"❌ Memory store FAILED: {results}")
+    return False
+
+def test_memory_store_bounds():
+    """Test LRU eviction and TTL expiry"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing memory store bounds...")
+
+    store = MemoryDedupStore(max_entries=2, ttl=60)
+    store.claim("a")
+    store.claim("b")
+    store.claim("a")  # touch "a" so "b" is least recently used
+    store.claim("c")
+    kept_a = not store.claim("a")[0]
+    evicted_b = store.claim("b")[0]
+
+    short = MemoryDedupStore(ttl=0.05)
+    short.claim("x")
+    time.sleep(0.1)
+    expired = short.claim("x")[0]
+
+    if evicted_b and kept_a and expired:
+        logger.info("✅ Memory store bounds PASSED")
+        return True
+    logger.error(f"❌ Memory store bounds FAILED: evicted_b={evicted_b}, kept_a={kept_a}, expired={expired}")
+    return False
+
+def test_redis_store_shared():
+    """Test that two instances sharing one Redis see each other's deliveries"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing Redis store across instances...")
+
+    server = FakeRedis()
+    results = run_claim_lifecycle(RedisDedupStore(server))
+    instance_a = RedisDedupStore(server)
+    instance_b = RedisDedupStore(server)
+    instance_a.claim("shared")
+    instance_a.complete("shared", "msg-2")
+    seen_by_b = instance_b.claim("shared")
+
+    if results == EXPECTED_LIFECYCLE and seen_by_b == (False, "msg-2"):
+        logger.info("✅ Redis store PASSED")
+        return True
+    logger.error(f"❌ Redis store FAILED: {results}, seen_by_b={seen_by_b}")
+    return False
+
+def test_redis_store_fails_open():
+    """Test that an unreachable Redis lets deliveries through"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing Redis failure handling...")
+
+    class BrokenRedis:
+        def set(self, *args, **kwargs):
+            raise ConnectionError("connection refused")
+
+    store = RedisDedupStore(BrokenRedis())
+    if store.claim("k") == (True, None) and store.stats()["errors"] == 1:
+        logger.info("✅ Redis fail-open PASSED")
+        return True
+    logger.error(f"❌ Redis fail-open FAILED: {store.stats()}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Duplicate Delivery Detection")
+
+    tests = [
+        ("Dedup Key", test_dedup_key),
+        ("Memory Store", test_memory_store),
+        ("Memory Store Bounds", test_memory_store_bounds),
+        ("Redis Store Shared", test_redis_store_shared),
+        ("Redis Fail Open", test_redis_store_fails_open)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Dedup Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Dedup Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
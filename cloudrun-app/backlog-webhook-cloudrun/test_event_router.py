@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for declarative event routing
+Tests rule matching, fan-out to several topics and rule validation
+"""
+
+import json
+import sys
+import os
+import logging
+import tempfile
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from event_router import EventRouter, load_route_rules
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_default_rules():
+    """Test that the default rules keep the original comment-only behaviour"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing default routing rules...")
+
+    import main
+    sample = load_sample_data()
+    without_comment = dict(sample, content={k: v for k, v in sample["content"].items() if k != "comment"})
+
+    # The routing decision is a request log, so LOG_SAMPLE_RATES can sample it
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logging.getLogger("webhook.request").addHandler(handler)
+    try:
+        comment_routes = main.event_router.route(sample)
+    finally:
+        logging.getLogger("webhook.request").removeHandler(handler)
+    ok = (len(comment_routes) == 1
+          and f"Event type=3 routed to comment->{main.PUBSUB_TOPIC}" in [r.getMessage() for r in records]
+          and comment_routes[0].topic == main.PUBSUB_TOPIC
+          and comment_routes[0].message == main.extract_comment_data(sample)
+          and main.event_router.route(dict(sample, type=1)) == []
+          and main.event_router.route(without_comment) == []
+          and main.event_router.accepted_types == frozenset(main.COMMENT_EVENT_TYPES))
+
+    if ok:
+        logger.info("✅ Default rules PASSED")
+        return True
+    logger.error(f"❌ Default rules FAILED: {comment_routes}, logs={[r.getMessage() for r in records]}")
+    return False
+
+def test_matching_and_fan_out():
+    """Test type, project and field predicates and fan-out in rule order"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing rule matching and fan-out...")
+
+    sample = load_sample_data()
+    project_key = sample["project"]["projectKey"]
+    router = EventRouter([
+        {"name": "audit", "topic": "audit"},
+        {"name": "issues", "types": [1, 2], "projects": [project_key], "topic": "issues"},
+        {"name": "closed", "types": [2], "where": {"content.status.id": {"in": [4]}}, "topic": "closed"},
+        {"name": "other-project", "types": [1], "projects": ["OTHER"], "topic": "other"},
+    ], default_topic="default")
+
+    def topics(payload):
+        return [routed.topic for routed in router.route(payload)]
+
+    closed = dict(sample, type=2, content=dict(sample["content"], status={"id": 4}))
+    results = {
+        "created": topics(dict(sample, type=1)),
+        "closed": topics(closed),
+        "comment": topics(sample),
+        "string type": topics(dict(sample, type="1")),
+    }
+    expected = {
+        "created": ["audit", "issues"],
+        "closed": ["audit", "issues", "closed"],
+        "comment": ["audit"],
+        "string type": ["audit"],
+    }
+
+    if results == expected and router.accepted_types is None:
+        logger.info("✅ Matching and fan-out PASSED")
+        return True
+    logger.error(f"❌ Matching and fan-out FAILED: {results}")
+    return False
+
+def test_invalid_rules():
+    """Test that malformed rules are rejected when compiled"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing rule validation...")
+
+    invalid = [
+        [{"name": "a", "extractor": "missing"}],
+        [{"name": "b", "where": {"type": {"gt": 1}}}],
+        [{"name": "c", "topics": ["typo"]}],
+    ]
+    rejected = 0
+    for rules in invalid:
+        try:
+            EventRouter(rules, default_topic="default")
+        except ValueError:
+            rejected += 1
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump([{"name": "from-file", "types": [1]}], f)
+    try:
+        from_file = load_route_rules({"EVENT_ROUTES_FILE": f.name, "EVENT_ROUTES": "[]"})
+    finally:
+        os.unlink(f.name)
+    from_env = load_route_rules({"EVENT_ROUTES": '[{"types": [2]}]'})
+
+    if rejected == len(invalid) and from_file[0]["name"] == "from-file" and from_env == [{"types": [2]}] \
+            and load_route_rules({}) is None:
+        logger.info("✅ Rule validation PASSED")
+        return True
+    logger.error(f"❌ Rule validation FAILED: {rejected}/{len(invalid)} rejected")
+    return False
+
+def test_webhook_fan_out():
+    """Test that the webhook handler publishes one message per matching route"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook fan-out through the Flask app...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+
+    original_router, original_publisher = main.event_router, main.publisher
+    main.publisher = FakePublisherClient(record=True)
+    main.event_router = EventRouter(
+        main.DEFAULT_ROUTE_RULES + [{"name": "raw", "types": [3], "topic": "raw-events"}],
+        default_topic=main.PUBSUB_TOPIC,
+        extractors={"comment": main.extract_comment_data}
+    )
+    try:
+        response = main.app.test_client().post(
+            "/webhook/backlog/fm?token=test-token", json=load_sample_data())
+        body = response.get_json()
+        published = sorted(m["topic"].rsplit("/", 1)[-1] for m in main.publisher.messages)
+    finally:
+        main.publisher.stop()
+        main.event_router, main.publisher = original_router, original_publisher
+
+    if response.status_code == 200 and body["topics"] == [main.PUBSUB_TOPIC, "raw-events"] \
+            and published == sorted([main.PUBSUB_TOPIC, "raw-events"]):
+        logger.info("✅ Webhook fan-out PASSED")
+        return True
+    logger.error(f"❌ Webhook fan-out FAILED: status={response.status_code}, body={body}, published={published}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Event Routing")
+
+    tests = [
+        ("Default Rules", test_default_rules),
+        ("Matching and Fan-out", test_matching_and_fan_out),
+        ("Rule Validation", test_invalid_rules),
+        ("Webhook Fan-out", test_webhook_fan_out)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Event Routing Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Event Routing Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for structured logging
+Tests JSON lines, per-class sampling, the non-blocking queue handler and quiet probe logging
+"""
+
+import io
+import json
+import queue
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+
+from log_config import (NonBlockingQueueHandler, SamplingFilter, configure_logging, logging_stats,
+                        parse_sample_rates, shutdown_logging)
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def restore_logging():
+    """Put back the text format on stderr used by the rest of the test output"""
+    configure_logging("INFO")
+
+def test_json_lines():
+    """Test that records become one JSON object per line with Cloud Logging fields"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing JSON lines...")
+
+    stream = io.StringIO()
+    try:
+        configure_logging("INFO", "json", stream=stream)
+        logging.getLogger("webhook.request").info("Received payload: type=%s", 3,
+                                                  extra={"json_fields": {"comment_id": 7}})
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logging.getLogger("webhook.request").exception("Unexpected error")
+        logging.getLogger("webhook.request").debug("not emitted at INFO")
+    finally:
+        restore_logging()
+
+    lines = stream.getvalue().splitlines()
+    entries = [json.loads(line) for line in lines]
+    ok = (len(entries) == 2
+          and entries[0]["severity"] == "INFO"
+          and entries[0]["message"] == "Received payload: type=3"
+          and entries[0]["logger"] == "webhook.request"
+          and entries[0]["comment_id"] == 7
+          and entries[0]["time"].endswith("Z")
+          and "logging.googleapis.com/sourceLocation" in entries[0]
+          and entries[1]["severity"] == "ERROR"
+          and "RuntimeError: boom" in entries[1]["message"])
+
+    if ok:
+        logger.info("✅ JSON lines PASSED")
+        return True
+    logger.error(f"❌ JSON lines FAILED: {lines}")
+    return False
+
+def test_sampling():
+    """Test per-class sample rates, and that warnings are never sampled out"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing sampling...")
+
+    rates = parse_sample_rates("request=0.25, webhook.custom=0")
+    draws = iter([0.1, 0.5, 0.9, 0.2] * 10)
+    sampler = SamplingFilter(rates, random_func=lambda: next(draws))
+
+    def record(name, level=logging.INFO):
+        return logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+
+    kept = [sampler.filter(record("webhook.request")) for _ in range(4)]
+    warning_kept = sampler.filter(record("webhook.custom", logging.WARNING))
+    custom_kept = sampler.filter(record("webhook.custom"))
+    other_kept = sampler.filter(record("webhook.publish"))
+
+    try:
+        parse_sample_rates("request=2")
+        invalid_rejected = False
+    except ValueError:
+        invalid_rejected = True
+
+    ok = (rates == {"webhook.request": 0.25, "webhook.custom": 0.0}
+          and kept == [True, False, False, True]
+          and warning_kept and not custom_kept and other_kept
+          and sampler.sampled_out == 3
+          and invalid_rejected)
+
+    if ok:
+        logger.info("✅ Sampling PASSED")
+        return True
+    logger.error(f"❌ Sampling FAILED: rates={rates}, kept={kept}, sampled_out={sampler.sampled_out}")
+    return False
+
+def test_queue_handler():
+    """Test lazy formatting on the listener thread and dropping instead of blocking"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing queue handler...")
+
+    # Immutable arguments stay unformatted; mutable ones are formatted on the calling thread
+    handler = NonBlockingQueueHandler(queue.Queue(2))
+    items = ["a"]
+    lazy = logging.LogRecord("t", logging.INFO, __file__, 1, "n=%s", (5,), None)
+    eager = logging.LogRecord("t", logging.INFO, __file__, 1, "items=%s", (items,), None)
+    handler.handle(lazy)
+    handler.handle(eager)
+    items.append("b")
+    handler.handle(logging.LogRecord("t", logging.INFO, __file__, 1, "dropped", None, None))
+    queued = [handler.queue.get_nowait() for _ in range(2)]
+    handler_ok = (queued[0].args == (5,) and queued[1].args is None
+                  and queued[1].getMessage() == "items=['a']" and handler.dropped == 1)
+
+    # End to end: records written by the listener thread, flushed on shutdown
+    stream = io.StringIO()
+    try:
+        configure_logging("INFO", "json", use_queue=True, queue_size=100, stream=stream)
+        for i in range(20):
+            logging.getLogger("webhook.publish").info("Published message %s", i)
+        shutdown_logging()
+        stats = logging_stats()
+    finally:
+        restore_logging()
+    messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+    listener_ok = messages == [f"Published message {i}" for i in range(20)] and stats["dropped"] == 0
+
+    if handler_ok and listener_ok:
+        logger.info("✅ Queue handler PASSED")
+        return True
+    logger.error(f"❌ Queue handler FAILED: handler_ok={handler_ok}, messages={messages[:3]}")
+    return False
+
+def test_quiet_probes():
+    """Test that health checks are not logged at INFO while webhooks still are"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing quiet probe logging...")
+
+    import main
+
+    stream = io.StringIO()
+    try:
+        configure_logging("INFO", "json", stream=stream)
+        client = main.app.test_client()
+        client.get("/")
+        client.post("/webhook/backlog/fm?token=test-token", json={"type": 1, "content": {}})
+    finally:
+        restore_logging()
+
+    loggers = [json.loads(line)["logger"] for line in stream.getvalue().splitlines()]
+    ok = "webhook.probe" not in loggers and "webhook.request" in loggers
+
+    if ok:
+        logger.info("✅ Quiet probe logging PASSED")
+        return True
+    logger.error(f"❌ Quiet probe logging FAILED: {loggers}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Logging")
+
+    tests = [
+        ("JSON Lines", test_json_lines),
+        ("Sampling", test_sampling),
+        ("Queue Handler", test_queue_handler),
+        ("Quiet Probe Logging", test_quiet_probes)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Logging Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Logging Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
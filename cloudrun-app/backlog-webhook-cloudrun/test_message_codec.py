@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for published message encoding
+Tests that every encoding/compression combination round-trips through decode_message
+"""
+
+import json
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import message_codec
+from message_codec import MessageCodec, decode_message, ENCODINGS, COMPRESSIONS
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_comment():
+    """Load the sample webhook with a long Japanese comment, as the AI processor receives it"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    payload["content"]["comment"]["content"] = "コメントの本文です。" * 200
+    return payload
+
+def available_codecs():
+    """Yield every codec whose optional package is installed"""
+    for encoding in ENCODINGS:
+        for compression in COMPRESSIONS:
+            try:
+                yield MessageCodec(encoding, compression, compression_min_bytes=0)
+            except ValueError as e:
+                logging.getLogger(__name__).info(f"   skipped: {e}")
+
+def test_round_trip():
+    """Test that decode_message restores the payload for every available codec"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing encoding round-trip...")
+
+    payload = load_sample_comment()
+    all_ok = True
+    for codec in available_codecs():
+        data, attributes = codec.encode(payload)
+        if decode_message(data, attributes) != payload:
+            logger.error(f"   {codec}: decoded payload differs")
+            all_ok = False
+        else:
+            logger.info(f"   {codec}: {len(data)} bytes, attributes={attributes}")
+
+    if all_ok:
+        logger.info("✅ Round-trip PASSED")
+    else:
+        logger.error("❌ Round-trip FAILED")
+    return all_ok
+
+def test_default_is_plain_json():
+    """Test that the default codec still publishes JSON readable without attributes"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing default encoding compatibility...")
+
+    payload = load_sample_comment()
+    data, attributes = MessageCodec().encode(payload)
+    ok = (json.loads(data.decode('utf-8')) == payload
+          and decode_message(data) == payload
+          and attributes == {"encoding": "json", "compression": "none"})
+
+    if ok:
+        logger.info("✅ Default encoding PASSED")
+        return True
+    logger.error(f"❌ Default encoding FAILED: attributes={attributes}")
+    return False
+
+def test_compression_threshold():
+    """Test that only payloads at or above the threshold are compressed"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing compression threshold...")
+
+    codec = MessageCodec("json", "gzip", compression_min_bytes=1024)
+    _, small = codec.encode({"comment": "short"})
+    large_data, large = codec.encode(load_sample_comment())
+
+    if small["compression"] == "none" and large["compression"] == "gzip" and large_data[:2] == b"\x1f\x8b":
+        logger.info("✅ Compression threshold PASSED")
+        return True
+    logger.error(f"❌ Compression threshold FAILED: small={small}, large={large}")
+    return False
+
+def test_invalid_configuration():
+    """Test that unknown or unavailable formats are rejected at startup"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing invalid configuration...")
+
+    configs = [("xml", "none"), ("json", "brotli")]
+    if message_codec.msgpack is None:
+        configs.append(("msgpack", "none"))
+    if message_codec.zstandard is None:
+        configs.append(("json", "zstd"))
+
+    rejected = 0
+    for encoding, compression in configs:
+        try:
+            MessageCodec(encoding, compression)
+        except ValueError:
+            rejected += 1
+
+    if rejected == len(configs):
+        logger.info("✅ Invalid configuration PASSED")
+        return True
+    logger.error(f"❌ Invalid configuration FAILED: {rejected}/{len(configs)} rejected")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Message Encoding")
+
+    tests = [
+        ("Encoding Round-trip", test_round_trip),
+        ("Default Encoding Compatibility", test_default_is_plain_json),
+        ("Compression Threshold", test_compression_threshold),
+        ("Invalid Configuration", test_invalid_configuration)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Message Encoding Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Message Encoding Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for in-process metrics
+Tests the Prometheus exposition format and the /metrics endpoint of the webhook handler
+"""
+
+import json
+import sys
+import os
+import logging
+import threading
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from metrics import Registry, StageTimer
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_exposition_format():
+    """Test counter, histogram and collector output in the Prometheus text format"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing exposition format...")
+
+    registry = Registry()
+    counter = registry.counter("demo_total", "Demo counter", ("status",))
+    histogram = registry.histogram("demo_seconds", "Demo histogram", ("stage",), buckets=(0.1, 1.0))
+    registry.register_collector(lambda: [("demo_depth", "Demo gauge", {"queue": 'a"b'}, 3)])
+
+    counter.inc("200")
+    counter.inc("200")
+    histogram.observe(0.05, "parse")
+    histogram.observe(0.5, "parse")
+    histogram.observe(5.0, "parse")
+    text = registry.render()
+
+    expected_lines = [
+        "# TYPE demo_total counter",
+        'demo_total{status="200"} 2',
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{stage="parse",le="0.1"} 1',
+        'demo_seconds_bucket{stage="parse",le="1.0"} 2',
+        'demo_seconds_bucket{stage="parse",le="+Inf"} 3',
+        'demo_seconds_sum{stage="parse"} 5.55',
+        'demo_seconds_count{stage="parse"} 3',
+        "# TYPE demo_depth gauge",
+        'demo_depth{queue="a\\"b"} 3',
+    ]
+    missing = [line for line in expected_lines if line not in text.splitlines()]
+
+    if not missing and text.endswith("\n"):
+        logger.info("✅ Exposition format PASSED")
+        return True
+    logger.error(f"❌ Exposition format FAILED: missing {missing}\n{text}")
+    return False
+
+def test_stage_timer():
+    """Test that stage timers record one observation per mark and nothing when disabled"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing stage timer...")
+
+    histogram = Registry().histogram("stage_seconds", "Stages", ("stage",))
+    timer = StageTimer(histogram)
+    timer.mark("token")
+    timer.mark("parse")
+    timer.mark("parse")
+    StageTimer(None).mark("token")
+
+    if histogram.snapshot("token")[0] == 1 and histogram.snapshot("parse")[0] == 2:
+        logger.info("✅ Stage timer PASSED")
+        return True
+    logger.error("❌ Stage timer FAILED")
+    return False
+
+def test_short_lived_threads():
+    """Test that observations from finished threads are kept while their shards are folded away"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing short-lived threads...")
+
+    registry = Registry()
+    counter = registry.counter("demo_total", "Demo counter")
+    histogram = registry.histogram("demo_seconds", "Demo histogram", ("stage",), buckets=(0.1, 1.0))
+
+    def record():
+        counter.inc()
+        histogram.observe(0.5, "publish")
+
+    # Like the Pub/Sub client, which commits each batch on a new thread
+    for _ in range(500):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+    record()
+    text = registry.render()
+    shards = len(histogram._shards.all())
+
+    ok = (counter.value() == 501 and histogram.snapshot("publish") == (501, 250.5)
+          and 'demo_seconds_bucket{stage="publish",le="1.0"} 501' in text.splitlines() and shards <= 2)
+
+    if ok:
+        logger.info("✅ Short-lived threads PASSED")
+        return True
+    logger.error(f"❌ Short-lived threads FAILED: count={counter.value()}, snapshot={histogram.snapshot('publish')}, "
+                 f"shards={shards}")
+    return False
+
+def test_metrics_endpoint():
+    """Test outcome counters, stage histograms and that the health check is not counted"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing /metrics endpoint...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+
+    original_publisher = main.publisher
+    main.publisher = FakePublisherClient()
+    client = main.app.test_client()
+    sample = load_sample_data()
+
+    def count(status, outcome):
+        return main.REQUESTS.value(status, outcome)
+
+    try:
+        before = {key: count(*key) for key in [("200", "published"), ("200", "ignored"), ("403", "forbidden"),
+                                               ("400", "bad_request")]}
+        parse_before = main.STAGE_SECONDS.snapshot("parse")[0]
+        client.post("/webhook/backlog/fm?token=test-token", json=sample)
+        client.post("/webhook/backlog/fm?token=test-token", json=dict(sample, type=1))
+        client.post("/webhook/backlog/fm?token=wrong", json=sample)
+        client.post("/webhook/backlog/fm?token=test-token", data="x", content_type="text/plain")
+        total_before_health = sum(main.REQUESTS.value(*key) for key in before)
+        client.get("/")
+        response = client.get("/metrics")
+        text = response.get_data(as_text=True)
+    finally:
+        main.publisher.stop()
+        main.publisher = original_publisher
+
+    increments = {key: count(*key) - value for key, value in before.items()}
+    ok = (all(v == 1 for v in increments.values())
+          and sum(main.REQUESTS.value(*key) for key in before) == total_before_health
+          and main.STAGE_SECONDS.snapshot("parse")[0] == parse_before + 1
+          and response.status_code == 200
+          and response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+          and 'backlog_webhook_publish_seconds_count{topic="backlog-webhook-processor",result="ok"}' in text
+          and "backlog_webhook_async_queue_queued" in text)
+
+    if ok:
+        logger.info("✅ /metrics endpoint PASSED")
+        return True
+    logger.error(f"❌ /metrics endpoint FAILED: increments={increments}, status={response.status_code}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Metrics")
+
+    tests = [
+        ("Exposition Format", test_exposition_format),
+        ("Stage Timer", test_stage_timer),
+        ("Short-Lived Threads", test_short_lived_threads),
+        ("Metrics Endpoint", test_metrics_endpoint)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Metrics Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Metrics Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
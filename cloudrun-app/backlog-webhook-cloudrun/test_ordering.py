@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for ordering keys and comment edit coalescing
+Tests per-issue ordering keys, the coalescing window and that held edits keep their place in the issue order
+"""
+
+import copy
+import json
+import sys
+import os
+import logging
+import threading
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Edits reuse sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from ordering import Coalescer, message_ordering_key
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def comment_event(event_type: int, comment_id: int, text: str) -> dict:
+    """Return sample.json as a comment event on the same issue"""
+    event = copy.deepcopy(load_sample_data())
+    event["type"] = event_type
+    event["content"]["comment"]["id"] = comment_id
+    event["content"]["comment"]["content"] = text
+    return event
+
+def test_ordering_key():
+    """Test that raw payloads and extracted messages of an issue get the same key"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing ordering key derivation...")
+
+    import main
+
+    sample = load_sample_data()
+    issue_id = sample["content"]["id"]
+    keys = {
+        "payload": message_ordering_key(sample),
+        "extracted": message_ordering_key(main.extract_comment_data(sample)),
+        "issue key only": message_ordering_key({"project": {"projectKey": "GENAI"},
+                                                "content": {"key_id": 7, "summary": "s"}}),
+        "wiki": message_ordering_key({"type": 5, "content": {"id": 1, "name": "Home"}}),
+    }
+    expected = {"payload": f"issue-{issue_id}", "extracted": f"issue-{issue_id}",
+                "issue key only": "GENAI-7", "wiki": ""}
+
+    if keys == expected:
+        logger.info("✅ Ordering key derivation PASSED")
+        return True
+    logger.error(f"❌ Ordering key derivation FAILED: {keys}")
+    return False
+
+def test_coalescer():
+    """Test that repeated offers collapse into the latest item and group flushes are immediate"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing coalescer...")
+
+    flushed = []
+    done = threading.Event()
+
+    def flush(item):
+        flushed.append(item)
+        if len(flushed) == 2:
+            done.set()
+
+    coalescer = Coalescer(0.2, flush)
+    coalescer.offer("c1", "v1", "issue-1")
+    coalescer.offer("c1", "v2", "issue-1")
+    coalescer.offer("c2", "w1", "issue-2")
+    replaced = coalescer.offer("c1", "v3", "issue-1")
+    started = time.monotonic()
+    done.wait(2.0)
+    waited = time.monotonic() - started
+
+    coalescer.offer("c3", "x1", "issue-3")
+    group_flushed = coalescer.flush_group("issue-3")
+    stats = coalescer.stats()
+
+    ok = (flushed == ["v3", "w1", "x1"] and replaced == "v2" and waited < 1.0
+          and group_flushed == 1
+          and stats == {"held": 5, "superseded": 2, "flushed": 3, "pending": 0})
+
+    if ok:
+        logger.info("✅ Coalescer PASSED")
+        return True
+    logger.error(f"❌ Coalescer FAILED: flushed={flushed}, replaced={replaced}, stats={stats}")
+    return False
+
+def test_webhook_coalescing():
+    """Test end to end: edits collapse, ordering keys are set and the issue order is kept"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook coalescing with ordering keys...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from google.cloud.pubsub_v1 import types
+    from message_codec import decode_message
+
+    original = (main.publisher, main.comment_coalescer, main.PUBSUB_ORDERING_ENABLED)
+    main.publisher = FakePublisherClient(publisher_options=types.PublisherOptions(enable_message_ordering=True),
+                                         record=True)
+    main.comment_coalescer = Coalescer(0.3, main.publish_coalesced)
+    main.PUBSUB_ORDERING_ENABLED = True
+    client = main.app.test_client()
+
+    def post(event):
+        response = client.post("/webhook/backlog/fm?token=test-token", json=event)
+        return response.status_code, response.get_json()
+
+    try:
+        statuses = [post(comment_event(3, 100, "create"))[0]]
+        held = post(comment_event(4, 100, "edit 1"))
+        statuses.append(held[0])
+        statuses.append(post(comment_event(4, 100, "edit 2"))[0])
+        time.sleep(0.6)
+        # A held edit is published before a later event of the same issue
+        statuses.append(post(comment_event(4, 100, "edit 3"))[0])
+        statuses.append(post(comment_event(3, 101, "second comment"))[0])
+        stats = main.comment_coalescer.stats()
+        main.publisher.stop()
+        messages = main.publisher.messages
+    finally:
+        main.publisher, main.comment_coalescer, main.PUBSUB_ORDERING_ENABLED = original
+
+    texts = [decode_message(m["data"], m["attributes"])["content"]["comment"]["content"] for m in messages]
+    keys = {m["ordering_key"] for m in messages}
+    issue_key = f"issue-{load_sample_data()['content']['id']}"
+    ok = (statuses == [200, 202, 202, 202, 200]
+          and held[1]["mode"] == "coalesce"
+          and texts == ["create", "edit 2", "edit 3", "second comment"]
+          and keys == {issue_key}
+          and stats["superseded"] == 1)
+
+    if ok:
+        logger.info("✅ Webhook coalescing PASSED")
+        return True
+    logger.error(f"❌ Webhook coalescing FAILED: statuses={statuses}, texts={texts}, keys={keys}, stats={stats}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Ordering and Coalescing")
+
+    tests = [
+        ("Ordering Key Derivation", test_ordering_key),
+        ("Coalescer", test_coalescer),
+        ("Webhook Coalescing", test_webhook_coalescing)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Ordering Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Ordering Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the durable outbox
+Tests draining order, retry after failures, recovery after a restart and the size limit
+"""
+
+import json
+import sys
+import os
+import logging
+import tempfile
+import time
+from concurrent.futures import Future
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from outbox import SQLiteOutbox, OutboxFull
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def resolved(message_id=None, error=None) -> Future:
+    """Return a future that is already done, like a publish that completed at once"""
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(message_id)
+    return future
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Poll condition until it holds or the timeout passes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+def records(count: int, start: int = 0) -> list:
+    """Build outbox records carrying their position as the message"""
+    return [("rule", "topic", {"n": n}, f"key-{n}") for n in range(start, start + count)]
+
+def test_drain_in_order():
+    """Test that spooled messages are published in append order and removed"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing drain order...")
+
+    published, callbacks = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = SQLiteOutbox(
+            os.path.join(tmp, "outbox.db"),
+            publish=lambda record: (published.append(record.message["n"]), resolved(str(record.seq)))[1],
+            on_published=lambda record, message_id: callbacks.append((record.dedup_key, message_id))
+        )
+        for start in range(0, 30, 10):
+            outbox.append(records(10, start))
+        drained = wait_until(lambda: outbox.stats()["depth"] == 0)
+        stats = outbox.stats()
+        outbox.close()
+
+    if drained and published == list(range(30)) and len(callbacks) == 30 and stats["drained"] == 30 \
+            and stats["bytes"] == 0 and callbacks[0] == ("key-0", "1"):
+        logger.info(f"✅ Drain order PASSED: {stats}")
+        return True
+    logger.error(f"❌ Drain order FAILED: published={published[:10]}..., stats={stats}")
+    return False
+
+def test_retry_after_failure():
+    """Test that failed publishes are retried before newer messages are confirmed"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing retry after publish failures...")
+
+    def run(failing: int, times: int):
+        attempts, confirmed = [], []
+        failures = {"remaining": times}
+
+        def flaky_publish(record):
+            attempts.append(record.message["n"])
+            if record.message["n"] == failing and failures["remaining"]:
+                failures["remaining"] -= 1
+                return resolved(error=RuntimeError("Pub/Sub unavailable"))
+            return resolved(str(record.seq))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            outbox = SQLiteOutbox(os.path.join(tmp, "outbox.db"), publish=flaky_publish,
+                                  on_published=lambda record, message_id: confirmed.append(record.message["n"]),
+                                  retry_interval=0.01, max_retry_interval=0.05)
+            outbox.append(records(3))
+            drained = wait_until(lambda: outbox.stats()["depth"] == 0)
+            stats = outbox.stats()
+            outbox.close()
+        return drained, attempts, confirmed, stats
+
+    # Each retry starts again from the oldest message that is still pending; rows published
+    # after a failure in their batch are published again rather than confirmed out of order
+    first = run(failing=0, times=3)
+    middle = run(failing=1, times=1)
+    if (first[0] and first[1] == [0, 1, 2] * 4 and first[2] == [0, 1, 2] and first[3]["publish_errors"] == 3
+            and middle[0] and middle[1] == [0, 1, 2, 1, 2] and middle[2] == [0, 1, 2]
+            and middle[3]["publish_errors"] == 1 and middle[3]["drained"] == 3):
+        logger.info("✅ Retry after failure PASSED")
+        return True
+    logger.error(f"❌ Retry after failure FAILED: first={first}, middle={middle}")
+    return False
+
+def test_resume_after_restart():
+    """Test that messages spooled before a restart are drained by the next process"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing recovery after restart...")
+
+    published = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "outbox.db")
+        down = SQLiteOutbox(path, publish=lambda record: resolved(error=RuntimeError("down")),
+                            retry_interval=10)
+        down.append(records(5))
+        wait_until(lambda: down.stats()["publish_errors"] > 0)
+        down.close()
+
+        restarted = SQLiteOutbox(path, publish=lambda record: (published.append(record.message["n"]),
+                                                               resolved(str(record.seq)))[1])
+        depth_on_open = restarted.stats()["depth"]
+        restarted.start()
+        drained = wait_until(lambda: restarted.stats()["depth"] == 0)
+        restarted.close()
+
+    if depth_on_open == 5 and drained and published == list(range(5)):
+        logger.info("✅ Resume after restart PASSED")
+        return True
+    logger.error(f"❌ Resume after restart FAILED: depth_on_open={depth_on_open}, published={published}")
+    return False
+
+def test_size_limit():
+    """Test that appends beyond max_bytes are rejected"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing outbox size limit...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = SQLiteOutbox(os.path.join(tmp, "outbox.db"),
+                              publish=lambda record: resolved(error=RuntimeError("down")),
+                              max_bytes=100, retry_interval=10)
+        outbox.append([("rule", "topic", {"text": "x" * 40}, None)])
+        try:
+            outbox.append([("rule", "topic", {"text": "x" * 80}, None)])
+            rejected = False
+        except OutboxFull:
+            rejected = True
+        stats = outbox.stats()
+        outbox.close()
+
+    if rejected and stats["depth"] == 1 and stats["rejected"] == 1:
+        logger.info("✅ Size limit PASSED")
+        return True
+    logger.error(f"❌ Size limit FAILED: stats={stats}")
+    return False
+
+def test_webhook_outbox_modes():
+    """Test PUBLISH_MODE=outbox and the sync-mode fallback through the Flask app"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook outbox modes...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+
+    class FailingPublisher:
+        def publish(self, topic, data, **attrs):
+            return resolved(error=RuntimeError("Pub/Sub unavailable"))
+
+    saved = (main.PUBLISH_MODE, main.OUTBOX_FALLBACK, main.publisher, main.outbox)
+    client = main.app.test_client()
+    statuses = []
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            main.outbox = None
+            main.OUTBOX_PATH = os.path.join(tmp, "outbox.db")
+
+            main.PUBLISH_MODE, main.publisher = "outbox", FakePublisherClient(record=True)
+            response = client.post("/webhook/backlog/fm?token=test-token", json=load_sample_data())
+            statuses.append((response.status_code, response.get_json().get("mode")))
+            wait_until(lambda: len(main.publisher.messages) == 1)
+            outbox_published = len(main.publisher.messages)
+            main.publisher.stop()
+
+            main.PUBLISH_MODE, main.OUTBOX_FALLBACK, main.publisher = "sync", True, FailingPublisher()
+            response = client.post("/webhook/backlog/fm?token=test-token", json=load_sample_data())
+            statuses.append((response.status_code, response.get_json().get("mode")))
+            depth = main.outbox.stats()["depth"]
+
+            main.OUTBOX_FALLBACK = False
+            response = client.post("/webhook/backlog/fm?token=test-token", json=load_sample_data())
+            statuses.append((response.status_code, None))
+        finally:
+            if main.outbox is not None:
+                main.outbox.close()
+            main.PUBLISH_MODE, main.OUTBOX_FALLBACK, main.publisher, main.outbox = saved
+
+    if statuses == [(202, "outbox"), (202, "outbox"), (500, None)] and outbox_published == 1 and depth >= 1:
+        logger.info("✅ Webhook outbox modes PASSED")
+        return True
+    logger.error(f"❌ Webhook outbox modes FAILED: statuses={statuses}, published={outbox_published}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for the Outbox")
+
+    tests = [
+        ("Drain Order", test_drain_in_order),
+        ("Retry After Failure", test_retry_after_failure),
+        ("Resume After Restart", test_resume_after_restart),
+        ("Size Limit", test_size_limit),
+        ("Webhook Outbox Modes", test_webhook_outbox_modes)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Outbox Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Outbox Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for size-bounded payload parsing
+Tests the event-type pre-scan, body size limits and decoder selection
+"""
+
+import io
+import json
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from payload_parser import PayloadTooLarge, get_decoder, read_limited, may_match_event_types, orjson
+
+COMMENT_EVENT_TYPES = (3, 4)
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_bytes():
+    """Load sample webhook data as raw bytes"""
+    with open('sample.json', 'rb') as f:
+        return f.read()
+
+def test_prescan_decisions():
+    """Test that the pre-scan never rejects a comment and rejects plain non-comments"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing event type pre-scan...")
+
+    sample = json.loads(load_sample_bytes())
+    cases = [
+        ("sample comment", load_sample_bytes(), True),
+        ("compact comment", json.dumps(dict(sample, type=4), separators=(",", ":")).encode(), True),
+        ("issue created", json.dumps(dict(sample, type=1)).encode(), False),
+        ("string type", b'{"type": "3"}', False),
+        ("missing type", b'{"content": {}}', False),
+        # Nested members may cause a full parse but are still filtered by the event router
+        ("nested match", b'{"type": 1, "content": {"type": 3}}', True),
+    ]
+
+    all_ok = True
+    for name, raw, expected in cases:
+        result = may_match_event_types(raw, COMMENT_EVENT_TYPES)
+        if result != expected:
+            logger.error(f"   {name}: expected {expected}, got {result}")
+            all_ok = False
+
+    if all_ok:
+        logger.info("✅ Pre-scan PASSED")
+    else:
+        logger.error("❌ Pre-scan FAILED")
+    return all_ok
+
+def test_size_limit():
+    """Test that oversized bodies are rejected from the header or while reading"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing body size limit...")
+
+    ok_body = read_limited(io.BytesIO(b"x" * 10), 10, 10)
+    rejected = []
+    for stream, content_length in ((io.BytesIO(b""), 11), (io.BytesIO(b"x" * 11), None)):
+        try:
+            read_limited(stream, 10, content_length)
+            rejected.append(False)
+        except PayloadTooLarge:
+            rejected.append(True)
+
+    if ok_body == b"x" * 10 and rejected == [True, True]:
+        logger.info("✅ Size limit PASSED")
+        return True
+    logger.error(f"❌ Size limit FAILED: rejected={rejected}")
+    return False
+
+def test_decoders_agree():
+    """Test that every available decoder produces the same document"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing decoder selection...")
+
+    raw = load_sample_bytes()
+    names = ["json", "auto"] + (["orjson"] if orjson is not None else [])
+    decoded = [get_decoder(name)(raw) for name in names]
+
+    if all(d == decoded[0] for d in decoded):
+        logger.info(f"✅ Decoders PASSED: {', '.join(names)}")
+        return True
+    logger.error("❌ Decoders FAILED: results differ")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Payload Parsing")
+
+    tests = [
+        ("Event Type Pre-scan", test_prescan_decisions),
+        ("Body Size Limit", test_size_limit),
+        ("Decoder Selection", test_decoders_agree)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Payload Parsing Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Payload Parsing Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
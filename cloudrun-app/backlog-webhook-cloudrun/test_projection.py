@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for compiled field projections
+Tests that the default projection reproduces the previous comment extractor, the spec features and per-consumer projections
+"""
+
+import copy
+import json
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+
+from bench_projection import SLIM_PROJECTION, legacy_extract_comment_data
+from projection import compile_projection, compile_projections, load_projections
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def payload_variants() -> dict:
+    """sample.json and variations of the fields the comment extractor reads"""
+    sample = load_sample_data()
+    variants = {"sample": sample}
+
+    nested_issue = copy.deepcopy(sample)
+    nested_issue["content"] = {"comment": sample["content"]["comment"],
+                               "issue": {"id": 5, "issueKey": "GENAI-5", "summary": "nested"}}
+    variants["issue under content.issue"] = nested_issue
+
+    no_summary = copy.deepcopy(sample)
+    del no_summary["content"]["summary"]
+    variants["content without summary"] = no_summary
+
+    null_issue = copy.deepcopy(nested_issue)
+    null_issue["content"]["issue"] = None
+    variants["null issue"] = null_issue
+
+    no_text = copy.deepcopy(sample)
+    del no_text["content"]["comment"]["content"]
+    no_text["content"]["comment"]["updated"] = "2025-08-12T08:00:00Z"
+    variants["comment without text"] = no_text
+
+    no_project = copy.deepcopy(sample)
+    del no_project["project"]
+    del no_project["created"]
+    variants["no project"] = no_project
+    return variants
+
+def test_default_projection():
+    """Test that the compiled default projection returns what the hand-written extractor returned"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing default projection against the previous extractor...")
+
+    import main
+
+    mismatches = [name for name, payload in payload_variants().items()
+                  if main.extract_comment_data(payload) != legacy_extract_comment_data(payload)]
+
+    # Fields that are null instead of objects take the checked path instead of failing
+    null_comment = load_sample_data()
+    null_comment["content"]["comment"] = None
+    checked = main.project_comment(null_comment)
+
+    ok = (not mismatches
+          and checked["content"]["comment"]["id"] is None and checked["content"]["comment"]["content"] == ""
+          and checked["content"]["issue"]["summary"] == null_comment["content"]["summary"])
+
+    if ok:
+        logger.info("✅ Default projection PASSED")
+        return True
+    logger.error(f"❌ Default projection FAILED: mismatches={mismatches}, checked={checked}")
+    return False
+
+def test_spec_features():
+    """Test alternative paths, defaults, $root without $optional and spec validation"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing projection spec features...")
+
+    extract = compile_projection({
+        "key": ["content.issueKey", "content.issue.issueKey", "project.projectKey"],
+        "labels": {"$path": "content.labels", "$default": []},
+        "status": {"$path": "content.status.name", "$default": "unknown"},
+        "issue": {"$root": "content.issue", "id": "id", "status": "status.name"}
+    }, "features")
+    first = extract({"content": {"issue": {"issueKey": "A-1", "id": 1, "status": {"name": "Open"}}}})
+    second = extract({"project": {"projectKey": "B"}, "content": {"status": None}})
+    first["labels"].append("mutated")
+    third = extract({})
+
+    invalid = [
+        {"a": "content..id"},
+        {"a": 3},
+        {"a": {"$path": "x", "$fallback": 1}},
+        {"a": {"$optional": True, "b": "x"}},
+        {"a": {"$root": [{"path": "x", "when": 1}], "b": "y"}},
+        {"$path": "x"},
+        {"a": {"$path": []}},
+    ]
+    rejected = 0
+    for spec in invalid:
+        try:
+            compile_projection(spec, "invalid")
+        except ValueError:
+            rejected += 1
+
+    ok = (first == {"key": "A-1", "labels": ["mutated"], "status": "unknown",
+                    "issue": {"id": 1, "status": "Open"}}
+          and second == {"key": "B", "labels": [], "status": "unknown", "issue": {"id": None, "status": None}}
+          and third["labels"] == [] and third["key"] is None
+          and rejected == len(invalid))
+
+    if ok:
+        logger.info("✅ Projection spec features PASSED")
+        return True
+    logger.error(f"❌ Projection spec features FAILED: first={first}, second={second}, third={third}, "
+                 f"rejected={rejected}")
+    return False
+
+def test_consumer_projection():
+    """Test that a projection from EVENT_PROJECTIONS can be used by a route and yields smaller messages"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing per-consumer projection...")
+
+    import main
+    from event_router import EventRouter
+
+    specs = load_projections({"EVENT_PROJECTIONS": json.dumps({"comment-slim": SLIM_PROJECTION})})
+    router = EventRouter(
+        [{"name": "slim", "types": [3], "extractor": "comment-slim", "topic": "slim-topic"}],
+        default_topic="default",
+        extractors=compile_projections(specs)
+    )
+    sample = load_sample_data()
+    routed = router.route(sample)
+    message = routed[0].message
+    slim_size = len(json.dumps(message))
+    default_size = len(json.dumps(main.extract_comment_data(sample)))
+
+    ok = (load_projections({}) is None
+          and message == {
+              "commentId": sample["content"]["comment"]["id"],
+              "text": sample["content"]["comment"]["content"],
+              "issue": {"id": sample["content"]["id"], "summary": sample["content"]["summary"],
+                        "status": sample["content"]["status"]["name"],
+                        "assignee": sample["content"]["assignee"]["name"]},
+              "projectKey": "GENAI",
+              "user": {"id": sample["createdUser"]["id"], "name": sample["createdUser"]["name"]}}
+          and slim_size < default_size / 2)
+
+    if ok:
+        logger.info(f"✅ Per-consumer projection PASSED ({slim_size} vs {default_size} bytes)")
+        return True
+    logger.error(f"❌ Per-consumer projection FAILED: message={message}, sizes={slim_size}/{default_size}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Projections")
+
+    tests = [
+        ("Default Projection", test_default_projection),
+        ("Projection Spec Features", test_spec_features),
+        ("Per-Consumer Projection", test_consumer_projection)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Projection Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Projection Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
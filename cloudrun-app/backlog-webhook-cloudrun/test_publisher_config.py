@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for Pub/Sub batching and flow control settings
+Tests environment parsing and the fake publisher used by the benchmarks
+"""
+
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher.exceptions import FlowControlLimitError
+from fake_pubsub import FakePublisherClient
+from publisher_config import load_publisher_settings
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def test_defaults_match_library():
+    """Test that an empty environment keeps the client library defaults"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing default settings...")
+
+    batch_settings, publisher_options = load_publisher_settings({})
+
+    if (batch_settings == types.BatchSettings() and publisher_options.flow_control == types.PublishFlowControl()
+            and not publisher_options.enable_message_ordering):
+        logger.info("✅ Default settings PASSED")
+        return True
+    logger.error(f"❌ Default settings FAILED: {batch_settings}, {publisher_options}")
+    return False
+
+def test_environment_overrides():
+    """Test that every variable is applied"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing environment overrides...")
+
+    batch_settings, publisher_options = load_publisher_settings({
+        "PUBSUB_BATCH_MAX_MESSAGES": "50",
+        "PUBSUB_BATCH_MAX_BYTES": "2048",
+        "PUBSUB_BATCH_MAX_LATENCY": "0.05",
+        "PUBSUB_FLOW_MAX_MESSAGES": "10",
+        "PUBSUB_FLOW_MAX_BYTES": "4096",
+        "PUBSUB_FLOW_LIMIT_BEHAVIOR": "BLOCK",
+        "PUBSUB_ORDERING_ENABLED": "true"
+    })
+    flow = publisher_options.flow_control
+
+    if (batch_settings == types.BatchSettings(max_bytes=2048, max_latency=0.05, max_messages=50)
+            and flow.message_limit == 10 and flow.byte_limit == 4096
+            and flow.limit_exceeded_behavior == types.LimitExceededBehavior.BLOCK
+            and publisher_options.enable_message_ordering):
+        logger.info("✅ Environment overrides PASSED")
+        return True
+    logger.error(f"❌ Environment overrides FAILED: {batch_settings}, {flow}")
+    return False
+
+def test_fake_publisher_batches():
+    """Test that the fake publisher groups messages into batches"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing fake publisher batching...")
+
+    batch_settings, publisher_options = load_publisher_settings({
+        "PUBSUB_BATCH_MAX_MESSAGES": "10",
+        "PUBSUB_BATCH_MAX_LATENCY": "10"
+    })
+    publisher = FakePublisherClient(batch_settings, publisher_options)
+    futures = [publisher.publish("topic", b"{}") for _ in range(25)]
+    publisher.stop()
+    message_ids = {f.result(timeout=1) for f in futures}
+
+    # Two full batches of ten, the remaining five flushed by stop()
+    if publisher.rpc_count == 3 and len(message_ids) == 25:
+        logger.info("✅ Fake publisher batching PASSED")
+        return True
+    logger.error(f"❌ Fake publisher batching FAILED: rpcs={publisher.rpc_count}, ids={len(message_ids)}")
+    return False
+
+def test_fake_publisher_flow_error():
+    """Test that the error behaviour rejects messages over the limit"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing fake publisher flow control...")
+
+    batch_settings, publisher_options = load_publisher_settings({
+        "PUBSUB_BATCH_MAX_LATENCY": "10",
+        "PUBSUB_FLOW_MAX_MESSAGES": "2",
+        "PUBSUB_FLOW_LIMIT_BEHAVIOR": "error"
+    })
+    publisher = FakePublisherClient(batch_settings, publisher_options)
+    publisher.publish("topic", b"{}")
+    publisher.publish("topic", b"{}")
+    try:
+        publisher.publish("topic", b"{}")
+    except FlowControlLimitError:
+        publisher.stop()
+        logger.info("✅ Fake publisher flow control PASSED")
+        return True
+    publisher.stop()
+    logger.error("❌ Fake publisher flow control FAILED: third message accepted")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Publisher Settings")
+
+    tests = [
+        ("Default Settings", test_defaults_match_library),
+        ("Environment Overrides", test_environment_overrides),
+        ("Fake Publisher Batching", test_fake_publisher_batches),
+        ("Fake Publisher Flow Control", test_fake_publisher_flow_error)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Publisher Settings Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Publisher Settings Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
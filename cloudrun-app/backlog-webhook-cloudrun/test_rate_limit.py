@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for per-project and per-user rate limits
+Tests the token buckets, the Redis-backed shared limit and rejecting or diverting events over a limit
+"""
+
+import copy
+import json
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from fake_redis import FakeRedis
+from rate_limit import (EventRateLimiter, RedisRateLimiter, TokenBucketLimiter, create_event_rate_limiter,
+                        parse_limit_spec)
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket():
+    """Test burst, refill, per-key overrides, LRU eviction and spec parsing"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing token buckets...")
+
+    clock = FakeClock()
+    default, overrides = parse_limit_spec("1/3, GENAI=10/5")
+    limiter = TokenBucketLimiter(default, overrides, max_keys=2, clock=clock)
+
+    burst = [limiter.acquire("P1") for _ in range(4)]
+    clock.now += 1.0
+    refilled = [limiter.acquire("P1") for _ in range(2)]
+    override = sum(limiter.acquire("GENAI") == 0 for _ in range(6))
+    limiter.acquire("P2")
+    stats = limiter.stats()
+
+    invalid = 0
+    for spec in ("1", "0/5", "1/0.5", "GENAI=x/1"):
+        try:
+            parse_limit_spec(spec)
+        except ValueError:
+            invalid += 1
+
+    ok = (burst[:3] == [0, 0, 0] and abs(burst[3] - 1.0) < 1e-9
+          and refilled[0] == 0 and refilled[1] > 0
+          and override == 5
+          and stats["keys"] == 2 and stats["evictions"] == 1
+          and invalid == 4 and parse_limit_spec("") == (None, {}))
+
+    if ok:
+        logger.info("✅ Token buckets PASSED")
+        return True
+    logger.error(f"❌ Token buckets FAILED: burst={burst}, refilled={refilled}, override={override}, "
+                 f"stats={stats}, invalid={invalid}")
+    return False
+
+def test_shared_limit():
+    """Test that instances sharing Redis enforce one limit and that Redis errors fail open"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing shared Redis limit...")
+
+    class BrokenRedis:
+        def incr(self, key):
+            raise ConnectionError("redis down")
+
+    clock = FakeClock()
+    redis = FakeRedis()
+    instances = [EventRateLimiter({"user": RedisRateLimiter(redis, (1.0, 4), clock=clock)}) for _ in range(2)]
+    event = {"createdUser": {"id": 7}}
+    allowed = sum(instances[i % 2].check(event) is None for i in range(10))
+    other_user = instances[0].check({"createdUser": {"id": 8}})
+    clock.now += 4.0
+    next_window = instances[1].check(event)
+
+    broken = RedisRateLimiter(BrokenRedis(), (1.0, 1))
+    fail_open = [broken.acquire("k") for _ in range(3)]
+
+    ok = (allowed == 4 and other_user is None and next_window is None
+          and fail_open == [0, 0, 0] and broken.stats()["errors"] == 3)
+
+    if ok:
+        logger.info("✅ Shared Redis limit PASSED")
+        return True
+    logger.error(f"❌ Shared Redis limit FAILED: allowed={allowed}, other_user={other_user}, "
+                 f"next_window={next_window}, fail_open={fail_open}")
+    return False
+
+def test_refund_on_rejection():
+    """Test that an event rejected by the user limit does not use up the project budget"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing refund on rejection...")
+
+    def run(make_limiter):
+        limiter = EventRateLimiter({"project": make_limiter((0.001, 3)), "user": make_limiter((0.001, 1))})
+        event = lambda user: {"project": {"projectKey": "GENAI"}, "createdUser": {"id": user}}
+        results = [limiter.check(event(7)) for _ in range(5)]
+        results += [limiter.check(event(user)) for user in (8, 9, 10)]
+        return [result[0] if result else None for result in results], limiter.stats()
+
+    clock = FakeClock()
+    redis = FakeRedis()
+    memory, memory_stats = run(lambda limit: TokenBucketLimiter(limit, clock=clock))
+    shared, shared_stats = run(lambda limit: RedisRateLimiter(redis, limit, clock=clock))
+
+    # User 7 gets one event; its rejected ones leave the project two tokens for users 8 and 9
+    expected = [None] + ["user"] * 4 + [None, None, "project"]
+    ok = (memory == expected and shared == expected
+          and memory_stats["project_allowed"] == 3 and shared_stats["project_allowed"] == 3)
+
+    if ok:
+        logger.info("✅ Refund on rejection PASSED")
+        return True
+    logger.error(f"❌ Refund on rejection FAILED: memory={memory} {memory_stats}, redis={shared} {shared_stats}")
+    return False
+
+def test_webhook_limits():
+    """Test 429 with Retry-After in reject mode and the low-priority topic in divert mode"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook rate limits...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from test_asgi import call_asgi
+
+    original = (main.publisher, main.event_rate_limiter, main.RATE_LIMIT_ACTION, main.RATE_LIMIT_DIVERT_TOPIC)
+    main.publisher = FakePublisherClient(record=True)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    other_user = copy.deepcopy(sample)
+    other_user["createdUser"]["id"] = 999
+
+    def post(event=sample):
+        return client.post("/webhook/backlog/fm?token=test-token", json=event)
+
+    try:
+        main.event_rate_limiter = create_event_rate_limiter("", "0.01/2")
+        rejected = [post().status_code for _ in range(3)]
+        limited = post()
+        asgi_limited = call_asgi("POST", "/webhook/backlog/fm", b"token=test-token", json.dumps(sample).encode())
+        other = post(other_user).status_code
+        metrics_text = client.get("/metrics").get_data(as_text=True)
+
+        main.event_rate_limiter = create_event_rate_limiter("GENAI=0.01/1", "")
+        main.RATE_LIMIT_ACTION, main.RATE_LIMIT_DIVERT_TOPIC = "divert", "backlog-low-priority"
+        diverted = [post().get_json()["message_id"] is not None for _ in range(2)]
+        main.publisher.stop()
+        topics = [m["topic"].rsplit("/", 1)[-1] for m in main.publisher.messages]
+    finally:
+        (main.publisher, main.event_rate_limiter, main.RATE_LIMIT_ACTION,
+         main.RATE_LIMIT_DIVERT_TOPIC) = original
+
+    ok = (rejected == [200, 200, 429]
+          and limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+          and limited.get_json()["limit"] == "user"
+          and asgi_limited[0] == 429 and asgi_limited[1]["reason"] == "rate_limited"
+          and other == 200
+          and 'backlog_webhook_rate_limited_total{dimension="user",action="reject"} 3' in metrics_text
+          and 'backlog_webhook_requests_total{status="429",outcome="rate_limited"}' in metrics_text
+          and diverted == [True, True]
+          and topics[-2:] == [main.PUBSUB_TOPIC, "backlog-low-priority"])
+
+    if ok:
+        logger.info("✅ Webhook rate limits PASSED")
+        return True
+    logger.error(f"❌ Webhook rate limits FAILED: rejected={rejected}, limited={limited.status_code} "
+                 f"{dict(limited.headers)}, asgi={asgi_limited}, other={other}, diverted={diverted}, topics={topics}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Rate Limits")
+
+    tests = [
+        ("Token Buckets", test_token_bucket),
+        ("Shared Redis Limit", test_shared_limit),
+        ("Refund on Rejection", test_refund_on_rejection),
+        ("Webhook Rate Limits", test_webhook_limits)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Rate Limit Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Rate Limit Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the replay CLI
+Tests streaming NDJSON and JSON array files, dry runs, rate-capped publishing and resuming from a checkpoint
+"""
+
+import copy
+import io
+import json
+import sys
+import os
+import logging
+import tempfile
+import time
+from concurrent.futures import Future
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+
+from replay import iter_events, iter_json_array, load_checkpoint, replay
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def build_events(count: int) -> list:
+    """Comment events with distinct comment IDs; every third one is an issue update"""
+    sample = load_sample_data()
+    events = []
+    for index in range(count):
+        event = copy.deepcopy(sample)
+        event["id"] = index
+        event["content"]["comment"]["id"] = index
+        if index % 3 == 2:
+            event["type"] = 2
+        events.append(event)
+    return events
+
+def write_ndjson(path: str, lines: list) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def test_streaming_readers():
+    """Test the JSON array reader across chunk boundaries and format detection"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing streaming readers...")
+
+    events = build_events(5)
+    text = json.dumps([1, -2.5e-3, True, None, "あ", events[0]], ensure_ascii=False)
+    chunked = [list(iter_json_array(io.BytesIO(text.encode()), chunk_bytes)) for chunk_bytes in (1, 3, 64, 1 << 20)]
+
+    errors = 0
+    for bad in (b'{"type": 3}', b"[1 2]", b'[{"type": 3}'):
+        try:
+            list(iter_json_array(io.BytesIO(bad), 4))
+        except ValueError:
+            errors += 1
+
+    as_array = list(iter_events(io.BufferedReader(io.BytesIO(b"\xef\xbb\xbf\n [" + json.dumps(events).encode()[1:]))))
+    as_ndjson = list(iter_events(io.BufferedReader(io.BytesIO(b"\n".join(json.dumps(e).encode() for e in events)
+                                                             + b"\n\n"))))
+
+    ok = (all(result == json.loads(text) for result in chunked) and errors == 3
+          and as_array == events and len(as_ndjson) == 5 and [json.loads(line) for line in as_ndjson] == events)
+
+    if ok:
+        logger.info("✅ Streaming readers PASSED")
+        return True
+    logger.error(f"❌ Streaming readers FAILED: chunked={chunked}, errors={errors}, array={len(as_array)}, "
+                 f"ndjson={len(as_ndjson)}")
+    return False
+
+def test_dry_run():
+    """Test that a dry run writes the routed messages, alike for both formats and pool sizes"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing dry run...")
+
+    events = build_events(30)
+    with tempfile.TemporaryDirectory() as root:
+        ndjson_path = os.path.join(root, "events.ndjson")
+        array_path = os.path.join(root, "events.json")
+        write_ndjson(ndjson_path, [json.dumps(e, ensure_ascii=False) for e in events] + ["{not json", "[1]"])
+        with open(array_path, "w", encoding="utf-8") as f:
+            json.dump(events, f, ensure_ascii=False, indent=2)
+
+        outputs = []
+        summaries = []
+        for path, workers in ((ndjson_path, 1), (ndjson_path, 2), (array_path, 1)):
+            output = os.path.join(root, f"out-{len(outputs)}.ndjson")
+            summaries.append(replay(path, workers=workers, chunk_size=4, dry_run=output))
+            with open(output, encoding="utf-8") as f:
+                outputs.append([json.loads(line) for line in f])
+
+    first = outputs[0]
+    ok = (len(first) == 20 and first[0]["index"] == 0 and first[0]["rule"] == "comment"
+          and first[0]["message"]["content"]["comment"]["id"] == 0
+          and first[0]["attributes"]["event_created"] == events[0]["created"]
+          and all(entry["message"]["content"]["comment"]["id"] == entry["index"] for entry in first)
+          and outputs[1] == first and outputs[2] == first
+          and summaries[0]["events"] == 32 and summaries[0]["written"] == 20
+          and summaries[0]["ignored"] == 10 and summaries[0]["invalid"] == 2 and summaries[0]["published"] == 0
+          and summaries[2]["invalid"] == 0)
+
+    if ok:
+        logger.info("✅ Dry run PASSED")
+        return True
+    logger.error(f"❌ Dry run FAILED: summaries={summaries}, lengths={[len(o) for o in outputs]}")
+    return False
+
+def test_publish_and_resume():
+    """Test the rate cap, that a failed publish stops the checkpoint, and resuming from it"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing publish and resume...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+
+    class FailingComment(FakePublisherClient):
+        """Fails the message of one comment"""
+        def publish(self, topic, data, ordering_key="", **attrs):
+            if json.loads(data)["content"]["comment"]["id"] == 10:
+                future = Future()
+                future.set_exception(RuntimeError("deadline exceeded"))
+                return future
+            return super().publish(topic, data, ordering_key, **attrs)
+
+    events = build_events(45)
+    original = main.publisher
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "events.ndjson")
+        checkpoint = os.path.join(root, "replay.ckpt")
+        write_ndjson(path, [json.dumps(e, ensure_ascii=False) for e in events])
+        try:
+            main.publisher = FailingComment(record=True)
+            started = time.perf_counter()
+            failed = replay(path, rate=20, checkpoint=checkpoint, checkpoint_every=7)
+            elapsed = time.perf_counter() - started
+            main.publisher.stop()
+            first_ids = [json.loads(m["data"])["content"]["comment"]["id"] for m in main.publisher.messages]
+            position = load_checkpoint(checkpoint, os.path.abspath(path))
+
+            main.publisher = FakePublisherClient(record=True)
+            resumed = replay(path, checkpoint=checkpoint, resume=True)
+            main.publisher.stop()
+            resumed_ids = [json.loads(m["data"])["content"]["comment"]["id"] for m in main.publisher.messages]
+            finished = load_checkpoint(checkpoint, os.path.abspath(path))
+            try:
+                load_checkpoint(checkpoint, "/elsewhere/events.ndjson")
+                mismatch = False
+            except ValueError:
+                mismatch = True
+        finally:
+            main.publisher = original
+
+    # 30 comment messages at 20/s with a burst of 20: the last 10 wait about half a second
+    ok = (failed["messages"] == 30 and failed["published"] == 29 and failed["failed"] == 1
+          and elapsed >= 0.4 and failed["next_index"] == 10 and position == 10
+          and 10 not in first_ids and len(first_ids) == 29
+          and resumed["events"] == 35 and resumed_ids == [i for i in range(10, 45) if i % 3 != 2]
+          and resumed["failed"] == 0 and finished == 45 and mismatch)
+
+    if ok:
+        logger.info("✅ Publish and resume PASSED")
+        return True
+    logger.error(f"❌ Publish and resume FAILED: failed={failed}, elapsed={elapsed:.2f}, position={position}, "
+                 f"resumed={resumed}, resumed_ids={resumed_ids}, finished={finished}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Replay")
+
+    tests = [
+        ("Streaming Readers", test_streaming_readers),
+        ("Dry Run", test_dry_run),
+        ("Publish and Resume", test_publish_and_resume)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Replay Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Replay Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the Secret Manager token cache
+Tests caching, background refresh and stale fallback with a fake loader
+"""
+
+import sys
+import os
+import time
+import logging
+
+# Add the current directory to the path to import secret_cache
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from secret_cache import SecretCache
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+class FakeLoader:
+    """Loader that counts calls and can be switched to fail"""
+    def __init__(self, values):
+        self.values = values
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("Secret Manager unavailable")
+        return self.values
+
+def test_cache_hit_and_miss():
+    """Test that repeated reads are served from memory"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing cache hits and misses...")
+
+    loader = FakeLoader(("token-a",))
+    cache = SecretCache(loader, ttl=60, refresh_ahead=1)
+
+    for _ in range(5):
+        cache.get()
+
+    stats = cache.stats()
+    if loader.calls == 1 and stats["misses"] == 1 and stats["hits"] == 4:
+        logger.info("✅ Cache hit/miss PASSED")
+        return True
+    logger.error(f"❌ Cache hit/miss FAILED: calls={loader.calls}, stats={stats}")
+    return False
+
+def test_background_refresh():
+    """Test that a read inside the refresh window reloads in the background"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing background refresh...")
+
+    loader = FakeLoader(("token-a",))
+    cache = SecretCache(loader, ttl=1.0, refresh_ahead=0.8)
+    cache.get()
+
+    loader.values = ("token-b", "token-a")
+    time.sleep(0.3)
+    # Still fresh, so the old value is returned while the refresh runs
+    first = cache.get()
+    time.sleep(0.1)
+    second = cache.get()
+
+    if first == ("token-a",) and second == ("token-b", "token-a") and loader.calls == 2:
+        logger.info("✅ Background refresh PASSED")
+        return True
+    logger.error(f"❌ Background refresh FAILED: first={first}, second={second}, calls={loader.calls}")
+    return False
+
+def test_refresh_failure_backoff():
+    """Test that a failed background refresh waits retry_interval instead of retrying on every read"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing background refresh backoff...")
+
+    loader = FakeLoader(("token-a",))
+    # The whole TTL is the refresh window, so every read could start a refresh
+    cache = SecretCache(loader, ttl=2.0, refresh_ahead=2.0, retry_interval=0.5)
+    cache.get()
+    loader.fail = True
+
+    reads = []
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        reads.append(cache.get())
+        time.sleep(0.005)
+    within_backoff = loader.calls
+    time.sleep(0.3)
+    cache.get()
+    time.sleep(0.05)
+    after_backoff = loader.calls
+
+    if within_backoff == 2 and after_backoff == 3 and set(reads) == {("token-a",)}:
+        logger.info("✅ Background refresh backoff PASSED")
+        return True
+    logger.error(f"❌ Background refresh backoff FAILED: within={within_backoff}, after={after_backoff}, "
+                 f"reads={len(reads)}")
+    return False
+
+def test_stale_while_error():
+    """Test that cached values survive a Secret Manager outage"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing stale-while-error fallback...")
+
+    loader = FakeLoader(("token-a",))
+    cache = SecretCache(loader, ttl=0.1, refresh_ahead=0, stale_ttl=60, retry_interval=60)
+    cache.get()
+
+    loader.fail = True
+    time.sleep(0.15)
+    values = [cache.get() for _ in range(3)]
+    stats = cache.stats()
+
+    # One failed reload, then stale values until the retry interval passes
+    if values == [("token-a",)] * 3 and loader.calls == 2 and stats["stale_served"] == 3:
+        logger.info("✅ Stale-while-error PASSED")
+        return True
+    logger.error(f"❌ Stale-while-error FAILED: values={values}, calls={loader.calls}, stats={stats}")
+    return False
+
+def test_cold_failure_raises():
+    """Test that a failure with nothing cached is surfaced to the caller"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing failure without cached value...")
+
+    loader = FakeLoader(("token-a",))
+    loader.fail = True
+    cache = SecretCache(loader, ttl=60)
+
+    try:
+        cache.get()
+    except RuntimeError:
+        logger.info("✅ Cold failure PASSED")
+        return True
+    logger.error("❌ Cold failure FAILED: no exception raised")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Secret Cache")
+
+    tests = [
+        ("Cache Hit/Miss", test_cache_hit_and_miss),
+        ("Background Refresh", test_background_refresh),
+        ("Background Refresh Backoff", test_refresh_failure_backoff),
+        ("Stale While Error", test_stale_while_error),
+        ("Cold Failure", test_cold_failure_raises)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Secret Cache Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Secret Cache Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for graceful shutdown
+Tests draining publishes in flight, rejecting webhooks while draining and the SIGTERM path of a real gunicorn process
+"""
+
+import json
+import sys
+import os
+import logging
+import signal
+import socket
+import subprocess
+import time
+import urllib.request
+from concurrent.futures import Future
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from shutdown import ShutdownCoordinator
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_shutdown_coordinator():
+    """Test flushed/failed/abandoned accounting, failing steps and the deadline"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing shutdown coordinator...")
+
+    coordinator = ShutdownCoordinator(deadline=0.2)
+    before, confirmed, rejected, stuck = Future(), Future(), Future(), Future()
+    for future in (before, confirmed, rejected, stuck):
+        coordinator.track(future)
+    before.set_result("1")
+    draining_before = coordinator.draining
+
+    def flush():
+        confirmed.set_result("2")
+        rejected.set_exception(RuntimeError("publish failed"))
+        return 2
+
+    def broken():
+        raise OSError("outbox closed")
+
+    started = time.monotonic()
+    summary = coordinator.drain([("flush", flush), ("broken", broken)])
+    elapsed = time.monotonic() - started
+    again = coordinator.drain([("flush", flush)])
+    stats = coordinator.stats()
+
+    ok = (not draining_before and coordinator.draining and not coordinator.begin()
+          and summary["flushed"] == 1 and summary["failed"] == 1
+          and summary["abandoned"] == 3 and summary["left"] == {"flush": 2, "broken": 0}
+          and 0.15 <= elapsed < 1.0 and coordinator.remaining() == 0.0
+          and again is None
+          and stats == {"draining": 1, "in_flight": 1, "flushed": 1, "failed": 1, "rejected": 0})
+
+    if ok:
+        logger.info("✅ Shutdown coordinator PASSED")
+        return True
+    logger.error(f"❌ Shutdown coordinator FAILED: summary={summary}, elapsed={elapsed:.3f}, "
+                 f"again={again}, stats={stats}")
+    return False
+
+def test_webhook_drain():
+    """Test that a draining worker answers 503 on both entry points and flushes the async queue"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook drain...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from test_asgi import call_asgi
+
+    original = (main.publisher, main.shutdown_coordinator, main.PUBLISH_MODE)
+    main.publisher = FakePublisherClient(latency=0.2, record=True)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    try:
+        main.shutdown_coordinator = ShutdownCoordinator(deadline=5)
+        main.PUBLISH_MODE = "async"
+        accepted = [client.post("/webhook/backlog/fm?token=test-token", json=sample).status_code
+                    for _ in range(2)]
+        main.begin_shutdown()
+        rejected = client.post("/webhook/backlog/fm?token=test-token", json=sample)
+        asgi_rejected = call_asgi("POST", "/webhook/backlog/fm", b"token=test-token", json.dumps(sample).encode())
+        ready = client.get("/ready")
+        summary = main.shutdown()
+        metrics_text = client.get("/metrics").get_data(as_text=True)
+        published = len(main.publisher.messages)
+    finally:
+        main.publisher, main.shutdown_coordinator, main.PUBLISH_MODE = original
+
+    ok = (accepted == [202, 202]
+          and rejected.status_code == 503 and rejected.headers.get("Retry-After") == "1"
+          and rejected.get_json()["reason"] == "shutting_down"
+          and asgi_rejected[0] == 503 and asgi_rejected[1]["reason"] == "shutting_down"
+          and ready.status_code == 503 and ready.get_json()["state"] == "draining"
+          and summary["flushed"] == 2 and summary["abandoned"] == 0 and summary["rejected"] == 2
+          and published == 2
+          and 'backlog_webhook_requests_total{status="503",outcome="shutting_down"} 2' in metrics_text
+          and "backlog_webhook_shutdown_draining 1" in metrics_text)
+
+    if ok:
+        logger.info("✅ Webhook drain PASSED")
+        return True
+    logger.error(f"❌ Webhook drain FAILED: accepted={accepted}, rejected={rejected.status_code} "
+                 f"{rejected.get_json()}, asgi={asgi_rejected}, ready={ready.get_json()}, summary={summary}, "
+                 f"published={published}")
+    return False
+
+def free_port() -> int:
+    """Pick an unused local port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_gunicorn_sigterm():
+    """Test that SIGTERM to gunicorn flushes a message still being published before the worker exits"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing SIGTERM to gunicorn...")
+
+    port = free_port()
+    env = dict(os.environ, PUBLISHER_BACKEND="fake", FAKE_PUBLISH_LATENCY_MS="1000", PUBLISH_MODE="async",
+               SHUTDOWN_DEADLINE_SECONDS="5")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", "1", "--threads", "8",
+         "--timeout", "0", "--preload", "--log-level", "info", "main:app"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    status = None
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.05)
+        with open(os.path.join(APP_DIR, "sample.json"), "rb") as f:
+            request = urllib.request.Request(f"http://127.0.0.1:{port}/webhook/backlog/fm?token=test-token",
+                                             data=f.read(), headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            status = response.status
+        process.send_signal(signal.SIGTERM)
+        _, stderr = process.communicate(timeout=30)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.communicate()
+
+    ok = (status == 202 and process.returncode == 0
+          and "flushed=1, failed=0, abandoned=0" in stderr
+          and "Async published comment message" in stderr)
+
+    if ok:
+        logger.info("✅ SIGTERM to gunicorn PASSED")
+        return True
+    logger.error(f"❌ SIGTERM to gunicorn FAILED: status={status}, returncode={process.returncode}, "
+                 f"log tail={stderr[-2000:]}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Graceful Shutdown")
+
+    tests = [
+        ("Shutdown Coordinator", test_shutdown_coordinator),
+        ("Webhook Drain", test_webhook_drain),
+        ("SIGTERM to Gunicorn", test_gunicorn_sigterm)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Graceful Shutdown Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Graceful Shutdown Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the message sinks
+Tests the memory, file and HTTP push sinks, retries and timeouts of the push, and selecting a sink by configuration
+"""
+
+import base64
+import json
+import sys
+import os
+import logging
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from message_codec import decode_message
+from sinks import FileSink, HttpPushError, HttpPushSink, MemorySink, Sink, create_sink
+
+TOPIC = "projects/test-project/topics/backlog-webhook-processor"
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class PushEndpoint:
+    """Local keep-alive HTTP server answering pushes with scripted statuses"""
+
+    def __init__(self, statuses=(), delay: float = 0.0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = []
+        self.connections = set()
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                endpoint.requests.append((json.loads(body), dict(self.headers)))
+                endpoint.connections.add(self.client_address)
+                if endpoint.delay:
+                    threading.Event().wait(endpoint.delay)
+                status = endpoint.statuses.pop(0) if endpoint.statuses else 204
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_HEAD(self):
+                self.send_response(405)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/push"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def test_local_sinks():
+    """Test the memory and file sinks and the sink factory"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing memory and file sinks...")
+
+    memory = MemorySink()
+    ids = [memory.publish(TOPIC, b'{"n": %d}' % n, ordering_key="", encoding="json").result() for n in range(3)]
+    memory.stop()
+    try:
+        memory.publish(TOPIC, b"{}")
+        refused = False
+    except RuntimeError:
+        refused = True
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "messages.ndjson")
+        sink = FileSink(path)
+        file_id = sink.publish(TOPIC, "こんにちは".encode("utf-8"), ordering_key="issue:1", encoding="json").result()
+        sink.publish(TOPIC, b"\x00\x01", compression="zstd").result()
+        sink.stop()
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+
+    invalid = 0
+    for backend, options in (("http", {}), ("file", {}), ("kafka", {})):
+        try:
+            create_sink(backend, **options)
+        except ValueError:
+            invalid += 1
+
+    class Incomplete(Sink):
+        """A sink missing publish()"""
+    try:
+        Incomplete()
+        abstract = False
+    except TypeError:
+        abstract = True
+
+    first = lines[0]["message"]
+    ok = (ids == ["1", "2", "3"] and memory.messages[1]["data"] == b'{"n": 1}'
+          and memory.messages[0]["attributes"] == {"encoding": "json"} and refused
+          and memory.stats() == {"published": 3, "failed": 0}
+          and lines[0]["topic"] == TOPIC and first["messageId"] == file_id
+          and base64.b64decode(first["data"]).decode("utf-8") == "こんにちは"
+          and first["orderingKey"] == "issue:1" and first["publishTime"].endswith("Z")
+          and base64.b64decode(lines[1]["message"]["data"]) == b"\x00\x01" and "orderingKey" not in lines[1]["message"]
+          and isinstance(create_sink("memory"), MemorySink) and invalid == 3 and abstract)
+
+    if ok:
+        logger.info("✅ Memory and file sinks PASSED")
+        return True
+    logger.error(f"❌ Memory and file sinks FAILED: ids={ids}, messages={memory.messages}, lines={lines}, "
+                 f"invalid={invalid}, abstract={abstract}")
+    return False
+
+def test_http_push():
+    """Test the push envelope, keep-alive reuse, retries, non-retried statuses and timeouts"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing HTTP push sink...")
+
+    endpoint = PushEndpoint(statuses=[503, 200, 400])
+    try:
+        sink = HttpPushSink(endpoint.url, timeout=2, retries=2, pool_size=1, backoff=0.01,
+                            token_provider=lambda: "id-token")
+        sink.get_topic({"topic": TOPIC})
+        retried = sink.publish(TOPIC, b'{"a": 1}', ordering_key="", encoding="json").result()
+        try:
+            sink.publish(TOPIC, b'{"a": 2}').result()
+            rejected = None
+        except HttpPushError as e:
+            rejected = e
+        ordered = [sink.publish(TOPIC, b'{"n": %d}' % n, ordering_key="issue:7") for n in range(5)]
+        ordered_ids = [future.result() for future in ordered]
+        stats = sink.stats()
+        sink.stop()
+        envelope, headers = endpoint.requests[0]
+        ordered_data = [json.loads(base64.b64decode(r[0]["message"]["data"])) for r in endpoint.requests[3:]]
+        connections = len(endpoint.connections)
+    finally:
+        endpoint.close()
+
+    slow = PushEndpoint(delay=0.5)
+    try:
+        timing_out = HttpPushSink(slow.url, timeout=0.1, retries=1, pool_size=2, backoff=0.01)
+        try:
+            timing_out.publish(TOPIC, b"{}").result()
+            timed_out = False
+        except Exception:
+            timed_out = True
+        timeout_stats = timing_out.stats()
+        timing_out.stop()
+    finally:
+        slow.close()
+
+    ok = (envelope["subscription"] == TOPIC and envelope["message"]["messageId"] == retried
+          and base64.b64decode(envelope["message"]["data"]) == b'{"a": 1}'
+          and envelope["message"]["attributes"] == {"encoding": "json"}
+          and headers["Authorization"] == "Bearer id-token" and headers["Content-Type"] == "application/json"
+          and endpoint.requests[1][0]["message"]["messageId"] == retried
+          and isinstance(rejected, HttpPushError) and "400" in str(rejected)
+          and len(set(ordered_ids)) == 5 and ordered_data == [{"n": n} for n in range(5)]
+          and endpoint.requests[3][0]["message"]["orderingKey"] == "issue:7"
+          and connections == 1
+          and stats == {"published": 6, "failed": 1, "retried": 1}
+          and timed_out and timeout_stats == {"published": 0, "failed": 1, "retried": 1})
+
+    if ok:
+        logger.info("✅ HTTP push sink PASSED")
+        return True
+    logger.error(f"❌ HTTP push sink FAILED: requests={endpoint.requests}, rejected={rejected}, stats={stats}, "
+                 f"connections={connections}, timed_out={timed_out}, timeout_stats={timeout_stats}")
+    return False
+
+def test_webhook_sink():
+    """Test that the configured sink receives the webhook's messages and reports its counters"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook through a configured sink...")
+
+    import main
+
+    endpoint = PushEndpoint()
+    original = (main.publisher, main.PUBLISHER_BACKEND, main.SINK_HTTP_URL)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    try:
+        main.publisher, main.PUBLISHER_BACKEND, main.SINK_HTTP_URL = None, "http", endpoint.url
+        response = client.post("/webhook/backlog/fm?token=test-token", json=sample)
+        sink = main.publisher
+        metrics_text = client.get("/metrics").get_data(as_text=True)
+        sink.stop()
+    finally:
+        main.publisher, main.PUBLISHER_BACKEND, main.SINK_HTTP_URL = original
+        endpoint.close()
+
+    envelope = endpoint.requests[0][0]
+    message = decode_message(base64.b64decode(envelope["message"]["data"]), envelope["message"]["attributes"])
+    ok = (response.status_code == 200 and isinstance(sink, HttpPushSink)
+          and response.get_json()["message_id"] == envelope["message"]["messageId"]
+          and envelope["subscription"] == main.topic_path
+          and message["content"]["comment"]["id"] == sample["content"]["comment"]["id"]
+          and "backlog_webhook_sink_published 1" in metrics_text)
+
+    if ok:
+        logger.info("✅ Webhook through a configured sink PASSED")
+        return True
+    logger.error(f"❌ Webhook through a configured sink FAILED: status={response.status_code} "
+                 f"{response.get_json()}, requests={endpoint.requests}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Sinks")
+
+    tests = [
+        ("Memory and File Sinks", test_local_sinks),
+        ("HTTP Push Sink", test_http_push),
+        ("Webhook Through a Configured Sink", test_webhook_sink)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Sinks Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Sinks Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
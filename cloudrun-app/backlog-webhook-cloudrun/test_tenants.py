@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for the multi-tenant registry
+Tests parsing and lookup, background reloads with stale fallback, and per-tenant tokens and topics on the webhook routes
+"""
+
+import json
+import sys
+import os
+import logging
+import time
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from tenants import LOAD_REQUIRED, TenantRegistry, parse_tenants, tenant_config_source
+
+TENANTS = {
+    "space-a": {"tokens": ["token-a"], "topic": "space-a-events", "project_keys": ["GENAI"]},
+    "space-b": {"token_secret": "space-b-token", "token_secret_versions": ["latest", "2"]},
+}
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def fake_secret(name: str, version: str) -> str:
+    """Stand-in for main.get_secret"""
+    return f"{name}@{version}"
+
+def test_parse_and_lookup():
+    """Test lookup by name and project key, and rejection of invalid configurations"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing tenant parsing and lookup...")
+
+    table = parse_tenants(TENANTS)
+    lookups = {key: (table.lookup(key).name if table.lookup(key) else None)
+               for key in ("space-a", "GENAI", "space-b", "OTHER")}
+
+    invalid = [
+        [],
+        {"a": {"topic": "t"}},
+        {"a": {"tokens": ["x"], "colour": "red"}},
+        {"a": {"tokens": ["x"], "project_keys": ["P"]}, "b": {"tokens": ["y"], "project_keys": ["P"]}},
+        {"a/b": {"tokens": ["x"]}},
+    ]
+    rejected = 0
+    for spec in invalid:
+        try:
+            parse_tenants(spec)
+        except ValueError:
+            rejected += 1
+
+    sources = [
+        tenant_config_source({"TENANTS_CONFIG": "{}", "TENANTS_SECRET_NAME": "s"}, lambda name: name)[0],
+        tenant_config_source({"TENANTS_SECRET_NAME": "s"}, lambda name: name)[1](),
+        tenant_config_source({}),
+    ]
+
+    ok = (lookups == {"space-a": "space-a", "GENAI": "space-a", "space-b": "space-b", "OTHER": None}
+          and rejected == len(invalid)
+          and sources == ["TENANTS_CONFIG", "s", None])
+
+    if ok:
+        logger.info("✅ Tenant parsing and lookup PASSED")
+        return True
+    logger.error(f"❌ Tenant parsing and lookup FAILED: lookups={lookups}, rejected={rejected}, sources={sources}")
+    return False
+
+def test_registry_reload():
+    """Test secret tokens, non-blocking lookups, background reloads and the stale fallback"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing tenant registry reloads...")
+
+    config = {"text": json.dumps(TENANTS)}
+    registry = TenantRegistry(lambda: config["text"], get_secret=fake_secret, ttl=0.3, refresh_ahead=0.2)
+
+    cold = registry.resolve("space-b", block=False)
+    tokens_b = registry.resolve("space-b").tokens
+    warm = registry.resolve("space-b", block=False)
+
+    # A new tenant appears after a background reload
+    config["text"] = json.dumps({**TENANTS, "space-c": {"tokens": ["token-c"]}})
+    time.sleep(0.15)
+    registry.resolve("space-a")
+    time.sleep(0.1)
+    reloaded = registry.resolve("space-c")
+
+    # A broken configuration keeps the previous table in service
+    config["text"] = "{not json"
+    time.sleep(0.4)
+    still_served = registry.resolve("space-c")
+    stats = registry.stats()
+
+    ok = (cold is LOAD_REQUIRED
+          and tokens_b == ("space-b-token@latest", "space-b-token@2")
+          and warm is not LOAD_REQUIRED and warm.tokens == tokens_b
+          and reloaded is not None and reloaded.tokens == ("token-c",)
+          and still_served is not None
+          and stats["tenants"] == 3 and stats["token_secrets"] == 1 and stats["errors"] >= 1)
+
+    if ok:
+        logger.info("✅ Tenant registry reloads PASSED")
+        return True
+    logger.error(f"❌ Tenant registry reloads FAILED: cold={cold}, tokens_b={tokens_b}, "
+                 f"reloaded={reloaded}, still_served={still_served}, stats={stats}")
+    return False
+
+def test_tenant_routes():
+    """Test per-tenant tokens, topics and project checks on the Flask and ASGI routes"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing tenant webhook routes...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from test_asgi import call_asgi
+
+    original = (main.publisher, main.tenant_registry)
+    main.publisher = FakePublisherClient(record=True)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    other_project = {**sample, "project": {**sample["project"], "projectKey": "OTHER"}}
+
+    def post(path, token, event=sample):
+        return client.post(f"{path}?token={token}", json=event).status_code
+
+    try:
+        main.tenant_registry = None
+        without_registry = post("/webhook/backlog/space-a", "token-a")
+
+        main.tenant_registry = TenantRegistry(lambda: json.dumps(TENANTS), get_secret=fake_secret)
+        statuses = {
+            "tenant a": post("/webhook/backlog/space-a", "token-a"),
+            "by project key": post("/webhook/backlog/GENAI", "token-a"),
+            "secret token": post("/webhook/backlog/space-b", "space-b-token@2"),
+            "token of other tenant": post("/webhook/backlog/space-b", "token-a"),
+            "unknown tenant": post("/webhook/backlog/space-x", "token-a"),
+            "foreign project": post("/webhook/backlog/space-a", "token-a", other_project),
+            "single tenant": post("/webhook/backlog/fm", "test-token"),
+            "tenant batch": client.post("/webhook/backlog/space-a/batch?token=token-a",
+                                        json=[sample, other_project]).get_json()["status_counts"],
+        }
+        asgi_status = call_asgi("POST", "/webhook/backlog/space-a", b"token=token-a",
+                                json.dumps(sample).encode())[0]
+        asgi_forbidden = call_asgi("POST", "/webhook/backlog/space-a/batch", b"token=token-b",
+                                   json.dumps([sample]).encode())[0]
+        main.publisher.stop()
+        topics = [m["topic"].rsplit("/", 1)[-1] for m in main.publisher.messages]
+    finally:
+        main.publisher, main.tenant_registry = original
+
+    expected = {
+        "tenant a": 200, "by project key": 200, "secret token": 200, "token of other tenant": 403,
+        "unknown tenant": 403, "foreign project": 403, "single tenant": 200,
+        "tenant batch": {"200": 1, "403": 1},
+    }
+    ok = (without_registry == 404 and statuses == expected
+          and asgi_status == 200 and asgi_forbidden == 403
+          and topics == ["space-a-events", "space-a-events", main.PUBSUB_TOPIC, main.PUBSUB_TOPIC,
+                         "space-a-events", "space-a-events"])
+
+    if ok:
+        logger.info("✅ Tenant webhook routes PASSED")
+        return True
+    logger.error(f"❌ Tenant webhook routes FAILED: without_registry={without_registry}, statuses={statuses}, "
+                 f"asgi={asgi_status}/{asgi_forbidden}, topics={topics}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Tenant Registry")
+
+    tests = [
+        ("Tenant Parsing and Lookup", test_parse_and_lookup),
+        ("Tenant Registry Reloads", test_registry_reload),
+        ("Tenant Webhook Routes", test_tenant_routes)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Tenant Registry Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Tenant Registry Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for request tracing
+Tests trace context parsing, stage spans, trace attributes on published messages and the event lag histogram
+"""
+
+import json
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+# Every request reuses sample.json, so duplicate-delivery detection would short-circuit them
+os.environ.setdefault("DEDUP_ENABLED", "false")
+
+from tracing import (InMemoryExporter, LoggingExporter, Tracer, create_exporter, format_timestamp,
+                     parse_timestamp, parse_trace_context, parse_trace_header)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def load_sample_data():
+    """Load sample webhook data"""
+    with open('sample.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_trace_context():
+    """Test header parsing, timestamps, sampling and exporter selection"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing trace context...")
+
+    parsed = [
+        parse_trace_header(f"00-{TRACE_ID}-{PARENT_ID}-01"),
+        parse_trace_header(None, f"{TRACE_ID}/{int(PARENT_ID, 16)};o=1"),
+        parse_trace_header(f"00-{'0' * 32}-{PARENT_ID}-01"),
+        parse_trace_header("garbage", "also/garbage"),
+    ]
+    flags = [
+        parse_trace_context(f"00-{TRACE_ID}-{PARENT_ID}-00"),
+        parse_trace_context(None, f"{TRACE_ID}/{int(PARENT_ID, 16)};o=0"),
+        parse_trace_context(None, f"{TRACE_ID}/{int(PARENT_ID, 16)};o=1"),
+        parse_trace_context(None, f"{TRACE_ID}/{int(PARENT_ID, 16)}"),
+    ]
+    created = parse_timestamp("2025-08-12T07:24:26Z")
+    round_trip = parse_timestamp(format_timestamp(1754983466.25))
+
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter, sample_rate=0.0)
+    with tracer.request("unsampled") as unsampled:
+        pass
+    with tracer.request("continued", f"00-{TRACE_ID}-{PARENT_ID}-01") as continued:
+        pass
+    # Caller decided not to sample: not traced even at a sample rate of 1
+    always = Tracer(exporter, sample_rate=1.0)
+    with always.request("declined", f"00-{TRACE_ID}-{PARENT_ID}-00") as declined:
+        pass
+    with always.request("declined", None, f"{TRACE_ID}/{int(PARENT_ID, 16)};o=0") as declined_cloud:
+        pass
+    # Cloud Run's header without options leaves the decision to the sample rate
+    with tracer.request("injected", None, f"{TRACE_ID}/{int(PARENT_ID, 16)}") as injected:
+        pass
+
+    invalid = 0
+    for name in ("zipkin", "no_such_module:Exporter"):
+        try:
+            create_exporter(name)
+        except ValueError:
+            invalid += 1
+
+    ok = (parsed[0] == (TRACE_ID, PARENT_ID) and parsed[1] == (TRACE_ID, PARENT_ID)
+          and parsed[2] is None and parsed[3] is None
+          and created == 1754983466.0 and parse_timestamp("yesterday") is None
+          and abs(round_trip - 1754983466.25) < 1e-6
+          and flags[0][2] is False and flags[1][2] is False and flags[2][2] is True and flags[3][2] is None
+          and flags[3][:2] == (TRACE_ID, PARENT_ID)
+          and unsampled is None and continued is not None
+          and declined is None and declined_cloud is None and injected is None
+          and [span.name for span in exporter.spans] == ["continued"]
+          and exporter.spans[0].parent_id == PARENT_ID
+          and create_exporter("none") is None and isinstance(create_exporter("log"), LoggingExporter)
+          and isinstance(create_exporter("tracing:InMemoryExporter"), InMemoryExporter)
+          and invalid == 2)
+
+    if ok:
+        logger.info("✅ Trace context PASSED")
+        return True
+    logger.error(f"❌ Trace context FAILED: parsed={parsed}, flags={flags}, created={created}, round_trip={round_trip}, "
+                 f"spans={exporter.spans}, invalid={invalid}")
+    return False
+
+def test_webhook_tracing():
+    """Test stage spans and trace attributes on both entry points, and the event lag histogram"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing webhook tracing...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from test_asgi import call_asgi
+
+    exporter = InMemoryExporter()
+    original = (main.publisher, main.tracer)
+    main.publisher = FakePublisherClient(record=True)
+    client = main.app.test_client()
+    sample = load_sample_data()
+    try:
+        main.tracer = Tracer(exporter)
+        flask_status = client.post("/webhook/backlog/fm?token=test-token", json=sample,
+                                   headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}).status_code
+        flask_spans = list(exporter.spans)
+        exporter.clear()
+        asgi_status = call_asgi("POST", "/webhook/backlog/fm", b"token=test-token", json.dumps(sample).encode(),
+                                headers=[(b"x-cloud-trace-context", f"{TRACE_ID}/1;o=1".encode())])[0]
+        asgi_spans = list(exporter.spans)
+
+        main.tracer = Tracer()
+        client.post("/webhook/backlog/fm?token=test-token", json=sample)
+        metrics_text = client.get("/metrics").get_data(as_text=True)
+        main.publisher.stop()
+        attributes = [m["attributes"] for m in main.publisher.messages]
+    finally:
+        main.publisher, main.tracer = original
+
+    root = flask_spans[0]
+    stages = [span.name for span in flask_spans[1:]]
+    ok = (flask_status == 200 and asgi_status == 200
+          and root.name == "POST /webhook/backlog/fm" and root.trace_id == TRACE_ID and root.parent_id == PARENT_ID
+          and root.attributes == {"http.status_code": 200, "outcome": "published"}
+          and {"secret", "token", "read_body", "parse", "route", "publish"} <= set(stages)
+          and all(span.parent_id == root.span_id and root.start <= span.start <= span.end <= root.end
+                  for span in flask_spans[1:])
+          and attributes[0]["traceparent"] == f"00-{TRACE_ID}-{root.span_id}-01"
+          and attributes[0]["received_at"] <= attributes[0]["published_at"]
+          and attributes[0]["event_created"] == sample["created"]
+          and asgi_spans[0].trace_id == TRACE_ID and asgi_spans[0].parent_id == f"{1:016x}"
+          and "publish" in [span.name for span in asgi_spans]
+          and attributes[1]["traceparent"].split("-")[2] == asgi_spans[0].span_id
+          and "traceparent" not in attributes[2] and attributes[2]["event_created"] == sample["created"]
+          and 'backlog_webhook_event_lag_seconds_count{stage="received"}' in metrics_text
+          and 'backlog_webhook_event_lag_seconds_count{stage="published"}' in metrics_text
+          and 'backlog_webhook_event_lag_seconds_bucket{stage="published",le="3600.0"}' in metrics_text)
+
+    if ok:
+        logger.info("✅ Webhook tracing PASSED")
+        return True
+    logger.error(f"❌ Webhook tracing FAILED: statuses={flask_status}/{asgi_status}, flask_spans={flask_spans}, "
+                 f"asgi_spans={asgi_spans}, attributes={attributes}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Tracing")
+
+    tests = [
+        ("Trace Context", test_trace_context),
+        ("Webhook Tracing", test_webhook_tracing)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Tracing Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Tracing Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
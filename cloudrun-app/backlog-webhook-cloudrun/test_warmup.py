@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Local Test Script for warm-up and readiness
+Tests the timed warm-up steps, retrying failed steps and the split liveness/readiness endpoints
+"""
+
+import sys
+import os
+import logging
+
+# Add the current directory to the path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BACKLOG_WEBHOOK_SECRET_TOKEN", "test-token")
+
+from warmup import Warmup
+
+def setup_logging():
+    """Setup logging for test"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    return logging.getLogger(__name__)
+
+def test_warmup_steps():
+    """Test step timing, resuming at the failed step and disabling"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing warm-up steps...")
+
+    calls = []
+    failures = [ConnectionError("secret manager unavailable")]
+
+    def step(name):
+        def run():
+            calls.append(name)
+            if name == "secrets" and failures:
+                raise failures.pop()
+        return run
+
+    warmup = Warmup([(name, step(name)) for name in ("pubsub", "secrets", "extraction")])
+    first = warmup.run()
+    failed = warmup.status()
+    second = warmup.run()
+    status = warmup.status()
+    third = warmup.run()
+
+    disabled = Warmup([("never", lambda: calls.append("never"))])
+    disabled.disable()
+
+    ok = (not first and failed["state"] == "failed" and not failed["ready"]
+          and failed["error"] == "secrets: secret manager unavailable"
+          and second and third and status["ready"] and status["attempts"] == 2
+          and calls == ["pubsub", "secrets", "secrets", "extraction"]
+          and set(status["steps"]) == {"pubsub", "secrets", "extraction"}
+          and status["warmup_seconds"] >= sum(status["steps"].values()) - 1e-6
+          and "error" not in status and warmup.stats()["ready"] == 1
+          and disabled.ready and disabled.run() and "never" not in calls)
+
+    if ok:
+        logger.info("✅ Warm-up steps PASSED")
+        return True
+    logger.error(f"❌ Warm-up steps FAILED: first={first}, failed={failed}, status={status}, calls={calls}")
+    return False
+
+def test_optional_step():
+    """Test that a failing optional step leaves the worker ready but degraded until it recovers"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing optional warm-up step...")
+
+    calls = []
+    failures = [ConnectionError("pubsub unavailable")] * 2
+
+    def step(name):
+        def run():
+            calls.append(name)
+            if name == "pubsub" and failures:
+                raise failures.pop()
+        return run
+
+    warmup = Warmup([(name, step(name)) for name in ("pubsub", "secrets", "extraction")], optional=("pubsub",))
+    first = warmup.run()
+    degraded = warmup.status()
+    degraded_stats = warmup.stats()
+    second = warmup.run()
+    third = warmup.run()
+    recovered = warmup.status()
+
+    required = Warmup([("pubsub", step("pubsub"))])
+    failures.append(ConnectionError("pubsub unavailable"))
+
+    ok = (not first and degraded["ready"] and degraded["state"] == "ready" and degraded["degraded"] == ["pubsub"]
+          and degraded["error"] == "pubsub: pubsub unavailable" and degraded["warmup_seconds"] is not None
+          and degraded_stats["ready"] == 1 and degraded_stats["degraded"] == 1
+          and not second and third and recovered["ready"] and "degraded" not in recovered
+          and "error" not in recovered and set(recovered["steps"]) == {"pubsub", "secrets", "extraction"}
+          and calls == ["pubsub", "secrets", "extraction", "pubsub", "pubsub"]
+          and not required.run() and not required.ready)
+
+    if ok:
+        logger.info("✅ Optional warm-up step PASSED")
+        return True
+    logger.error(f"❌ Optional warm-up step FAILED: first={first}, degraded={degraded}, second={second}, "
+                 f"third={third}, recovered={recovered}, calls={calls}")
+    return False
+
+def test_readiness_endpoints():
+    """Test that / answers at once while /ready waits for the warm-up, on both entry points"""
+    logger = logging.getLogger(__name__)
+    logger.info("Testing liveness and readiness endpoints...")
+
+    import main
+    from fake_pubsub import FakePublisherClient
+    from google.api_core.exceptions import PermissionDenied
+    from test_asgi import call_asgi
+
+    class TopicForbidden(FakePublisherClient):
+        def get_topic(self, request, timeout=None, **kwargs):
+            raise PermissionDenied("pubsub.topics.get denied")
+
+    original = (main.publisher, main.warmup, main.WARMUP_ON_START)
+    client = main.app.test_client()
+    try:
+        main.publisher = TopicForbidden()
+        main.warmup = Warmup([("pubsub", main._warm_pubsub), ("secrets", main._warm_secrets),
+                              ("extraction", main._warm_extraction)])
+        live = client.get("/")
+        pending = client.get("/ready")
+        asgi_pending = call_asgi("GET", "/ready")
+        warmed = main.warm_up()
+        ready = client.get("/ready")
+        asgi_ready = call_asgi("GET", "/ready")
+        metrics_text = client.get("/metrics").get_data(as_text=True)
+
+        main.warmup = Warmup([("never", lambda: None)])
+        main.WARMUP_ON_START = False
+        disabled = client.get("/ready")
+    finally:
+        main.publisher.stop()
+        main.publisher, main.warmup, main.WARMUP_ON_START = original
+
+    steps = ready.get_json()["steps"]
+    ok = (live.status_code == 200 and live.get_data(as_text=True) == "OK"
+          and pending.status_code == 503 and pending.get_json()["state"] == "pending"
+          and asgi_pending[0] == 503
+          and warmed and ready.status_code == 200 and ready.get_json()["warmup_seconds"] > 0
+          and set(steps) == {"pubsub", "secrets", "extraction"}
+          and asgi_ready[0] == 200 and asgi_ready[1]["ready"] is True
+          and "backlog_webhook_warmup_ready 1" in metrics_text
+          and "backlog_webhook_warmup_step_extraction_seconds" in metrics_text
+          and disabled.status_code == 200 and disabled.get_json()["state"] == "disabled")
+
+    if ok:
+        logger.info("✅ Liveness and readiness endpoints PASSED")
+        return True
+    logger.error(f"❌ Liveness and readiness endpoints FAILED: live={live.status_code}, "
+                 f"pending={pending.status_code} {pending.get_json()}, ready={ready.status_code} {ready.get_json()}, "
+                 f"asgi={asgi_pending[0]}/{asgi_ready}, disabled={disabled.get_json()}")
+    return False
+
+def main():
+    """Main test execution"""
+    logger = setup_logging()
+    logger.info("🧪 Starting Local Tests for Warm-up")
+
+    tests = [
+        ("Warm-up Steps", test_warmup_steps),
+        ("Optional Warm-up Step", test_optional_step),
+        ("Liveness and Readiness Endpoints", test_readiness_endpoints)
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Running: {test_name}")
+        logger.info(f"{'='*50}")
+
+        result = test_func()
+        results.append((test_name, result))
+
+    # Summary
+    logger.info(f"\n📊 Warm-up Test Results:")
+    all_passed = True
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        logger.info(f"  {test_name}: {status}")
+        if not result:
+            all_passed = False
+
+    logger.info(f"\n🎯 Overall Warm-up Tests: {'✅ ALL PASSED' if all_passed else '❌ SOME FAILED'}")
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
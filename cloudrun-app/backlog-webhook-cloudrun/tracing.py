@@ -0,0 +1,334 @@
+import contextvars
+import importlib
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+# Pub/Sub attributes linking a message to the request that published it
+TRACEPARENT_ATTRIBUTE = "traceparent"
+RECEIVED_AT_ATTRIBUTE = "received_at"
+PUBLISHED_AT_ATTRIBUTE = "published_at"
+# Pub/Sub attribute with the event's created time in Backlog, kept for the event lag metric
+EVENT_CREATED_ATTRIBUTE = "event_created"
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class Span(NamedTuple):
+    """A finished span; times are seconds since the epoch."""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start: float
+    end: float
+    attributes: dict
+
+
+def _new_id(size: int) -> str:
+    # Not security-sensitive; an all-zero ID is invalid in W3C trace context
+    return f"{random.getrandbits(size * 8) or 1:0{size * 2}x}"
+
+
+def _is_hex_id(value: str, length: int) -> bool:
+    return len(value) == length and value.strip("0") != "" and all(c in "0123456789abcdef" for c in value)
+
+
+def _sampled_flag(flags: str, base: int) -> Optional[bool]:
+    try:
+        return bool(int(flags, base) & 1)
+    except ValueError:
+        return None
+
+
+def parse_trace_context(traceparent: Optional[str] = None,
+                        cloud_trace_context: Optional[str] = None) -> Optional[Tuple[str, str, Optional[bool]]]:
+    """Extract the caller's trace context and sampling decision from the request headers.
+
+    Args:
+        traceparent: W3C ``traceparent`` header, ``00-<trace id>-<span id>-<flags>``
+        cloud_trace_context: ``X-Cloud-Trace-Context`` header set by Cloud Run,
+            ``<trace id>/<decimal span id>;o=<flags>``, used when there is no traceparent
+
+    Returns:
+        Optional[Tuple[str, str, Optional[bool]]]: (trace ID, parent span ID, sampled), IDs in
+        lowercase hex and sampled None when the header carries no flags; None if neither
+        header holds a valid context
+    """
+    if traceparent:
+        parts = traceparent.strip().lower().split("-")
+        if len(parts) >= 4 and _is_hex_id(parts[1], 32) and _is_hex_id(parts[2], 16):
+            return parts[1], parts[2], _sampled_flag(parts[3][:2], 16) if len(parts[3]) >= 2 else None
+    if cloud_trace_context:
+        trace_id, _, rest = cloud_trace_context.strip().lower().partition("/")
+        span, _, options = rest.partition(";")
+        if _is_hex_id(trace_id, 32) and span.isdigit() and 0 < int(span) < 2 ** 64:
+            flags = options.strip()
+            sampled = _sampled_flag(flags[2:], 10) if flags.startswith("o=") else None
+            return trace_id, f"{int(span):016x}", sampled
+    return None
+
+
+def parse_trace_header(traceparent: Optional[str] = None,
+                       cloud_trace_context: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """Extract the caller's trace context from the request headers.
+
+    Returns:
+        Optional[Tuple[str, str]]: (trace ID, parent span ID) in lowercase hex, or None if
+        neither header holds a valid context; see ``parse_trace_context``
+    """
+    context = parse_trace_context(traceparent, cloud_trace_context)
+    return context[:2] if context is not None else None
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds since the epoch as RFC 3339 in UTC with milliseconds."""
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_timestamp(text) -> Optional[float]:
+    """Parse an RFC 3339 timestamp such as Backlog's ``created`` into seconds since the epoch.
+
+    Returns:
+        Optional[float]: The time, or None if the value is not a timestamp; times
+        without an offset are taken as UTC
+    """
+    if not isinstance(text, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class Trace:
+    """Spans of one request, collected until the request finishes.
+
+    Child spans are given as ``perf_counter`` readings and converted to wall
+    time relative to the start of the trace, so recording one costs no clock
+    call beyond the one the caller already made.
+    """
+
+    def __init__(self, name: str, parent: Optional[Tuple[str, str]] = None):
+        self.name = name
+        self.trace_id, self.parent_id = parent if parent is not None else (_new_id(16), None)
+        self.span_id = _new_id(8)
+        self.attributes = {}
+        self.spans: List[Span] = []
+        self.wall_start = time.time()
+        self.perf_start = time.perf_counter()
+
+    def add_span(self, name: str, start: float, end: float, attributes: Optional[dict] = None) -> None:
+        """Record a child span of the request from two ``perf_counter`` readings."""
+        offset = self.wall_start - self.perf_start
+        self.spans.append(Span(self.trace_id, _new_id(8), self.span_id, name,
+                               start + offset, end + offset, attributes or {}))
+
+    def set_attribute(self, key: str, value) -> None:
+        """Set an attribute of the request span."""
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """Return the W3C traceparent naming the request span as parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def message_attributes(self) -> dict:
+        """Return the Pub/Sub attributes carrying this trace to consumers."""
+        return {TRACEPARENT_ATTRIBUTE: self.traceparent(), RECEIVED_AT_ATTRIBUTE: format_timestamp(self.wall_start)}
+
+    def finish(self) -> List[Span]:
+        """End the request span and return it followed by its children."""
+        end = self.wall_start + (time.perf_counter() - self.perf_start)
+        root = Span(self.trace_id, self.span_id, self.parent_id, self.name, self.wall_start, end, self.attributes)
+        return [root] + self.spans
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace of the request being handled, or None if it is not traced."""
+    return _current_trace.get()
+
+
+class _NoTrace:
+    """Context manager used when a request is not traced."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_TRACE = _NoTrace()
+
+
+class _TraceScope:
+    def __init__(self, tracer: "Tracer", trace: Trace):
+        self._tracer = tracer
+        self._trace = trace
+        self._token = None
+
+    def __enter__(self) -> Trace:
+        self._token = _current_trace.set(self._trace)
+        return self._trace
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self._token)
+        if exc is not None:
+            self._trace.set_attribute("error", repr(exc))
+        self._tracer.export(self._trace.finish())
+        return False
+
+
+class Tracer:
+    """Creates a trace per request and hands the finished spans to an exporter.
+
+    The current trace is kept in a context variable, so code running for the
+    request, including ``asyncio.to_thread`` calls, can add spans without it
+    being passed around. With no exporter, or for requests that are not
+    sampled, ``request`` returns a context manager that does nothing.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        """Create the tracer.
+
+        Args:
+            exporter: Object with ``export(spans)``; None disables tracing
+            sample_rate: Fraction of requests traced when the caller made no sampling decision
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._traces = 0
+        self._spans = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def request(self, name: str, traceparent: Optional[str] = None, cloud_trace_context: Optional[str] = None):
+        """Return a context manager tracing one request.
+
+        Requests that carry a trace context continue that trace. The caller's
+        sampled flag (``traceparent`` flags, ``o=`` of ``X-Cloud-Trace-Context``)
+        decides whether they are traced; requests without one, including those
+        whose header Cloud Run added without options, are sampled at ``sample_rate``.
+
+        Args:
+            name: Name of the request span
+            traceparent: The request's ``traceparent`` header
+            cloud_trace_context: The request's ``X-Cloud-Trace-Context`` header
+
+        Returns:
+            A context manager yielding the Trace, or None when the request is not traced
+        """
+        if self.exporter is None:
+            return _NO_TRACE
+        context = parse_trace_context(traceparent, cloud_trace_context)
+        sampled = context[2] if context is not None else None
+        if sampled is None:
+            sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if not sampled:
+            return _NO_TRACE
+        return _TraceScope(self, Trace(name, context[:2] if context is not None else None))
+
+    def export(self, spans: List[Span]) -> None:
+        """Hand finished spans to the exporter; export errors are logged and counted, never raised."""
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            logging.warning(f"Failed to export trace {spans[0].trace_id}: {e}")
+            return
+        with self._lock:
+            self._traces += 1
+            self._spans += len(spans)
+
+    def stats(self) -> dict:
+        """Return tracer counters for monitoring."""
+        with self._lock:
+            return {"traces": self._traces, "spans": self._spans, "errors": self._errors}
+
+
+class InMemoryExporter:
+    """Keeps exported spans in memory, for tests."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class LoggingExporter:
+    """Writes each trace as one log entry.
+
+    With LOG_FORMAT=json the entry carries ``logging.googleapis.com/trace``, so
+    Cloud Logging shows it next to the request log of the same trace.
+    """
+
+    def __init__(self, project_id: Optional[str] = None, logger_name: str = "webhook.trace"):
+        self.project_id = project_id
+        self.logger = logging.getLogger(logger_name)
+
+    def export(self, spans: List[Span]) -> None:
+        root = spans[0]
+        fields = {
+            "logging.googleapis.com/spanId": root.span_id,
+            "spans": [{
+                "name": span.name,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id,
+                "startTime": format_timestamp(span.start),
+                "durationMs": round((span.end - span.start) * 1000, 3),
+                "attributes": span.attributes
+            } for span in spans]
+        }
+        if self.project_id:
+            fields["logging.googleapis.com/trace"] = f"projects/{self.project_id}/traces/{root.trace_id}"
+        self.logger.info("Trace %s %s: %.1f ms, %d spans", root.trace_id, root.name,
+                         (root.end - root.start) * 1000, len(spans), extra={"json_fields": fields})
+
+
+def create_exporter(name: str, project_id: Optional[str] = None):
+    """Create the span exporter selected by configuration.
+
+    Args:
+        name: "none", "log", "memory", or ``module:attribute`` naming a class or
+            factory that is called without arguments and returns an object with
+            ``export(spans)``
+        project_id: GCP project used by the log exporter to link Cloud Trace
+
+    Returns:
+        The exporter, or None for "none"
+
+    Raises:
+        ValueError: If the name is unknown or the custom exporter cannot be imported
+    """
+    if name in ("", "none"):
+        return None
+    if name == "log":
+        return LoggingExporter(project_id)
+    if name == "memory":
+        return InMemoryExporter()
+    module_name, sep, attribute = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown TRACE_EXPORTER: {name}")
+    try:
+        factory = getattr(importlib.import_module(module_name), attribute)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load TRACE_EXPORTER {name}: {e}")
+    return factory()
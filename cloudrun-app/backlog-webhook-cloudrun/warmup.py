@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from typing import Callable, Iterable, List, Tuple
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"
+
+
+class Warmup:
+    """Runs the warm-up steps of a worker in order and tracks readiness.
+
+    Each step is timed. A failed step is retried in the background with
+    exponential backoff, starting again from that step, so the worker becomes
+    ready as soon as the failing dependency recovers. Until then readiness
+    stays false while liveness is unaffected.
+
+    A failed optional step does not hold readiness back: the remaining steps
+    run, the worker reports ready but degraded, and the optional step keeps
+    being retried in the background.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], None]]], retry_interval: float = 1.0,
+                 max_retry_interval: float = 30.0, clock: Callable[[], float] = time.perf_counter,
+                 name: str = "warm-up", optional: Iterable[str] = ()):
+        """Create the warm-up.
+
+        Args:
+            steps: (name, callable) pairs run in order
+            retry_interval: Seconds before the first retry after a failure
+            max_retry_interval: Upper bound of the retry backoff
+            clock: Monotonic clock, replaceable in tests
+            name: Name of the background thread
+            optional: Names of steps whose failure leaves the worker ready but degraded
+        """
+        self._steps = steps
+        self._optional = frozenset(optional)
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+        self._clock = clock
+        self._name = name
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._state = PENDING
+        # Indexes of the steps that have not succeeded yet, in order
+        self._pending = list(range(len(steps)))
+        self._step_seconds = {}
+        self._started = None
+        self._seconds = None
+        self._attempts = 0
+        self._error = None
+
+    @property
+    def ready(self) -> bool:
+        """True once every step has succeeded, or if warm-up is disabled."""
+        return self._state in (READY, DISABLED)
+
+    def disable(self) -> None:
+        """Report ready without warming up; clients are then created on first use."""
+        with self._lock:
+            if self._state == PENDING:
+                self._state = DISABLED
+
+    def run(self) -> bool:
+        """Run the remaining steps once in the calling thread.
+
+        Returns:
+            bool: True if every step, optional ones included, has now succeeded
+        """
+        with self._run_lock:
+            with self._lock:
+                if self._state == DISABLED or not self._pending:
+                    return True
+                if self._started is None:
+                    self._started = self._clock()
+                if self._state != READY:
+                    self._state = RUNNING
+                self._attempts += 1
+                pending = list(self._pending)
+            errors = []
+            for index in pending:
+                name, step = self._steps[index]
+                started = self._clock()
+                try:
+                    step()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    logging.error(f"Warm-up step {name} failed: {e}")
+                    if name in self._optional:
+                        continue
+                    with self._lock:
+                        if self._state != READY:
+                            self._state = FAILED
+                        self._error = "; ".join(errors)
+                    return False
+                with self._lock:
+                    self._step_seconds[name] = self._clock() - started
+                    self._pending.remove(index)
+            with self._lock:
+                became_ready = self._state != READY
+                if became_ready:
+                    self._seconds = self._clock() - self._started
+                    self._state = READY
+                self._error = "; ".join(errors) or None
+                degraded = [self._steps[index][0] for index in self._pending]
+            if became_ready:
+                logging.info(f"Warm-up completed in {self._seconds * 1000:.1f} ms: "
+                             + ", ".join(f"{name}={seconds * 1000:.1f}ms"
+                                         for name, seconds in self._step_seconds.items())
+                             + (f" (degraded: {', '.join(degraded)})" if degraded else ""))
+            elif not degraded:
+                logging.info("Warm-up recovered: every optional step has succeeded")
+            return not degraded
+
+    def start(self) -> None:
+        """Run the steps in a background thread, retrying failures until they succeed."""
+        with self._lock:
+            if self._thread is not None or self.ready:
+                return
+            self._thread = threading.Thread(target=self._run_until_ready, daemon=True, name=self._name)
+        self._thread.start()
+
+    def _run_until_ready(self) -> None:
+        # Keeps retrying optional steps after the worker has become ready
+        interval = self._retry_interval
+        while not self.run():
+            time.sleep(interval)
+            interval = min(interval * 2, self._max_retry_interval)
+
+    def status(self) -> dict:
+        """Return the readiness report served by the readiness endpoint."""
+        with self._lock:
+            status = {
+                "ready": self.ready,
+                "state": self._state,
+                "attempts": self._attempts,
+                "warmup_seconds": self._seconds,
+                "steps": {name: round(seconds, 6) for name, seconds in self._step_seconds.items()}
+            }
+            if self._state == READY and self._pending:
+                status["degraded"] = [self._steps[index][0] for index in self._pending]
+            if self._error is not None:
+                status["error"] = self._error
+            return status
+
+    def stats(self) -> dict:
+        """Return warm-up counters for monitoring."""
+        with self._lock:
+            stats = {"ready": int(self.ready), "attempts": self._attempts,
+                     "degraded": int(self._state == READY and bool(self._pending))}
+            if self._seconds is not None:
+                stats["seconds"] = self._seconds
+            for name, seconds in self._step_seconds.items():
+                stats[f"step_{name}_seconds"] = seconds
+            return stats
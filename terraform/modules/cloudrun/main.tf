@@ -32,6 +32,26 @@ resource "google_cloud_run_v2_service" "backlog_webhook_cloudrun" {
         name  = "LOG_LEVEL"
         value = "INFO"
       }
+
+      # No traffic is routed to a new instance until warm-up has opened the Pub/Sub
+      # channel and fetched the secrets (/ready); liveness (/) stays a cheap 200.
+      # With the outbox (PUBLISH_MODE=outbox or OUTBOX_FALLBACK) a Pub/Sub outage does
+      # not hold /ready back, so instances still start while Pub/Sub is down
+      startup_probe {
+        http_get {
+          path = "/ready"
+        }
+        period_seconds    = 1
+        timeout_seconds   = 1
+        failure_threshold = 60
+      }
+      liveness_probe {
+        http_get {
+          path = "/"
+        }
+        period_seconds  = 30
+        timeout_seconds = 5
+      }
     }
   }
 